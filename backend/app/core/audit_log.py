@@ -0,0 +1,152 @@
+import threading
+import time
+from datetime import datetime
+
+from sqlalchemy import func, insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.asset_log import AssetLog
+from app.models.asset_log_outbox import AssetLogOutbox
+
+LOG_COLUMNS = ("asset_id", "operator_id", "action_type", "change_data", "created_at")
+
+_flusher: threading.Thread | None = None
+_stop = threading.Event()
+_stats_lock = threading.Lock()
+_stats = {
+    "flushes": 0,
+    "flushed_rows": 0,
+    "last_flush_at": None,
+    "last_flush_rows": 0,
+    "last_flush_ms": 0.0,
+    "last_error": None,
+}
+
+
+def write_logs(db: Session, rows: list[dict]):
+    """Add asset log rows to the caller's transaction.
+
+    With ``audit_log_outbox_enabled`` they go to the outbox table and the
+    background flusher moves them to asset_logs; either way they commit or
+    roll back together with the change they describe.
+    """
+    if rows:
+        target = AssetLogOutbox if settings.audit_log_outbox_enabled else AssetLog
+        db.execute(insert(target), rows)
+
+
+def log_change(db: Session, asset_id: int, operator_id: int, action_type: str, change_data: dict):
+    write_logs(
+        db,
+        [
+            {
+                "asset_id": asset_id,
+                "operator_id": operator_id,
+                "action_type": action_type,
+                "change_data": change_data,
+                "created_at": datetime.utcnow(),
+            }
+        ],
+    )
+
+
+def flush_outbox(batch_size: int | None = None) -> int:
+    """Move pending outbox rows to asset_logs in id order; returns rows moved.
+
+    Batches are claimed with ``FOR UPDATE SKIP LOCKED`` so several workers
+    can flush concurrently without moving a row twice.
+    """
+    batch_size = batch_size or settings.audit_log_flush_batch_size
+    columns = [getattr(AssetLogOutbox, name) for name in LOG_COLUMNS]
+    moved = 0
+    db = SessionLocal()
+    try:
+        while True:
+            rows = (
+                db.query(AssetLogOutbox.id, *columns)
+                .order_by(AssetLogOutbox.id.asc())
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+                .all()
+            )
+            if not rows:
+                break
+            db.execute(insert(AssetLog), [{name: getattr(row, name) for name in LOG_COLUMNS} for row in rows])
+            db.query(AssetLogOutbox).filter(AssetLogOutbox.id.in_([row.id for row in rows])).delete(
+                synchronize_session=False
+            )
+            db.commit()
+            moved += len(rows)
+            if len(rows) < batch_size:
+                break
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+    return moved
+
+
+def _flush_and_record():
+    started_at = time.time()
+    try:
+        moved = flush_outbox()
+    except Exception as exc:
+        with _stats_lock:
+            _stats["last_error"] = f"{type(exc).__name__}: {exc}"[:500]
+        return
+    with _stats_lock:
+        _stats["flushes"] += 1
+        _stats["flushed_rows"] += moved
+        _stats["last_flush_at"] = datetime.utcnow().isoformat()
+        _stats["last_flush_rows"] = moved
+        _stats["last_flush_ms"] = round((time.time() - started_at) * 1000, 1)
+        _stats["last_error"] = None
+
+
+def _run_flusher():
+    while not _stop.wait(max(settings.audit_log_flush_interval_seconds, 0.05)):
+        _flush_and_record()
+    _flush_and_record()
+
+
+def start_log_flusher():
+    """Start the background flusher; when the outbox is disabled, only drain leftovers once."""
+    global _flusher
+    if not settings.audit_log_outbox_enabled:
+        _flush_and_record()
+        return
+    if _flusher is not None and _flusher.is_alive():
+        return
+    _stop.clear()
+    _flusher = threading.Thread(target=_run_flusher, name="asset-log-flusher", daemon=True)
+    _flusher.start()
+
+
+def stop_log_flusher(timeout: float = 10):
+    global _flusher
+    if _flusher is None:
+        return
+    _stop.set()
+    _flusher.join(timeout)
+    _flusher = None
+
+
+def get_log_outbox_stats() -> dict:
+    db = SessionLocal()
+    try:
+        depth, oldest = db.query(func.count(AssetLogOutbox.id), func.min(AssetLogOutbox.created_at)).one()
+    finally:
+        db.close()
+    with _stats_lock:
+        stats = dict(_stats)
+    stats.update(
+        enabled=settings.audit_log_outbox_enabled,
+        flusher_running=_flusher is not None and _flusher.is_alive(),
+        queue_depth=depth,
+        oldest_pending_at=oldest.isoformat() if oldest else None,
+        lag_seconds=round((datetime.utcnow() - oldest).total_seconds(), 3) if oldest else 0.0,
+    )
+    return stats
@@ -0,0 +1,71 @@
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+
+from app.core.config import settings
+
+_client: redis.Redis | None = None
+_down_until = 0.0
+
+
+def get_redis() -> redis.Redis | None:
+    global _client
+    if not settings.redis_url or time.monotonic() < _down_until:
+        return None
+    if _client is None:
+        _client = redis.Redis.from_url(
+            settings.redis_url,
+            socket_timeout=settings.redis_timeout_seconds,
+            socket_connect_timeout=settings.redis_timeout_seconds,
+        )
+    return _client
+
+
+def mark_redis_down():
+    global _down_until
+    _down_until = time.monotonic() + settings.redis_retry_seconds
+
+
+def cache_key(*parts) -> str:
+    return ":".join([settings.cache_prefix, *[str(part) for part in parts]])
+
+
+class LRUCache:
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            expires_at, value = item
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float | None = None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -9,6 +9,53 @@ class Settings(BaseSettings):
     jwt_secret: str = "change-me"
     jwt_algorithm: str = "HS256"
     jwt_expire_hours: int = 24
+    permission_cache_ttl_seconds: int = 60
+    cache_prefix: str = "assethub"
+    redis_timeout_seconds: float = 0.2
+    redis_retry_seconds: int = 30
+    principal_cache_ttl_seconds: int = 300
+    principal_cache_local_ttl_seconds: int = 30
+    principal_cache_size: int = 2048
+    password_hash_rounds: int = 12
+    password_hash_workers: int = 2
+    password_hash_max_pending: int = 8
+    password_hash_wait_seconds: float = 5.0
+    ldap_client_strategy: str = "SYNC"
+    ldap_pool_size: int = 4
+    ldap_pool_max_idle_seconds: int = 300
+    ldap_connect_timeout_seconds: float = 5.0
+    ldap_receive_timeout_seconds: float = 10.0
+    ldap_page_size: int = 500
+    ldap_full_sync_interval_hours: int = 24
+    ldap_max_deactivate_fraction: float = 0.5
+    login_rate_window_seconds: int = 300
+    login_max_failures_per_user: int = 5
+    login_max_failures_per_ip: int = 50
+    login_throttle_local_size: int = 10000
+    trust_proxy_headers: bool = False
+    count_cache_ttl_seconds: int = 30
+    count_cache_size: int = 4096
+    count_estimate_min_rows: int = 0
+    search_fulltext_enabled: bool = True
+    search_ngram_token_size: int = 2
+    asset_lookup_cache_ttl_seconds: int = 30
+    asset_lookup_cache_size: int = 4096
+    sequence_pool_size: int = 2
+    sequence_pool_timeout_seconds: float = 5.0
+    import_chunk_size: int = 1000
+    import_workers: int = 1
+    import_dir: str = "/tmp/assethub-imports"
+    import_heartbeat_seconds: int = 30
+    import_stale_seconds: int = 300
+    import_retention_hours: int = 72
+    audit_log_outbox_enabled: bool = False
+    audit_log_flush_interval_seconds: float = 1.0
+    audit_log_flush_batch_size: int = 1000
+    audit_log_hot_months: int = 12
+    audit_log_archive_dir: str = "/var/lib/assethub/log-archive"
+    audit_log_archive_enabled: bool = False
+    audit_log_archive_interval_hours: int = 24
+    audit_log_archive_batch_size: int = 5000
 
     class Config:
         env_file = ".env"
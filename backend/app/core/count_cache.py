@@ -0,0 +1,184 @@
+import hashlib
+import json
+import re
+import threading
+
+from redis.exceptions import RedisError
+from sqlalchemy import event, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Query, Session
+from sqlalchemy.pool import Pool
+from sqlalchemy.sql import visitors
+from sqlalchemy.sql.schema import Column
+from sqlalchemy.sql.util import find_tables
+
+from app.core.cache import LRUCache, cache_key, get_redis, mark_redis_down
+from app.core.config import settings
+
+_local = LRUCache(settings.count_cache_size, settings.count_cache_ttl_seconds)
+_local_versions: dict[str, int] = {}
+_lock = threading.Lock()
+_DIRTY_KEY = "count_cache_dirty_tables"
+_COMMITTED_KEY = "count_cache_committed_tables"
+_DML_TABLE = re.compile(
+    r"\s*(?:INSERT\s+(?:IGNORE\s+)?INTO|REPLACE\s+INTO|UPDATE(?:\s+IGNORE)?|DELETE\s+FROM)\s+[`\"]?(\w+)",
+    re.IGNORECASE,
+)
+
+
+def _versions_from_redis(client, tables: list[str]) -> list[int]:
+    if not tables:
+        return []
+    return [int(value or 0) for value in client.mget([cache_key("count_ver", table) for table in tables])]
+
+
+def get_shared_table_versions(tables: list[str]) -> list[int] | None:
+    """Write versions as seen by every process, or None without Redis."""
+    client = get_redis()
+    if client is None:
+        return None
+    try:
+        return _versions_from_redis(client, tables)
+    except RedisError:
+        mark_redis_down()
+        return None
+
+
+def get_table_versions(tables: list[str]) -> list[int]:
+    versions = get_shared_table_versions(tables)
+    if versions is not None:
+        return versions
+    return [_local_versions.get(table, 0) for table in tables]
+
+
+def bump_table_versions(tables):
+    tables = sorted(set(tables))
+    if not tables:
+        return
+    with _lock:
+        for table in tables:
+            _local_versions[table] = _local_versions.get(table, 0) + 1
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        pipe = client.pipeline(transaction=False)
+        for table in tables:
+            pipe.incr(cache_key("count_ver", table))
+        pipe.execute()
+    except RedisError:
+        mark_redis_down()
+
+
+def query_tables(query: Query) -> list[str]:
+    return sorted({table.name for table in find_tables(query.statement, include_joins=True)})
+
+
+def query_signature(query: Query) -> str:
+    compiled = query.statement.compile(dialect=query.session.get_bind().dialect)
+    params = sorted((key, str(value)) for key, value in compiled.params.items())
+    raw = json.dumps([str(compiled), params], separators=(",", ":"))
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def estimate_table_rows(db: Session, table: str) -> int | None:
+    if db.get_bind().dialect.name != "mysql":
+        return None
+    value = db.execute(
+        text(
+            "SELECT TABLE_ROWS FROM INFORMATION_SCHEMA.TABLES "
+            "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = :table"
+        ),
+        {"table": table},
+    ).scalar()
+    return int(value) if value is not None else None
+
+
+def cached_count(query: Query) -> int:
+    """Count ``query`` through a short-lived cache keyed by its compiled SQL.
+
+    Entries carry the write versions of every table the query reads, so a
+    committed INSERT, UPDATE or DELETE on any of them, whether issued by the
+    ORM or as a Core statement, invalidates the cached total.
+    """
+    query = query.order_by(None)
+    if settings.count_cache_ttl_seconds <= 0:
+        return query.count()
+    tables = query_tables(query)
+    key = cache_key("count", query_signature(query))
+    client = get_redis()
+    if client is not None:
+        try:
+            versions = _versions_from_redis(client, tables)
+            raw = client.get(key)
+            if raw:
+                entry = json.loads(raw)
+                if entry.get("versions") == versions:
+                    return int(entry["total"])
+            total = query.count()
+            client.set(key, json.dumps({"versions": versions, "total": total}), ex=settings.count_cache_ttl_seconds)
+            return total
+        except RedisError:
+            mark_redis_down()
+    versions = [_local_versions.get(table, 0) for table in tables]
+    entry = _local.get(key)
+    if entry and entry[0] == versions:
+        return entry[1]
+    total = query.count()
+    _local.set(key, (versions, total))
+    return total
+
+
+def filters_soft_deleted(query: Query) -> bool:
+    whereclause = query.statement.whereclause
+    if whereclause is None:
+        return False
+    return any(
+        isinstance(element, Column) and element.name == "is_deleted" for element in visitors.iterate(whereclause)
+    )
+
+
+def count_total(query: Query, estimate: bool = False) -> tuple[int, bool]:
+    """Return ``(total, is_estimate)`` for a list query.
+
+    ``estimate`` should only be passed for unfiltered listings; the table
+    statistics are then used instead of ``COUNT(*)`` once the table is larger
+    than ``count_estimate_min_rows``. Statistics include soft-deleted rows, so
+    a query filtering on ``is_deleted`` is always counted exactly.
+    """
+    if estimate and settings.count_estimate_min_rows > 0 and not filters_soft_deleted(query):
+        tables = query_tables(query)
+        if len(tables) == 1:
+            rows = estimate_table_rows(query.session, tables[0])
+            if rows is not None and rows >= settings.count_estimate_min_rows:
+                return rows, True
+    return cached_count(query), False
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _track_write(conn, cursor, statement, parameters, context, executemany):
+    match = _DML_TABLE.match(statement)
+    if match:
+        conn.info.setdefault(_DIRTY_KEY, set()).add(match.group(1))
+
+
+@event.listens_for(Engine, "commit")
+def _stage_writes(conn):
+    tables = conn.info.pop(_DIRTY_KEY, None)
+    if tables:
+        conn.info.setdefault(_COMMITTED_KEY, set()).update(tables)
+
+
+@event.listens_for(Engine, "rollback")
+def _discard_writes(conn):
+    conn.info.pop(_DIRTY_KEY, None)
+
+
+@event.listens_for(Pool, "checkin")
+def _publish_writes(dbapi_connection, connection_record):
+    # Published once the connection is handed back, i.e. after the COMMIT has
+    # reached the server, so a concurrent count cannot cache pre-commit rows
+    # under the new version.
+    tables = connection_record.info.pop(_COMMITTED_KEY, None) if connection_record else None
+    if tables:
+        bump_table_versions(tables)
@@ -1,18 +1,20 @@
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlalchemy.orm import Session
-from sqlalchemy.orm import joinedload
 
 from app.core.config import settings
 from app.core.database import get_db
-from app.models.user import User
-from app.models.role_permission import RolePermission
+from app.core.permission_cache import collect_grants
+from app.core.principal_cache import get_principal
+from app.schemas.principal import Principal
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
+ASSET_SCOPE_ROLES = {"office_asset_admin": "office", "datacenter_asset_admin": "datacenter"}
 
-def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> User:
+
+def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_scheme)) -> Principal:
     try:
         payload = jwt.decode(token, settings.jwt_secret, algorithms=[settings.jwt_algorithm])
     except JWTError:
@@ -20,19 +22,67 @@ def get_current_user(db: Session = Depends(get_db), token: str = Depends(oauth2_
     user_id = payload.get("user_id")
     if not user_id:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
-    user = (
-        db.query(User)
-        .options(joinedload(User.roles), joinedload(User.role))
-        .filter(User.id == user_id, User.is_deleted == False)
-        .first()
-    )
-    if not user:
+    user = get_principal(db, user_id)
+    if not user or not user.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     return user
 
 
+def collect_active_roles(user) -> tuple[list[int], list[str]]:
+    role_ids = []
+    role_codes = []
+    if user.role_id and user.role and user.role.is_active:
+        role_ids.append(user.role_id)
+        role_codes.append(user.role.code)
+    if user.roles:
+        role_ids.extend([role.id for role in user.roles if role.is_active])
+        role_codes.extend([role.code for role in user.roles if role.is_active])
+    role_ids = list(dict.fromkeys(rid for rid in role_ids if rid))
+    role_codes = list(dict.fromkeys(code for code in role_codes if code))
+    return role_ids, role_codes
+
+
+class EffectivePermissions:
+    def __init__(self, user_id: int, role_ids: list[int], role_codes: list[str], grants: dict[tuple[str, str], str]):
+        self.user_id = user_id
+        self.role_ids = role_ids
+        self.role_codes = set(role_codes)
+        self.grants = grants
+        self.is_super_admin = "super_admin" in self.role_codes
+        self.asset_scopes = {scope for code, scope in ASSET_SCOPE_ROLES.items() if code in self.role_codes}
+
+    def scope(self, resource: str, action: str) -> str | None:
+        if self.is_super_admin:
+            return "all"
+        return self.grants.get((resource, action))
+
+    def has(self, resource: str, action: str) -> bool:
+        return self.scope(resource, action) is not None
+
+    def has_any(self, perms: list[tuple[str, str]]) -> bool:
+        return any(self.has(resource, action) for resource, action in perms)
+
+
+def resolve_permissions(db: Session, user) -> EffectivePermissions:
+    role_ids, role_codes = collect_active_roles(user)
+    grants = {} if "super_admin" in role_codes else collect_grants(db, role_ids)
+    return EffectivePermissions(user.id, role_ids, role_codes, grants)
+
+
+def get_effective_permissions(
+    request: Request,
+    db: Session = Depends(get_db),
+    user: Principal = Depends(get_current_user),
+) -> EffectivePermissions:
+    perms = getattr(request.state, "effective_permissions", None)
+    if perms is None or perms.user_id != user.id:
+        perms = resolve_permissions(db, user)
+        request.state.effective_permissions = perms
+    return perms
+
+
 def require_role(*role_codes: str):
-    def checker(user: User = Depends(get_current_user)) -> User:
+    def checker(user: Principal = Depends(get_current_user)) -> Principal:
         if user.role and user.role.is_active and user.role.code in role_codes:
             return user
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
@@ -42,33 +92,10 @@ def require_role(*role_codes: str):
 
 def require_permission(resource: str, action: str):
     def checker(
-        user: User = Depends(get_current_user),
-        db: Session = Depends(get_db),
-    ) -> User:
-        role_ids = []
-        role_codes = []
-        if user.role_id and user.role and user.role.is_active:
-            role_ids.append(user.role_id)
-            role_codes.append(user.role.code)
-        if user.roles:
-            role_ids.extend([role.id for role in user.roles if role.is_active])
-            role_codes.extend([role.code for role in user.roles if role.is_active])
-        role_ids = list({rid for rid in role_ids if rid})
-        role_codes = list({code for code in role_codes if code})
-        if "super_admin" in role_codes:
-            return user
-        if not role_ids:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-        exists = (
-            db.query(RolePermission)
-            .filter(
-                RolePermission.role_id.in_(role_ids),
-                RolePermission.resource == resource,
-                RolePermission.action == action,
-            )
-            .first()
-        )
-        if exists:
+        user: Principal = Depends(get_current_user),
+        perms: EffectivePermissions = Depends(get_effective_permissions),
+    ) -> Principal:
+        if perms.has(resource, action):
             return user
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
 
@@ -77,66 +104,12 @@ def require_permission(resource: str, action: str):
 
 def require_any_permission(perms: list[tuple[str, str]]):
     def checker(
-        user: User = Depends(get_current_user),
-        db: Session = Depends(get_db),
-    ) -> User:
-        role_ids = []
-        role_codes = []
-        if user.role_id and user.role and user.role.is_active:
-            role_ids.append(user.role_id)
-            role_codes.append(user.role.code)
-        if user.roles:
-            role_ids.extend([role.id for role in user.roles if role.is_active])
-            role_codes.extend([role.code for role in user.roles if role.is_active])
-        role_ids = list({rid for rid in role_ids if rid})
-        role_codes = list({code for code in role_codes if code})
-        if "super_admin" in role_codes:
+        user: Principal = Depends(get_current_user),
+        effective: EffectivePermissions = Depends(get_effective_permissions),
+    ) -> Principal:
+        if effective.has_any(perms):
             return user
-        if not role_ids:
-            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
-        for resource, action in perms:
-            exists = (
-                db.query(RolePermission)
-                .filter(
-                    RolePermission.role_id.in_(role_ids),
-                    RolePermission.resource == resource,
-                    RolePermission.action == action,
-                )
-                .first()
-            )
-            if exists:
-                return user
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Forbidden")
 
     return checker
 
-
-def get_permission_scope(db: Session, user: User, resource: str, action: str) -> str | None:
-    role_ids = []
-    role_codes = []
-    if user.role_id and user.role and user.role.is_active:
-        role_ids.append(user.role_id)
-        role_codes.append(user.role.code)
-    if user.roles:
-        role_ids.extend([role.id for role in user.roles if role.is_active])
-        role_codes.extend([role.code for role in user.roles if role.is_active])
-    role_ids = list({rid for rid in role_ids if rid})
-    role_codes = list({code for code in role_codes if code})
-    if "super_admin" in role_codes:
-        return "all"
-    if not role_ids:
-        return None
-    records = (
-        db.query(RolePermission)
-        .filter(
-            RolePermission.role_id.in_(role_ids),
-            RolePermission.resource == resource,
-            RolePermission.action == action,
-        )
-        .all()
-    )
-    if not records:
-        return None
-    if any((rec.scope or "all") == "all" for rec in records):
-        return "all"
-    return "own"
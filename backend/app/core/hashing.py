@@ -0,0 +1,161 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from fastapi import HTTPException, status
+
+from app.core.config import settings
+
+_executor: ProcessPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_slots = threading.BoundedSemaphore(max(settings.password_hash_max_pending, 1))
+_stats_lock = threading.Lock()
+_stats = {
+    "completed": 0,
+    "rejected": 0,
+    "failed": 0,
+    "in_flight": 0,
+    "queue_wait_ms_total": 0.0,
+    "queue_wait_ms_max": 0.0,
+    "run_ms_total": 0.0,
+}
+
+
+def _get_executor() -> ProcessPoolExecutor | None:
+    global _executor
+    if settings.password_hash_workers <= 0:
+        return None
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=settings.password_hash_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _executor
+
+
+def _reset_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+def _timed_call(func, *args):
+    started_at = time.time()
+    result = func(*args)
+    return result, started_at, time.time()
+
+
+def _record(key: str, value: float = 1):
+    with _stats_lock:
+        _stats[key] += value
+
+
+def _reject():
+    _record("rejected")
+    raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Password service busy")
+
+
+def _broken():
+    _reset_executor()
+    _record("failed")
+    raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Password service unavailable")
+
+
+def _record_timing(requested_at: float, started_at: float, finished_at: float):
+    queue_wait_ms = max(started_at - requested_at, 0) * 1000
+    with _stats_lock:
+        _stats["completed"] += 1
+        _stats["queue_wait_ms_total"] += queue_wait_ms
+        _stats["queue_wait_ms_max"] = max(_stats["queue_wait_ms_max"], queue_wait_ms)
+        _stats["run_ms_total"] += (finished_at - started_at) * 1000
+
+
+def run_hash_task(func, *args):
+    requested_at = time.time()
+    if not _slots.acquire(timeout=settings.password_hash_wait_seconds):
+        _reject()
+    _record("in_flight")
+    try:
+        executor = _get_executor()
+        if executor is None:
+            result, started_at, finished_at = _timed_call(func, *args)
+        else:
+            try:
+                result, started_at, finished_at = executor.submit(_timed_call, func, *args).result()
+            except BrokenProcessPool:
+                _broken()
+    finally:
+        _record("in_flight", -1)
+        _slots.release()
+    _record_timing(requested_at, started_at, finished_at)
+    return result
+
+
+async def _acquire_slot_async() -> bool:
+    deadline = time.monotonic() + settings.password_hash_wait_seconds
+    delay = 0.005
+    while not _slots.acquire(blocking=False):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        await asyncio.sleep(min(delay, remaining))
+        delay = min(delay * 2, 0.05)
+    return True
+
+
+async def run_hash_task_async(func, *args):
+    """Like ``run_hash_task`` for async endpoints: no thread waits on the work.
+
+    Slots are shared with the sync path; a full pool is polled from the
+    event loop for up to ``password_hash_wait_seconds`` before rejecting,
+    and the result is awaited on the event loop.
+    """
+    requested_at = time.time()
+    if not await _acquire_slot_async():
+        _reject()
+    _record("in_flight")
+    try:
+        executor = _get_executor()
+        try:
+            if executor is None:
+                loop = asyncio.get_running_loop()
+                result, started_at, finished_at = await loop.run_in_executor(None, _timed_call, func, *args)
+            else:
+                result, started_at, finished_at = await asyncio.wrap_future(
+                    executor.submit(_timed_call, func, *args)
+                )
+        except BrokenProcessPool:
+            _broken()
+    finally:
+        _record("in_flight", -1)
+        _slots.release()
+    _record_timing(requested_at, started_at, finished_at)
+    return result
+
+
+def get_hash_pool_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    completed = stats["completed"] or 1
+    return {
+        "workers": settings.password_hash_workers,
+        "max_pending": settings.password_hash_max_pending,
+        "rounds": settings.password_hash_rounds,
+        "completed": stats["completed"],
+        "rejected": stats["rejected"],
+        "failed": stats["failed"],
+        "in_flight": stats["in_flight"],
+        "queue_wait_ms_avg": round(stats["queue_wait_ms_total"] / completed, 2),
+        "queue_wait_ms_max": round(stats["queue_wait_ms_max"], 2),
+        "run_ms_avg": round(stats["run_ms_total"] / completed, 2),
+    }
+
+
+def shutdown_hash_pool():
+    _reset_executor()
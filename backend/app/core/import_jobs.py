@@ -0,0 +1,302 @@
+import os
+import shutil
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from openpyxl import load_workbook
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.import_job import ImportJob
+from app.schemas.import_job import ImportJobOut
+from app.utils.asset_import import AssetImporter, ImportCancelled
+
+ACTIVE_STATUSES = ("pending", "running")
+CLEANUP_INTERVAL_SECONDS = 600
+
+# Identifies this process on the jobs it queues; its maintenance thread
+# heartbeats them so other processes can tell live jobs from orphans.
+INSTANCE_ID = uuid.uuid4().hex
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+_maintainer: threading.Thread | None = None
+_stop = threading.Event()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max(settings.import_workers, 1),
+                thread_name_prefix="import-job",
+            )
+        return _executor
+
+
+def shutdown_import_jobs():
+    global _executor, _maintainer
+    _stop.set()
+    _maintainer = None
+    with _executor_lock:
+        executor = _executor
+        _executor = None
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _job_dir() -> str:
+    os.makedirs(settings.import_dir, exist_ok=True)
+    return settings.import_dir
+
+
+def to_job_out(job: ImportJob) -> ImportJobOut:
+    rows_per_second = None
+    if job.started_at:
+        elapsed = ((job.finished_at or datetime.utcnow()) - job.started_at).total_seconds()
+        if elapsed > 0:
+            rows_per_second = round(job.processed_rows / elapsed, 1)
+    return ImportJobOut(
+        id=job.id,
+        kind=job.kind,
+        status=job.status,
+        filename=job.filename,
+        total_rows=job.total_rows,
+        processed_rows=job.processed_rows or 0,
+        created_rows=job.created_rows or 0,
+        error_rows=job.error_rows or 0,
+        rows_per_second=rows_per_second,
+        has_errors=bool(job.error_path),
+        message=job.message,
+        cancel_requested=bool(job.cancel_requested),
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+    )
+
+
+def create_import_job(db: Session, kind: str, filename: str, fileobj, operator_id: int) -> ImportJob:
+    job_id = uuid.uuid4().hex
+    file_path = os.path.join(_job_dir(), f"{job_id}.xlsx")
+    with open(file_path, "wb") as target:
+        shutil.copyfileobj(fileobj, target)
+    job = ImportJob(
+        id=job_id,
+        kind=kind,
+        status="pending",
+        filename=filename,
+        file_path=file_path,
+        operator_id=operator_id,
+        owner=INSTANCE_ID,
+        heartbeat_at=datetime.utcnow(),
+    )
+    db.add(job)
+    db.commit()
+    db.refresh(job)
+    _get_executor().submit(run_import_job, job_id)
+    return job
+
+
+def _count_rows(file_path: str) -> int | None:
+    workbook = load_workbook(file_path, read_only=True)
+    try:
+        max_row = workbook.worksheets[0].max_row
+        return max(max_row - 1, 0) if max_row else None
+    finally:
+        workbook.close()
+
+
+def _update_job(job_id: str, **values) -> ImportJob | None:
+    db = SessionLocal()
+    try:
+        job = db.query(ImportJob).filter(ImportJob.id == job_id).first()
+        if job is None:
+            return None
+        for key, value in values.items():
+            setattr(job, key, value)
+        db.commit()
+        db.refresh(job)
+        db.expunge(job)
+        return job
+    finally:
+        db.close()
+
+
+def run_import_job(job_id: str):
+    job = _update_job(job_id, status="running", started_at=datetime.utcnow())
+    if job is None:
+        return
+    if job.cancel_requested:
+        _finish(job, None, "cancelled", "Cancelled before start")
+        return
+    db = SessionLocal()
+    importer = None
+    try:
+        _update_job(job_id, total_rows=_count_rows(job.file_path))
+        importer = AssetImporter(db, job.operator_id)
+
+        def report(current: AssetImporter):
+            state = _update_job(
+                job_id,
+                processed_rows=current.processed,
+                created_rows=current.created,
+                error_rows=len(current.errors),
+            )
+            if state is not None and state.cancel_requested:
+                raise ImportCancelled()
+
+        importer.run(job.file_path, progress=report)
+        _finish(job, importer, "completed", f"Imported {importer.created} assets")
+    except ImportCancelled:
+        _finish(job, importer, "cancelled", "Cancelled; rows already committed were kept")
+    except ValueError as exc:
+        db.rollback()
+        _finish(job, importer, "failed", str(exc))
+    except Exception as exc:
+        db.rollback()
+        _finish(job, importer, "failed", f"Import failed: {exc}"[:500])
+    finally:
+        db.close()
+
+
+def _finish(job: ImportJob, importer: AssetImporter | None, status: str, message: str):
+    values = {"status": status, "message": message, "finished_at": datetime.utcnow()}
+    if importer is not None:
+        values.update(
+            processed_rows=importer.processed,
+            created_rows=importer.created,
+            error_rows=len(importer.errors),
+        )
+        if importer.errors:
+            error_path = os.path.join(_job_dir(), f"{job.id}_errors.xlsx")
+            importer.error_workbook(error_path)
+            values["error_path"] = error_path
+    if job.file_path and os.path.exists(job.file_path):
+        os.remove(job.file_path)
+    _update_job(job.id, **values)
+
+
+def _remove_file(path: str | None):
+    if path and os.path.exists(path):
+        os.remove(path)
+
+
+def heartbeat_jobs():
+    db = SessionLocal()
+    try:
+        db.query(ImportJob).filter(
+            ImportJob.owner == INSTANCE_ID, ImportJob.status.in_(ACTIVE_STATUSES)
+        ).update({ImportJob.heartbeat_at: datetime.utcnow()}, synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def fail_stale_jobs() -> int:
+    """Fail active jobs whose owning process stopped heartbeating.
+
+    Jobs queued by this process are never touched, and jobs of other live
+    processes or replicas stay fresh, so only jobs orphaned by a crash or
+    restart are failed.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=settings.import_stale_seconds)
+    db = SessionLocal()
+    try:
+        jobs = (
+            db.query(ImportJob)
+            .filter(
+                ImportJob.status.in_(ACTIVE_STATUSES),
+                or_(ImportJob.owner.is_(None), ImportJob.owner != INSTANCE_ID),
+                func.coalesce(ImportJob.heartbeat_at, ImportJob.updated_at, ImportJob.created_at) < cutoff,
+            )
+            .all()
+        )
+        for job in jobs:
+            _remove_file(job.file_path)
+            job.status = "failed"
+            job.message = "Interrupted: the server running this import stopped"
+            job.finished_at = datetime.utcnow()
+        db.commit()
+        return len(jobs)
+    finally:
+        db.close()
+
+
+def cleanup_job_files() -> int:
+    """Delete uploads and error workbooks past IMPORT_RETENTION_HOURS.
+
+    Finished jobs keep their row but lose ``error_path``; files in the
+    import directory that no active job refers to are removed by age.
+    """
+    cutoff = datetime.utcnow() - timedelta(hours=settings.import_retention_hours)
+    removed = 0
+    db = SessionLocal()
+    try:
+        jobs = (
+            db.query(ImportJob)
+            .filter(
+                ImportJob.status.notin_(ACTIVE_STATUSES),
+                ImportJob.finished_at < cutoff,
+                or_(ImportJob.error_path.isnot(None), ImportJob.file_path.isnot(None)),
+            )
+            .all()
+        )
+        for job in jobs:
+            for path in (job.error_path, job.file_path):
+                if path and os.path.exists(path):
+                    os.remove(path)
+                    removed += 1
+            job.error_path = None
+            job.file_path = None
+        db.commit()
+        active = {
+            row.file_path
+            for row in db.query(ImportJob.file_path).filter(ImportJob.status.in_(ACTIVE_STATUSES)).all()
+        }
+    finally:
+        db.close()
+    oldest = time.time() - settings.import_retention_hours * 3600
+    for name in os.listdir(_job_dir()):
+        path = os.path.join(settings.import_dir, name)
+        if path in active or not os.path.isfile(path) or os.path.getmtime(path) >= oldest:
+            continue
+        os.remove(path)
+        removed += 1
+    return removed
+
+
+def _maintain(cleanup: bool):
+    tasks = [heartbeat_jobs, fail_stale_jobs] + ([cleanup_job_files] if cleanup else [])
+    for task in tasks:
+        try:
+            task()
+        except Exception:
+            # Retried on the next tick; a transient database error must not
+            # stop the heartbeat.
+            pass
+
+
+def _run_maintainer():
+    last_cleanup = time.monotonic()
+    while not _stop.wait(max(settings.import_heartbeat_seconds, 1)):
+        cleanup = time.monotonic() - last_cleanup >= CLEANUP_INTERVAL_SECONDS
+        _maintain(cleanup)
+        if cleanup:
+            last_cleanup = time.monotonic()
+
+
+def start_import_maintenance():
+    """Fail orphaned jobs, purge expired files and keep heartbeating."""
+    global _maintainer
+    _maintain(cleanup=True)
+    if _maintainer is not None and _maintainer.is_alive():
+        return
+    _stop.clear()
+    _maintainer = threading.Thread(target=_run_maintainer, name="import-job-maintainer", daemon=True)
+    _maintainer.start()
@@ -0,0 +1,323 @@
+import gzip
+import heapq
+import json
+import os
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import chain
+
+from sqlalchemy import func, insert, text
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models.asset_log import AssetLog
+from app.models.asset_log_archive import AssetLogArchive, AssetLogArchiveOperator
+
+_archiver: threading.Thread | None = None
+_stop = threading.Event()
+_lock = threading.Lock()
+_LOCK_NAME = "assethub_log_archive"
+_state = {"last_run_at": None, "last_error": None}
+
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+
+
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def archive_cutoff(now: datetime | None = None) -> datetime:
+    """Rows created before this month boundary are archived."""
+    return add_months(month_start(now or datetime.utcnow()), -max(settings.audit_log_hot_months, 1))
+
+
+def _archive_dir() -> str:
+    """The archive directory; it must already exist and be writable.
+
+    It is deliberately not created here: a directory that only exists in
+    the container's own filesystem would lose rows already deleted from
+    MySQL when the container is recreated.
+    """
+    path = settings.audit_log_archive_dir
+    if not os.path.isdir(path) or not os.access(path, os.W_OK):
+        raise ValueError(f"Log archive directory {path} is missing or not writable; mount persistent storage there")
+    return path
+
+
+def _row_json(row) -> str:
+    return json.dumps(
+        {
+            "id": row.id,
+            "asset_id": row.asset_id,
+            "operator_id": row.operator_id,
+            "action_type": row.action_type,
+            "change_data": row.change_data,
+            "created_at": row.created_at.isoformat(),
+        },
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    )
+
+
+def _delete_archived(db: Session, start: datetime, end: datetime, max_id: int, batch_size: int) -> int:
+    deleted = 0
+    while True:
+        ids = [
+            row.id
+            for row in db.query(AssetLog.id)
+            .filter(AssetLog.created_at >= start, AssetLog.created_at < end, AssetLog.id <= max_id)
+            .order_by(AssetLog.id.asc())
+            .limit(batch_size)
+            .all()
+        ]
+        if not ids:
+            return deleted
+        db.query(AssetLog).filter(AssetLog.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+        deleted += len(ids)
+
+
+def _add_operators(db: Session, archive: AssetLogArchive, operator_ids):
+    if operator_ids:
+        db.execute(
+            insert(AssetLogArchiveOperator),
+            [{"archive_id": archive.id, "operator_id": operator_id} for operator_id in sorted(operator_ids)],
+        )
+
+
+def index_archive_operators():
+    """Record the operators of archives written before operators were tracked."""
+    db = SessionLocal()
+    try:
+        archives = (
+            db.query(AssetLogArchive)
+            .filter(~AssetLogArchive.id.in_(db.query(AssetLogArchiveOperator.archive_id)))
+            .all()
+        )
+        for archive in archives:
+            operator_ids = {record["operator_id"] for record in _archived_records(archive, {}, None)}
+            _add_operators(db, archive, operator_ids)
+            db.commit()
+    finally:
+        db.close()
+
+
+def archive_period(db: Session, start: datetime, batch_size: int | None = None) -> AssetLogArchive | None:
+    """Export one month of asset_logs to gzip JSONL and drop it from the hot table.
+
+    The file is written under a temporary name and renamed, and the archive
+    row is committed before any delete. A run interrupted after that point
+    only repeats the deletes; rows that arrive later for an archived month
+    go into an extra part file.
+    """
+    batch_size = batch_size or settings.audit_log_archive_batch_size
+    end = add_months(start, 1)
+    period = start.strftime("%Y-%m")
+    for archive in db.query(AssetLogArchive).filter(AssetLogArchive.period == period).all():
+        if archive.max_id is not None:
+            _delete_archived(db, start, end, archive.max_id, batch_size)
+    part = db.query(func.count(AssetLogArchive.id)).filter(AssetLogArchive.period == period).scalar() + 1
+    name = f"asset_logs-{period}.jsonl.gz" if part == 1 else f"asset_logs-{period}.part{part}.jsonl.gz"
+    path = os.path.join(_archive_dir(), name)
+    temp_path = f"{path}.tmp"
+    row_count = 0
+    min_id = max_id = None
+    last_id = 0
+    operator_ids = set()
+    with gzip.open(temp_path, "wt", encoding="utf-8") as target:
+        while True:
+            rows = (
+                db.query(AssetLog)
+                .filter(AssetLog.created_at >= start, AssetLog.created_at < end, AssetLog.id > last_id)
+                .order_by(AssetLog.id.asc())
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+            for row in rows:
+                target.write(_row_json(row))
+                target.write("\n")
+                operator_ids.add(row.operator_id)
+            row_count += len(rows)
+            min_id = rows[0].id if min_id is None else min_id
+            max_id = last_id = rows[-1].id
+            db.expunge_all()
+    if not row_count:
+        os.remove(temp_path)
+        return None
+    os.replace(temp_path, path)
+    archive = AssetLogArchive(
+        period=period,
+        start_at=start,
+        end_at=end,
+        path=path,
+        row_count=row_count,
+        min_id=min_id,
+        max_id=max_id,
+        size_bytes=os.path.getsize(path),
+    )
+    db.add(archive)
+    db.flush()
+    _add_operators(db, archive, operator_ids)
+    db.commit()
+    _delete_archived(db, start, end, max_id, batch_size)
+    return archive
+
+
+@contextmanager
+def _archive_lock(db: Session):
+    """Yield whether this run may archive: one run per process and, on MySQL,
+    one across all processes sharing the database (``GET_LOCK`` is held on a
+    connection of its own, since the session releases its connection on
+    every commit)."""
+    if not _lock.acquire(blocking=False):
+        yield False
+        return
+    try:
+        bind = db.get_bind()
+        if bind.dialect.name != "mysql":
+            yield True
+            return
+        with bind.connect() as connection:
+            acquired = connection.execute(text("SELECT GET_LOCK(:name, 0)"), {"name": _LOCK_NAME}).scalar() == 1
+            try:
+                yield acquired
+            finally:
+                if acquired:
+                    connection.execute(text("SELECT RELEASE_LOCK(:name)"), {"name": _LOCK_NAME})
+    finally:
+        _lock.release()
+
+
+def archive_old_logs(before: datetime | None = None) -> list[dict]:
+    """Archive every month older than ``before`` (default: the hot window).
+
+    Returns an empty list when another run holds the archive lock.
+    """
+    cutoff = month_start(before) if before else archive_cutoff()
+    _archive_dir()
+    db = SessionLocal()
+    try:
+        with _archive_lock(db) as acquired:
+            if not acquired:
+                return []
+            oldest = db.query(func.min(AssetLog.created_at)).filter(AssetLog.created_at < cutoff).scalar()
+            results = []
+            start = month_start(oldest) if oldest else cutoff
+            # A shutdown stops the run between months; the rest is picked up next time.
+            while start < cutoff and not _stop.is_set():
+                archive = archive_period(db, start)
+                if archive is not None:
+                    results.append({"period": archive.period, "rows": archive.row_count, "path": archive.path})
+                start = add_months(start, 1)
+            return results
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _matches(record: dict, filters: dict) -> bool:
+    if filters.get("asset_ids") is not None and record["asset_id"] not in filters["asset_ids"]:
+        return False
+    if filters.get("operator_ids") is not None and record["operator_id"] not in filters["operator_ids"]:
+        return False
+    if filters.get("actions") and record["action_type"] not in filters["actions"]:
+        return False
+    if filters.get("start") and record["created_at"] < filters["start"]:
+        return False
+    if filters.get("end") and record["created_at"] >= filters["end"]:
+        return False
+    return True
+
+
+def _record_key(record: dict) -> tuple:
+    return record["created_at"], record["id"]
+
+
+def _archived_records(archive: AssetLogArchive, filters: dict, before: tuple | None):
+    if not os.path.exists(archive.path):
+        return
+    with gzip.open(archive.path, "rt", encoding="utf-8") as source:
+        for line in source:
+            record = json.loads(line)
+            record["created_at"] = datetime.fromisoformat(record["created_at"])
+            if not _matches(record, filters):
+                continue
+            if before and _record_key(record) >= before:
+                continue
+            yield record
+
+
+def read_archived_logs(db: Session, filters: dict, before: tuple | None, limit: int) -> list[AssetLog]:
+    """Read archived rows newest first, as transient AssetLog objects.
+
+    ``filters`` takes asset_ids, operator_ids, actions, start and end (any
+    may be None); ``before`` is the ``(created_at, id)`` of the last row
+    already returned. Only the months overlapping the range are opened,
+    newest first, and each is streamed keeping just the top ``limit`` rows.
+    """
+    query = db.query(AssetLogArchive)
+    upper = before[0] if before else None
+    if filters.get("end") and (upper is None or filters["end"] < upper):
+        upper = filters["end"]
+    if upper is not None:
+        query = query.filter(AssetLogArchive.start_at <= upper)
+    if filters.get("start"):
+        query = query.filter(AssetLogArchive.end_at > filters["start"])
+    archives = query.order_by(AssetLogArchive.start_at.desc(), AssetLogArchive.id.desc()).all()
+    periods: dict[str, list[AssetLogArchive]] = {}
+    for archive in archives:
+        periods.setdefault(archive.period, []).append(archive)
+    result = []
+    for files in periods.values():
+        records = chain.from_iterable(_archived_records(archive, filters, before) for archive in files)
+        result.extend(AssetLog(**record) for record in heapq.nlargest(limit - len(result), records, key=_record_key))
+        if len(result) >= limit:
+            break
+    return result
+
+
+def _archive_and_record():
+    try:
+        archive_old_logs()
+        _state["last_error"] = None
+    except Exception as exc:
+        _state["last_error"] = f"{type(exc).__name__}: {exc}"[:500]
+    _state["last_run_at"] = datetime.utcnow()
+
+
+def _run_archiver():
+    _archive_and_record()
+    while not _stop.wait(max(settings.audit_log_archive_interval_hours, 1) * 3600):
+        _archive_and_record()
+
+
+def get_log_archive_state() -> dict:
+    return dict(_state)
+
+
+def start_log_archiver():
+    global _archiver
+    if not settings.audit_log_archive_enabled or (_archiver is not None and _archiver.is_alive()):
+        return
+    _stop.clear()
+    _archiver = threading.Thread(target=_run_archiver, name="asset-log-archiver", daemon=True)
+    _archiver.start()
+
+
+def stop_log_archiver(timeout: float = 10):
+    global _archiver
+    if _archiver is None:
+        return
+    _stop.set()
+    _archiver.join(timeout)
+    _archiver = None
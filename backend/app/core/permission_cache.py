@@ -0,0 +1,85 @@
+import threading
+import time
+
+from redis.exceptions import RedisError
+from sqlalchemy.orm import Session
+
+from app.core.cache import cache_key, get_redis, mark_redis_down
+from app.core.config import settings
+from app.models.role_permission import RolePermission
+
+_lock = threading.Lock()
+_table: dict[int, dict[tuple[str, str], str]] = {}
+_version = 0
+_loaded_version: tuple[int, int] | None = None
+_loaded_at = 0.0
+
+
+def bump_permission_version():
+    global _version
+    with _lock:
+        _version += 1
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.incr(cache_key("permission_ver"))
+    except RedisError:
+        mark_redis_down()
+
+
+def get_permission_version() -> tuple[int, int]:
+    shared = 0
+    client = get_redis()
+    if client is not None:
+        try:
+            shared = int(client.get(cache_key("permission_ver")) or 0)
+        except RedisError:
+            mark_redis_down()
+    return shared, _version
+
+
+def _is_stale(version: tuple[int, int]) -> bool:
+    if _loaded_version != version:
+        return True
+    ttl = settings.permission_cache_ttl_seconds
+    return ttl > 0 and time.monotonic() - _loaded_at > ttl
+
+
+def _compile(db: Session) -> dict[int, dict[tuple[str, str], str]]:
+    table: dict[int, dict[tuple[str, str], str]] = {}
+    rows = db.query(RolePermission.role_id, RolePermission.resource, RolePermission.action, RolePermission.scope).all()
+    for role_id, resource, action, scope in rows:
+        perms = table.setdefault(role_id, {})
+        key = (resource, action)
+        scope = scope or "all"
+        if perms.get(key) != "all":
+            perms[key] = scope
+    return table
+
+
+def get_permission_table(db: Session) -> dict[int, dict[tuple[str, str], str]]:
+    global _table, _loaded_version, _loaded_at
+    version = get_permission_version()
+    if not _is_stale(version):
+        return _table
+    with _lock:
+        if not _is_stale(version):
+            return _table
+        table = _compile(db)
+        _table = table
+        _loaded_version = version
+        _loaded_at = time.monotonic()
+        return table
+
+
+def collect_grants(db: Session, role_ids: list[int]) -> dict[tuple[str, str], str]:
+    if not role_ids:
+        return {}
+    table = get_permission_table(db)
+    grants: dict[tuple[str, str], str] = {}
+    for role_id in role_ids:
+        for key, scope in table.get(role_id, {}).items():
+            if grants.get(key) != "all":
+                grants[key] = "all" if scope == "all" else "own"
+    return grants
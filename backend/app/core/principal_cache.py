@@ -0,0 +1,112 @@
+import json
+import threading
+
+from redis.exceptions import RedisError
+from sqlalchemy.orm import Session, joinedload
+
+from app.core.cache import LRUCache, cache_key, get_redis, mark_redis_down
+from app.core.config import settings
+from app.models.user import User
+from app.schemas.principal import Principal, PrincipalRole
+
+_local = LRUCache(settings.principal_cache_size, settings.principal_cache_local_ttl_seconds)
+_local_versions: dict[int, int] = {}
+_local_global_version = 0
+_lock = threading.Lock()
+
+
+def _to_principal(user: User) -> Principal:
+    role = None
+    if user.role:
+        role = PrincipalRole(id=user.role.id, code=user.role.code, is_active=bool(user.role.is_active))
+    return Principal(
+        id=user.id,
+        username=user.username,
+        full_name=user.full_name,
+        role_id=user.role_id,
+        dept=user.dept,
+        asset_scope=user.asset_scope,
+        is_active=bool(user.is_active),
+        role=role,
+        roles=[PrincipalRole(id=item.id, code=item.code, is_active=bool(item.is_active)) for item in user.roles],
+    )
+
+
+def _load_principal(db: Session, user_id: int) -> Principal | None:
+    user = (
+        db.query(User)
+        .options(joinedload(User.roles), joinedload(User.role))
+        .filter(User.id == user_id, User.is_deleted == False, User.is_active == True)
+        .first()
+    )
+    if not user:
+        return None
+    return _to_principal(user)
+
+
+def _get_from_redis(client, db: Session, user_id: int) -> Principal | None:
+    entry_key = cache_key("principal", user_id)
+    raw, user_version, global_version = client.mget(
+        entry_key,
+        cache_key("principal_ver", user_id),
+        cache_key("principal_ver"),
+    )
+    versions = [int(user_version or 0), int(global_version or 0)]
+    if raw:
+        entry = json.loads(raw)
+        if entry.get("versions") == versions:
+            return Principal.model_validate(entry["principal"])
+    principal = _load_principal(db, user_id)
+    if principal is None:
+        return None
+    entry = {"versions": versions, "principal": principal.model_dump()}
+    client.set(entry_key, json.dumps(entry), ex=settings.principal_cache_ttl_seconds)
+    return principal
+
+
+def _get_from_local(db: Session, user_id: int) -> Principal | None:
+    versions = (_local_versions.get(user_id, 0), _local_global_version)
+    entry = _local.get(user_id)
+    if entry and entry[0] == versions:
+        return entry[1]
+    principal = _load_principal(db, user_id)
+    if principal is not None:
+        _local.set(user_id, (versions, principal))
+    return principal
+
+
+def get_principal(db: Session, user_id: int) -> Principal | None:
+    client = get_redis()
+    if client is not None:
+        try:
+            return _get_from_redis(client, db, user_id)
+        except RedisError:
+            mark_redis_down()
+    return _get_from_local(db, user_id)
+
+
+def invalidate_principal(user_id: int):
+    with _lock:
+        _local_versions[user_id] = _local_versions.get(user_id, 0) + 1
+    _local.delete(user_id)
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.incr(cache_key("principal_ver", user_id))
+    except RedisError:
+        mark_redis_down()
+
+
+def invalidate_all_principals():
+    global _local_global_version
+    with _lock:
+        _local_global_version += 1
+    _local.clear()
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        client.incr(cache_key("principal_ver"))
+    except RedisError:
+        mark_redis_down()
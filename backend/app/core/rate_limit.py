@@ -0,0 +1,153 @@
+import threading
+import time
+import uuid
+from collections import deque
+
+from fastapi import HTTPException, Request, status
+from redis.exceptions import RedisError
+
+from app.core.cache import LRUCache, cache_key, get_redis, mark_redis_down
+from app.core.config import settings
+
+_local = LRUCache(settings.login_throttle_local_size, settings.login_rate_window_seconds)
+_local_lock = threading.Lock()
+_stats_lock = threading.Lock()
+_stats = {
+    "rejected_username": 0,
+    "rejected_ip": 0,
+    "attempts_recorded": 0,
+}
+
+
+def client_ip(request: Request) -> str:
+    if settings.trust_proxy_headers:
+        forwarded = request.headers.get("x-real-ip") or request.headers.get("x-forwarded-for", "").split(",")[0]
+        if forwarded.strip():
+            return forwarded.strip()
+    return request.client.host if request.client else "unknown"
+
+
+def _keys(username: str, ip: str) -> list[tuple[str, str, int]]:
+    return [
+        ("username", cache_key("login_fail", "user", username.lower()), settings.login_max_failures_per_user),
+        ("ip", cache_key("login_fail", "ip", ip), settings.login_max_failures_per_ip),
+    ]
+
+
+def _redis_add(client, keys: list[str], member: str, now: float) -> list[int]:
+    # One MULTI/EXEC per attempt: prune, add, count. Parallel attempts each
+    # see the others, so a burst cannot all pass before any is counted.
+    pipe = client.pipeline(transaction=True)
+    for key in keys:
+        pipe.zremrangebyscore(key, 0, now - settings.login_rate_window_seconds)
+        pipe.zadd(key, {member: now})
+        pipe.zcard(key)
+        pipe.expire(key, settings.login_rate_window_seconds)
+    results = pipe.execute()
+    return [int(count) for count in results[2::4]]
+
+
+def _local_add(keys: list[str], member: str, now: float) -> list[int]:
+    counts = []
+    with _local_lock:
+        for key in keys:
+            events = _local.get(key)
+            if events is None:
+                events = deque()
+            while events and events[0][0] <= now - settings.login_rate_window_seconds:
+                events.popleft()
+            events.append((now, member))
+            _local.set(key, events)
+            counts.append(len(events))
+    return counts
+
+
+def begin_login_attempt(username: str, ip: str) -> str:
+    """Count a login attempt against the username and IP limits before the
+    password is checked, or raise 429 if either limit is already reached.
+
+    Returns the attempt id. A failed login simply leaves the attempt in
+    place; ``release_login_attempt`` drops one that should not count and
+    ``reset_login_failures`` clears the username after a successful login.
+    """
+    now = time.time()
+    member = f"{now}:{uuid.uuid4().hex[:8]}"
+    entries = _keys(username, ip)
+    keys = [key for _, key, _ in entries]
+    counts = None
+    client = get_redis()
+    if client is not None:
+        try:
+            counts = _redis_add(client, keys, member, now)
+        except RedisError:
+            mark_redis_down()
+    if counts is None:
+        counts = _local_add(keys, member, now)
+    for (kind, _, limit), count in zip(entries, counts):
+        if limit > 0 and count > limit:
+            release_login_attempt(username, ip, member)
+            with _stats_lock:
+                _stats[f"rejected_{kind}"] += 1
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many failed login attempts",
+                headers={"Retry-After": str(settings.login_rate_window_seconds)},
+            )
+    with _stats_lock:
+        _stats["attempts_recorded"] += 1
+    return member
+
+
+def release_login_attempt(username: str, ip: str, member: str):
+    keys = [key for _, key, _ in _keys(username, ip)]
+    with _local_lock:
+        for key in keys:
+            events = _local.get(key)
+            if events:
+                _local.set(key, deque(event for event in events if event[1] != member))
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        pipe = client.pipeline(transaction=False)
+        for key in keys:
+            pipe.zrem(key, member)
+        pipe.execute()
+    except RedisError:
+        mark_redis_down()
+
+
+def reset_login_failures(username: str, ip: str, member: str):
+    """Clear the username's failures after a successful login.
+
+    Only this attempt is dropped from the IP window: other usernames' failures
+    from the same address keep counting, so valid logins in between cannot be
+    used to reset the IP limit.
+    """
+    (_, user_key, _), (_, ip_key, _) = _keys(username, ip)
+    with _local_lock:
+        _local.delete(user_key)
+        events = _local.get(ip_key)
+        if events:
+            _local.set(ip_key, deque(event for event in events if event[1] != member))
+    client = get_redis()
+    if client is None:
+        return
+    try:
+        pipe = client.pipeline(transaction=False)
+        pipe.delete(user_key)
+        pipe.zrem(ip_key, member)
+        pipe.execute()
+    except RedisError:
+        mark_redis_down()
+
+
+def get_login_throttle_stats() -> dict:
+    with _stats_lock:
+        stats = dict(_stats)
+    return {
+        "window_seconds": settings.login_rate_window_seconds,
+        "max_failures_per_user": settings.login_max_failures_per_user,
+        "max_failures_per_ip": settings.login_max_failures_per_ip,
+        **stats,
+    }
@@ -0,0 +1,166 @@
+from datetime import datetime
+
+from sqlalchemy import delete, event, insert, select, update
+from sqlalchemy.orm import Session
+
+from app.models.asset import Asset
+from app.models.category import Category
+from app.models.license import License
+from app.models.person import Person
+from app.models.search_document import SearchDocument
+from app.models.system_app import SystemApp
+
+ENTITY_TYPES = {
+    Asset: "asset",
+    License: "license",
+    SystemApp: "system",
+    Person: "person",
+}
+
+
+def _join(*parts) -> str:
+    return " ".join(str(part) for part in parts if part not in (None, ""))
+
+
+def _owner_id(value) -> int | None:
+    text = str(value or "").strip()
+    return int(text) if text.isdigit() else None
+
+
+def build_document(entity, category_scopes: dict[int, str | None] | None = None) -> dict | None:
+    """Flatten one entity into a search document row, or None if it should not be indexed."""
+    if getattr(entity, "is_deleted", False):
+        return None
+    if isinstance(entity, Asset):
+        return {
+            "entity_type": "asset",
+            "entity_id": entity.id,
+            "title": entity.name,
+            "subtitle": entity.asset_no,
+            "body": _join(entity.sn, entity.asset_no, entity.name, entity.category, entity.location, entity.dept),
+            "scope": (category_scopes or {}).get(entity.category_id),
+            "owner_id": entity.user_id,
+            "owner_id_b": None,
+        }
+    if isinstance(entity, License):
+        return {
+            "entity_type": "license",
+            "entity_id": entity.id,
+            "title": entity.software_name,
+            "subtitle": _join(entity.vendor, entity.version) or None,
+            "body": _join(
+                entity.software_name,
+                entity.vendor,
+                entity.version,
+                entity.category,
+                entity.supplier,
+                entity.order_no,
+            ),
+            "scope": None,
+            "owner_id": None,
+            "owner_id_b": None,
+        }
+    if isinstance(entity, SystemApp):
+        return {
+            "entity_type": "system",
+            "entity_id": entity.id,
+            "title": entity.app_name or entity.app_code,
+            "subtitle": entity.app_code,
+            "body": _join(entity.app_name, entity.app_code, entity.app_category, entity.access_url, entity.biz_owner),
+            "scope": None,
+            "owner_id": _owner_id(entity.ops_owner),
+            "owner_id_b": _owner_id(entity.ops_owner_b),
+        }
+    if isinstance(entity, Person):
+        return {
+            "entity_type": "person",
+            "entity_id": entity.id,
+            "title": entity.name,
+            "subtitle": entity.emp_code,
+            "body": _join(entity.name, entity.emp_code, entity.phone, entity.email),
+            "scope": None,
+            "owner_id": None,
+            "owner_id_b": None,
+        }
+    return None
+
+
+def load_category_scopes(connection, category_ids) -> dict[int, str | None]:
+    category_ids = {category_id for category_id in category_ids if category_id}
+    if not category_ids:
+        return {}
+    rows = connection.execute(
+        select(Category.id, Category.usage_scope).where(Category.id.in_(category_ids))
+    ).all()
+    return {row.id: row.usage_scope for row in rows}
+
+
+def write_documents(connection, entities, removed: list[tuple[str, int]] | None = None):
+    """Replace the search documents of ``entities`` and drop ``removed`` keys."""
+    scopes = load_category_scopes(connection, [item.category_id for item in entities if isinstance(item, Asset)])
+    keys = list(removed or [])
+    rows = []
+    now = datetime.utcnow()
+    for entity in entities:
+        keys.append((ENTITY_TYPES[type(entity)], entity.id))
+        document = build_document(entity, scopes)
+        if document is not None:
+            rows.append({**document, "updated_at": now})
+    ids_by_type: dict[str, list[int]] = {}
+    for entity_type, entity_id in keys:
+        ids_by_type.setdefault(entity_type, []).append(entity_id)
+    for entity_type, entity_ids in ids_by_type.items():
+        connection.execute(
+            delete(SearchDocument).where(
+                SearchDocument.entity_type == entity_type,
+                SearchDocument.entity_id.in_(entity_ids),
+            )
+        )
+    if rows:
+        connection.execute(insert(SearchDocument), rows)
+
+
+def rebuild_search_documents(db: Session, batch_size: int = 1000):
+    connection = db.connection()
+    connection.execute(delete(SearchDocument))
+    for model in ENTITY_TYPES:
+        last_id = 0
+        while True:
+            batch = db.query(model).filter(model.id > last_id).order_by(model.id.asc()).limit(batch_size).all()
+            if not batch:
+                break
+            write_documents(connection, batch)
+            last_id = batch[-1].id
+            db.expunge_all()
+    db.commit()
+
+
+@event.listens_for(Session, "after_flush")
+def _sync_documents(session, flush_context):
+    changed = [
+        obj
+        for obj in list(session.new) + list(session.dirty)
+        if type(obj) in ENTITY_TYPES and session.is_modified(obj, include_collections=False)
+    ]
+    removed = [
+        (ENTITY_TYPES[type(obj)], obj.id) for obj in session.deleted if type(obj) in ENTITY_TYPES
+    ]
+    rescoped = [
+        obj.id
+        for obj in session.dirty
+        if isinstance(obj, Category) and session.is_modified(obj, include_collections=False)
+    ]
+    if not changed and not removed and not rescoped:
+        return
+    connection = session.connection()
+    if changed or removed:
+        write_documents(connection, changed, removed)
+    for category_id, usage_scope in load_category_scopes(connection, rescoped).items():
+        connection.execute(
+            update(SearchDocument)
+            .where(
+                SearchDocument.entity_type == "asset",
+                SearchDocument.entity_id.in_(select(Asset.id).where(Asset.category_id == category_id)),
+            )
+            .values(scope=usage_scope)
+        )
@@ -3,18 +3,51 @@ from jose import jwt
 from passlib.context import CryptContext
 
 from app.core.config import settings
+from app.core.hashing import run_hash_task, run_hash_task_async
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.password_hash_rounds,
+    bcrypt__min_desired_rounds=settings.password_hash_rounds,
+    bcrypt__max_desired_rounds=settings.password_hash_rounds,
+)
 
+UNUSABLE_PASSWORD_HASH = "!"
 
-def hash_password(password: str) -> str:
+
+def _hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def verify_password(password: str, password_hash: str) -> bool:
+def _verify(password: str, password_hash: str) -> bool:
     return pwd_context.verify(password, password_hash)
 
 
+def hash_password(password: str) -> str:
+    return run_hash_task(_hash, password)
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    if not password_hash or not pwd_context.identify(password_hash, required=False):
+        return False
+    return run_hash_task(_verify, password, password_hash)
+
+
+async def hash_password_async(password: str) -> str:
+    return await run_hash_task_async(_hash, password)
+
+
+async def verify_password_async(password: str, password_hash: str) -> bool:
+    if not password_hash or not pwd_context.identify(password_hash, required=False):
+        return False
+    return await run_hash_task_async(_verify, password, password_hash)
+
+
+def password_needs_update(password_hash: str) -> bool:
+    return pwd_context.needs_update(password_hash)
+
+
 def create_access_token(data: dict) -> str:
     expire = datetime.utcnow() + timedelta(hours=settings.jwt_expire_hours)
     to_encode = data.copy()
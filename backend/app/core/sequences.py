@@ -0,0 +1,105 @@
+import threading
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine, insert, select, update
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import IntegrityError, TimeoutError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.sequence import Sequence
+
+_engines: dict[Engine, Engine] = {}
+_engines_lock = threading.Lock()
+
+
+def _sequence_engine(bind: Engine) -> Engine:
+    """A small dedicated pool for sequence transactions.
+
+    ``reserve`` runs while the caller's session already holds a connection;
+    taking a second one from the same pool could leave every request holding
+    one and waiting for another. Sequence transactions never wait on the
+    main pool, so this pool always drains. SQLite (tests) has no connection
+    limit and in-memory databases are per engine, so the bind is reused.
+    """
+    bind = bind.engine
+    if bind.dialect.name == "sqlite":
+        return bind
+    with _engines_lock:
+        engine = _engines.get(bind)
+        if engine is None:
+            engine = create_engine(
+                bind.url,
+                pool_size=max(settings.sequence_pool_size, 1),
+                max_overflow=0,
+                pool_timeout=settings.sequence_pool_timeout_seconds,
+                pool_pre_ping=True,
+            )
+            _engines[bind] = engine
+        return engine
+
+
+def _current_max(connection, column, base: str) -> int:
+    max_seq = 0
+    for (value,) in connection.execute(select(column).where(column.like(f"{base}%"))):
+        if not value or not value.startswith(base):
+            continue
+        tail = value[len(base):]
+        if tail.isdigit():
+            max_seq = max(max_seq, int(tail))
+    return max_seq
+
+
+def reserve(db: Session, name: str, count: int = 1, seed_column=None, seed_base: str | None = None) -> int:
+    """Atomically reserve ``count`` consecutive values of sequence ``name``.
+
+    Runs in its own short transaction on a dedicated connection pool (see
+    ``_sequence_engine``) so the row lock is released before the
+    caller's work continues; values are never handed out twice, but a caller
+    that rolls back leaves a gap. A missing sequence is seeded from the
+    highest numeric suffix of ``seed_column LIKE 'seed_base%'``.
+    """
+    engine = _sequence_engine(db.get_bind())
+    for _ in range(3):
+        try:
+            with engine.begin() as connection:
+                row = connection.execute(
+                    select(Sequence.next_value).where(Sequence.name == name).with_for_update()
+                ).first()
+                if row is None:
+                    start = 1
+                    if seed_column is not None and seed_base is not None:
+                        start = _current_max(connection, seed_column, seed_base) + 1
+                    connection.execute(insert(Sequence).values(name=name, next_value=start + count))
+                    return start
+                start = row.next_value
+                connection.execute(
+                    update(Sequence).where(Sequence.name == name).values(next_value=start + count)
+                )
+                return start
+        except IntegrityError:
+            continue
+        except TimeoutError:
+            break
+    raise HTTPException(status_code=503, detail="Sequence allocation failed")
+
+
+class SequenceBlocks:
+    """Hand out values from blocks reserved ``block_size`` at a time.
+
+    Meant for bulk work such as imports; unused values of the last block are
+    left as a gap.
+    """
+
+    def __init__(self, db: Session, block_size: int):
+        self.db = db
+        self.block_size = max(block_size, 1)
+        self._ranges: dict[str, tuple[int, int]] = {}
+
+    def next(self, name: str, seed_column=None, seed_base: str | None = None) -> int:
+        current, end = self._ranges.get(name, (0, 0))
+        if current >= end:
+            current = reserve(self.db, name, self.block_size, seed_column=seed_column, seed_base=seed_base)
+            end = current + self.block_size
+        self._ranges[name] = (current + 1, end)
+        return current
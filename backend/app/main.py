@@ -3,8 +3,20 @@ from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy import text
 
 from app.core.database import Base, engine, SessionLocal
+from app.core.hashing import shutdown_hash_pool
+from app.core.import_jobs import shutdown_import_jobs, start_import_maintenance
+from app.core.audit_log import start_log_flusher, stop_log_flusher
+from app.core.log_archive import index_archive_operators, start_log_archiver, stop_log_archiver
+from app.core.permission_cache import bump_permission_version
+from app.core.principal_cache import invalidate_all_principals
+from app.core.search_index import rebuild_search_documents
+from app.models.asset import Asset
+from app.models.asset_log import AssetLog
 from app.models.category import Category
 from app.models.category_field import CategoryField
+from app.models.asset_field_index import AssetFieldIndex
+from app.models.asset_field_value import AssetFieldValue
+from app.models.search_document import SearchDocument
 from app.models.role import Role
 from app.models.role_permission import RolePermission
 from app.models.user import User
@@ -20,7 +32,9 @@ from app.models.dict_type import DictType
 from app.models.dict_item import DictItem
 from app.models.dashboard_template import DashboardTemplate
 from app.models.dashboard_widget import DashboardWidget
-from app.routers import auth, assets, asset_fields, licenses, users, roles, stocktakes, dashboard, categories, maintenance, systems, system_fields, system_field_categories, software_field_categories, license_fields, notifications, departments, people, permissions, dictionaries, ldap
+from app.utils.field_index import rebuild_field_index
+from app.utils.search import ensure_fulltext_index
+from app.routers import auth, assets, asset_fields, licenses, users, roles, stocktakes, dashboard, categories, maintenance, systems, system_fields, system_field_categories, software_field_categories, license_fields, notifications, departments, people, permissions, dictionaries, ldap, metrics, search, logs
 
 app = FastAPI(title="AssetHub")
 
@@ -59,6 +73,9 @@ app.include_router(people.router)
 app.include_router(permissions.router)
 app.include_router(dictionaries.router)
 app.include_router(ldap.router)
+app.include_router(metrics.router)
+app.include_router(search.router)
+app.include_router(logs.router)
 
 
 @app.on_event("startup")
@@ -455,6 +472,55 @@ def on_startup():
         connection.execute(text("ALTER TABLE licenses MODIFY COLUMN name VARCHAR(100) NULL"))
         connection.execute(text("ALTER TABLE licenses MODIFY COLUMN license_key TEXT NULL"))
         connection.execute(text("ALTER TABLE licenses MODIFY COLUMN total_qty INT NULL"))
+        sync_columns = [
+            ("users", "auth_source", "VARCHAR(20) NULL"),
+            ("ldap_configs", "sync_watermark", "VARCHAR(64) NULL"),
+            ("ldap_configs", "last_sync_at", "DATETIME NULL"),
+            ("ldap_configs", "last_full_sync_at", "DATETIME NULL"),
+            ("import_jobs", "owner", "VARCHAR(64) NULL"),
+            ("import_jobs", "heartbeat_at", "DATETIME NULL"),
+        ]
+        for table, column, definition in sync_columns:
+            result = connection.execute(
+                text(
+                    "SELECT COUNT(*) FROM INFORMATION_SCHEMA.COLUMNS "
+                    "WHERE TABLE_SCHEMA = DATABASE() "
+                    "AND TABLE_NAME = :table "
+                    "AND COLUMN_NAME = :col"
+                ),
+                {"table": table, "col": column},
+            )
+            if result.scalar() == 0:
+                connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"))
+        for model, prefix in ((Asset, "ix_assets_deleted"), (AssetLog, "ix_asset_logs_")):
+            for index in model.__table__.indexes:
+                if not index.name.startswith(prefix):
+                    continue
+                result = connection.execute(
+                    text(
+                        "SELECT COUNT(*) FROM INFORMATION_SCHEMA.STATISTICS "
+                        "WHERE TABLE_SCHEMA = DATABASE() "
+                        "AND TABLE_NAME = :table "
+                        "AND INDEX_NAME = :name"
+                    ),
+                    {"table": model.__tablename__, "name": index.name},
+                )
+                if result.scalar() == 0:
+                    index.create(bind=connection)
+        # Drop list indexes from earlier releases that no longer match a list shape.
+        wanted = {index.name for index in Asset.__table__.indexes}
+        existing = connection.execute(
+            text(
+                "SELECT DISTINCT INDEX_NAME FROM INFORMATION_SCHEMA.STATISTICS "
+                "WHERE TABLE_SCHEMA = DATABASE() "
+                "AND TABLE_NAME = 'assets' "
+                "AND INDEX_NAME LIKE 'ix\\_assets\\_deleted%'"
+            )
+        ).scalars()
+        for name in [name for name in existing if name not in wanted]:
+            connection.execute(text(f"DROP INDEX `{name}` ON assets"))
+        ensure_fulltext_index(connection, "assets", "ft_assets_search", ["name", "sn", "asset_no"])
+        ensure_fulltext_index(connection, "search_documents", "ft_search_documents", ["title", "body"])
 
     seed_system_field_categories()
     migrate_system_legacy_fields_to_custom_values()
@@ -463,8 +529,44 @@ def on_startup():
     seed_datacenter_asset_fields()
     seed_dashboard_templates()
     seed_dashboard_permissions()
+    bump_permission_version()
     migrate_user_roles()
     cleanup_deleted_categories()
+    backfill_asset_field_index()
+    backfill_search_documents()
+    index_archive_operators()
+    start_import_maintenance()
+    start_log_flusher()
+    start_log_archiver()
+    invalidate_all_principals()
+
+
+def backfill_asset_field_index():
+    db = SessionLocal()
+    try:
+        if db.query(AssetFieldIndex.id).first() or not db.query(AssetFieldValue.id).first():
+            return
+        rebuild_field_index(db)
+    finally:
+        db.close()
+
+
+def backfill_search_documents():
+    db = SessionLocal()
+    try:
+        if db.query(SearchDocument.id).first():
+            return
+        rebuild_search_documents(db)
+    finally:
+        db.close()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    shutdown_hash_pool()
+    shutdown_import_jobs()
+    stop_log_flusher()
+    stop_log_archiver()
 
 
 def seed_system_field_categories():
@@ -1,6 +1,9 @@
 from app.models.asset import Asset
 from app.models.asset_field_value import AssetFieldValue
+from app.models.asset_field_index import AssetFieldIndex
 from app.models.asset_log import AssetLog
+from app.models.asset_log_outbox import AssetLogOutbox
+from app.models.asset_log_archive import AssetLogArchive, AssetLogArchiveOperator
 from app.models.category import Category
 from app.models.category_field import CategoryField
 from app.models.license import License
@@ -24,11 +27,18 @@ from app.models.dict_item import DictItem
 from app.models.ldap_config import LdapConfig
 from app.models.dashboard_template import DashboardTemplate
 from app.models.dashboard_widget import DashboardWidget
+from app.models.search_document import SearchDocument
+from app.models.sequence import Sequence
+from app.models.import_job import ImportJob
 
 __all__ = [
     "Asset",
     "AssetFieldValue",
+    "AssetFieldIndex",
     "AssetLog",
+    "AssetLogOutbox",
+    "AssetLogArchive",
+    "AssetLogArchiveOperator",
     "Category",
     "CategoryField",
     "License",
@@ -54,4 +64,7 @@ __all__ = [
     "LdapConfig",
     "DashboardTemplate",
     "DashboardWidget",
+    "SearchDocument",
+    "Sequence",
+    "ImportJob",
 ]
@@ -1,5 +1,5 @@
 from sqlalchemy import Column, Integer, String, Date, Numeric, Boolean, ForeignKey, Index
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import query_expression, relationship
 
 from app.core.database import Base
 from app.models.base import TimestampMixin
@@ -26,5 +26,40 @@ class Asset(Base, TimestampMixin):
     user = relationship("User")
     category_ref = relationship("Category")
 
+    search_score = query_expression()
+
 
 Index("ix_assets_status_dept", Asset.status, Asset.dept)
+# List queries always filter on is_deleted. Each index below serves one
+# list shape without a sort step (InnoDB appends id, the keyset tiebreak):
+# an equality filter on status/category_id/user_id/dept/location listed
+# newest first, or a sort/range on purchase_at/warranty_at/price/name.
+# Other combinations use the most selective of these and sort the matches.
+LIST_INDEXES = (
+    ("status",),
+    ("category_id",),
+    ("user_id",),
+    ("dept",),
+    ("location",),
+    ("purchase_at",),
+    ("warranty_at",),
+    ("price",),
+    ("name",),
+)
+_INDEX_NAMES = {"category_id": "category", "user_id": "user"}
+
+
+def list_index_name(*columns: str) -> str:
+    return "ix_assets_deleted" + "".join(f"_{_INDEX_NAMES.get(column, column)}" for column in columns)
+
+
+for _columns in LIST_INDEXES:
+    Index(list_index_name(*_columns), Asset.is_deleted, *[getattr(Asset, column) for column in _columns])
+Index(
+    "ft_assets_search",
+    Asset.name,
+    Asset.sn,
+    Asset.asset_no,
+    mysql_prefix="FULLTEXT",
+    mysql_with_parser="ngram",
+)
@@ -0,0 +1,20 @@
+from sqlalchemy import Column, Date, ForeignKey, Index, Integer, Numeric, String
+
+from app.core.database import Base
+
+
+class AssetFieldIndex(Base):
+    __tablename__ = "asset_field_index"
+
+    id = Column(Integer, primary_key=True, index=True)
+    asset_id = Column(Integer, ForeignKey("assets.id"), nullable=False)
+    field_id = Column(Integer, ForeignKey("category_fields.id"), nullable=False)
+    value_text = Column(String(255), nullable=True)
+    value_num = Column(Numeric(20, 6), nullable=True)
+    value_date = Column(Date, nullable=True)
+
+
+Index("ix_asset_field_index_text", AssetFieldIndex.field_id, AssetFieldIndex.value_text, AssetFieldIndex.asset_id)
+Index("ix_asset_field_index_num", AssetFieldIndex.field_id, AssetFieldIndex.value_num, AssetFieldIndex.asset_id)
+Index("ix_asset_field_index_date", AssetFieldIndex.field_id, AssetFieldIndex.value_date, AssetFieldIndex.asset_id)
+Index("ix_asset_field_index_asset", AssetFieldIndex.asset_id, AssetFieldIndex.field_id)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, BigInteger, Integer, String, DateTime, JSON, ForeignKey
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, JSON, ForeignKey, Index
 
 from app.core.database import Base
 from app.models.base import TimestampMixin
@@ -13,3 +13,10 @@ class AssetLog(Base, TimestampMixin):
     action_type = Column(String(20), nullable=False)
     change_data = Column(JSON, nullable=False)
     created_at = Column(DateTime, nullable=False)
+
+
+# Keyset paging runs on (created_at, id); each filter gets a leading column.
+Index("ix_asset_logs_created", AssetLog.created_at, AssetLog.id)
+Index("ix_asset_logs_asset_created", AssetLog.asset_id, AssetLog.created_at, AssetLog.id)
+Index("ix_asset_logs_operator_created", AssetLog.operator_id, AssetLog.created_at, AssetLog.id)
+Index("ix_asset_logs_action_created", AssetLog.action_type, AssetLog.created_at, AssetLog.id)
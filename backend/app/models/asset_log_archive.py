@@ -0,0 +1,29 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, ForeignKey
+
+from app.core.database import Base
+from app.models.base import TimestampMixin
+
+
+class AssetLogArchive(Base, TimestampMixin):
+    """One compressed JSONL file holding asset_logs rows of a calendar month."""
+
+    __tablename__ = "asset_log_archives"
+
+    id = Column(Integer, primary_key=True, index=True)
+    period = Column(String(7), nullable=False, index=True)
+    start_at = Column(DateTime, nullable=False)
+    end_at = Column(DateTime, nullable=False)
+    path = Column(String(500), nullable=False)
+    row_count = Column(Integer, nullable=False, default=0)
+    min_id = Column(BigInteger, nullable=True)
+    max_id = Column(BigInteger, nullable=True)
+    size_bytes = Column(BigInteger, nullable=True)
+
+
+class AssetLogArchiveOperator(Base):
+    """Users with rows in an archive file, so they are still treated as referenced."""
+
+    __tablename__ = "asset_log_archive_operators"
+
+    archive_id = Column(Integer, ForeignKey("asset_log_archives.id"), primary_key=True)
+    operator_id = Column(Integer, ForeignKey("users.id"), primary_key=True, index=True)
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, BigInteger, Integer, String, DateTime, JSON
+
+from app.core.database import Base
+
+
+class AssetLogOutbox(Base):
+    """Asset log rows written by requests, waiting to be moved to asset_logs."""
+
+    __tablename__ = "asset_log_outbox"
+
+    id = Column(BigInteger, primary_key=True, index=True)
+    asset_id = Column(Integer, nullable=False)
+    operator_id = Column(Integer, nullable=False)
+    action_type = Column(String(20), nullable=False)
+    change_data = Column(JSON, nullable=False)
+    created_at = Column(DateTime, nullable=False, index=True)
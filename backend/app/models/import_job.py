@@ -0,0 +1,26 @@
+from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String
+
+from app.core.database import Base
+from app.models.base import TimestampMixin
+
+
+class ImportJob(Base, TimestampMixin):
+    __tablename__ = "import_jobs"
+
+    id = Column(String(36), primary_key=True)
+    kind = Column(String(30), nullable=False)
+    status = Column(String(20), nullable=False, default="pending")
+    filename = Column(String(255), nullable=True)
+    file_path = Column(String(500), nullable=True)
+    error_path = Column(String(500), nullable=True)
+    operator_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    total_rows = Column(Integer, nullable=True)
+    processed_rows = Column(Integer, nullable=False, default=0)
+    created_rows = Column(Integer, nullable=False, default=0)
+    error_rows = Column(Integer, nullable=False, default=0)
+    message = Column(String(500), nullable=True)
+    cancel_requested = Column(Boolean, default=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+    owner = Column(String(64), nullable=True)
+    heartbeat_at = Column(DateTime, nullable=True)
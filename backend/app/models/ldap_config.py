@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import Column, Integer, String, Boolean, DateTime
 
 from app.core.database import Base
 from app.models.base import TimestampMixin
@@ -26,3 +26,6 @@ class LdapConfig(Base, TimestampMixin):
     default_role_code = Column(String(50), default="employee")
     allow_login = Column(Boolean, default=True)
     auto_create = Column(Boolean, default=True)
+    sync_watermark = Column(String(64), nullable=True)
+    last_sync_at = Column(DateTime, nullable=True)
+    last_full_sync_at = Column(DateTime, nullable=True)
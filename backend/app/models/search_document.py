@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Index, Integer, String, Text
+
+from app.core.database import Base
+
+
+class SearchDocument(Base):
+    __tablename__ = "search_documents"
+
+    id = Column(Integer, primary_key=True, index=True)
+    entity_type = Column(String(20), nullable=False)
+    entity_id = Column(Integer, nullable=False)
+    title = Column(String(255), nullable=True)
+    subtitle = Column(String(255), nullable=True)
+    body = Column(Text, nullable=True)
+    scope = Column(String(20), nullable=True)
+    owner_id = Column(Integer, nullable=True)
+    owner_id_b = Column(Integer, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow)
+
+
+Index("ux_search_documents_entity", SearchDocument.entity_type, SearchDocument.entity_id, unique=True)
+Index("ix_search_documents_title", SearchDocument.title)
+Index(
+    "ft_search_documents",
+    SearchDocument.title,
+    SearchDocument.body,
+    mysql_prefix="FULLTEXT",
+    mysql_with_parser="ngram",
+)
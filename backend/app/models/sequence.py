@@ -0,0 +1,10 @@
+from sqlalchemy import BigInteger, Column, String
+
+from app.core.database import Base
+
+
+class Sequence(Base):
+    __tablename__ = "sequences"
+
+    name = Column(String(100), primary_key=True)
+    next_value = Column(BigInteger, nullable=False, default=1)
@@ -18,6 +18,7 @@ class User(Base, TimestampMixin):
     phone = Column(String(50), nullable=True)
     wecom_name = Column(String(100), nullable=True)
     asset_scope = Column(String(20), nullable=True)
+    auth_source = Column(String(20), nullable=True)
     is_active = Column(Boolean, default=True)
     is_deleted = Column(Boolean, default=False)
 
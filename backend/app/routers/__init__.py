@@ -1,4 +1,4 @@
-from app.routers import auth, assets, asset_fields, licenses, users, roles, stocktakes, dashboard, categories, maintenance, systems, system_fields, system_field_categories, software_field_categories, license_fields, departments, people, permissions, ldap
+from app.routers import auth, assets, asset_fields, licenses, users, roles, stocktakes, dashboard, categories, maintenance, systems, system_fields, system_field_categories, software_field_categories, license_fields, departments, people, permissions, ldap, metrics, search
 
 __all__ = [
     "auth",
@@ -20,4 +20,6 @@ __all__ = [
     "people",
     "permissions",
     "ldap",
+    "metrics",
+    "search",
 ]
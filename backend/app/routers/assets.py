@@ -1,66 +1,88 @@
-from datetime import datetime, date
-from io import BytesIO
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
-from fastapi.responses import StreamingResponse
-from sqlalchemy.orm import Session
+import os
+from datetime import date
+from decimal import Decimal
+from zipfile import BadZipFile
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File
+from fastapi.responses import FileResponse, StreamingResponse
+from sqlalchemy.orm import Session, with_expression
 from sqlalchemy import or_
-import pandas as pd
+from openpyxl.utils.exceptions import InvalidFileException
 
+from app.core.audit_log import log_change
+from app.core.cache import LRUCache
+from app.core.config import settings
+from app.core.count_cache import get_shared_table_versions
 from app.core.database import get_db
-from app.core.deps import require_permission, require_any_permission
+from app.core.deps import (
+    EffectivePermissions,
+    get_current_user,
+    get_effective_permissions,
+    require_permission,
+    require_any_permission,
+)
+from app.core.import_jobs import create_import_job, to_job_out
 from app.models.asset import Asset
-from app.models.asset_log import AssetLog
 from app.models.category import Category
-from app.schemas.asset import AssetCreate, AssetOut, AssetUpdate
+from app.models.import_job import ImportJob
+from app.schemas.asset import AssetBulkAction, AssetBulkResult, AssetCreate, AssetOut, AssetUpdate
 from app.schemas.common import Page, Message
-from app.utils.pagination import paginate
+from app.schemas.import_job import ImportJobOut
+from app.utils.asset_import import AssetImporter
+from app.utils.asset_lifecycle import BULK_ACTIONS, TRANSITIONS, apply_transition, bulk_transition
+from app.utils.asset_numbering import category_prefix, generate_asset_no
+from app.utils.field_index import apply_field_filters, parse_field_filters
+from app.utils.pagination import paginate_keyset
+from app.utils.search import fulltext_enabled, match_against, prefix_filter, searchable_terms
 
 router = APIRouter(prefix="/api/v1/assets", tags=["assets"])
 
-
-def log_change(db: Session, asset_id: int, operator_id: int, action_type: str, change_data: dict):
-    db.add(
-        AssetLog(
-            asset_id=asset_id,
-            operator_id=operator_id,
-            action_type=action_type,
-            change_data=change_data,
-            created_at=datetime.utcnow(),
-        )
-    )
-
-
-def generate_asset_no(db: Session, prefix: str) -> str:
-    base = f"{prefix}-"
-    candidates = db.query(Asset.asset_no).filter(Asset.asset_no.like(f"{base}%")).all()
-    max_seq = 0
-    for (asset_no,) in candidates:
-        if not asset_no or not asset_no.startswith(base):
-            continue
-        tail = asset_no.replace(base, "", 1)
-        if tail.isdigit():
-            max_seq = max(max_seq, int(tail))
-    return f"{base}{max_seq + 1:010d}"
+ASSET_SORT_COLUMNS = {
+    "id": Asset.id,
+    "asset_no": Asset.asset_no,
+    "name": Asset.name,
+    "status": Asset.status,
+    "category_id": Asset.category_id,
+    "dept": Asset.dept,
+    "location": Asset.location,
+    "price": Asset.price,
+    "purchase_at": Asset.purchase_at,
+    "warranty_at": Asset.warranty_at,
+}
+
+_lookup_cache = LRUCache(settings.asset_lookup_cache_size, settings.asset_lookup_cache_ttl_seconds)
+
+
+def apply_asset_search(db: Session, query, q: str):
+    """Filter ``query`` by ``q`` and return it with the keys to sort by.
+
+    On MySQL this goes through the ngram FULLTEXT index and orders by
+    relevance; terms shorter than the ngram size fall back to a prefix match
+    on the indexed sn/asset_no columns.
+    """
+    if not fulltext_enabled(db):
+        like = f"%{q}%"
+        return query.filter(or_(Asset.sn.like(like), Asset.name.like(like), Asset.asset_no.like(like))), [Asset.id]
+    if not searchable_terms(q):
+        return query.filter(prefix_filter([Asset.sn, Asset.asset_no], q)), [Asset.id]
+    score = match_against([Asset.name, Asset.sn, Asset.asset_no], q)
+    query = query.filter(score > 0).options(with_expression(Asset.search_score, score))
+    return query, [score.label("search_score"), Asset.id]
 
 
 def resolve_category_prefix(db: Session, category_id: int | None, category_name: str | None) -> str:
     if category_id:
         category = db.query(Category).filter(Category.id == category_id, Category.is_deleted == False).first()
         if category:
-            if category.code:
-                return category.code.strip().replace(" ", "").upper()
-            return f"C{category.id}"
+            return category_prefix(category)
     if category_name:
         category = db.query(Category).filter(Category.name == category_name, Category.is_deleted == False).first()
         if category:
-            if category.code:
-                return category.code.strip().replace(" ", "").upper()
-            return f"C{category.id}"
-    return "ASSET"
+            return category_prefix(category)
+    return category_prefix(None)
 
 
-def ensure_asset_scope(db: Session, asset: Asset, user):
-    scopes = get_asset_scopes(user)
+def ensure_asset_scope(db: Session, asset: Asset, perms: EffectivePermissions):
+    scopes = perms.asset_scopes
     if not scopes:
         return
     category = db.query(Category).filter(Category.id == asset.category_id).first()
@@ -68,48 +90,7 @@ def ensure_asset_scope(db: Session, asset: Asset, user):
         raise HTTPException(status_code=403, detail="Forbidden")
 
 
-def get_user_role_codes(user) -> set[str]:
-    codes = set()
-    if user.role:
-        codes.add(user.role.code)
-    if user.roles:
-        codes.update([role.code for role in user.roles])
-    return codes
-
-
-def get_asset_scopes(user) -> set[str]:
-    codes = get_user_role_codes(user)
-    scopes = set()
-    if "office_asset_admin" in codes:
-        scopes.add("office")
-    if "datacenter_asset_admin" in codes:
-        scopes.add("datacenter")
-    return scopes
-
-
-def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
-    aliases = {
-        "sn": ["sn", "SN", "序列号"],
-        "asset_no": ["asset_no", "编号", "资产编号"],
-        "name": ["name", "资产名称"],
-        "category": ["category", "分类"],
-        "purchase_at": ["purchase_at", "采购日期"],
-        "price": ["price", "采购原值", "价格"],
-        "warranty_at": ["warranty_at", "维保截止日期", "维保期"],
-        "location": ["location", "位置"],
-        "attachment": ["attachment", "附件", "发票", "合同"],
-    }
-    columns = {str(col).strip(): col for col in df.columns}
-    data = {}
-    for key, names in aliases.items():
-        for name in names:
-            if name in columns:
-                data[key] = df[columns[name]]
-                break
-    return pd.DataFrame(data)
-
-
-@router.post("/batch-import")
+@router.post("/batch-import", deprecated=True)
 def batch_import(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
@@ -122,125 +103,139 @@ def batch_import(
         )
     ),
 ):
-    if not file.filename.lower().endswith((".xlsx", ".xls")):
+    """Import in the request. Kept for existing scripts; use ``/import-jobs``."""
+    if not file.filename.lower().endswith(".xlsx"):
+        raise HTTPException(status_code=400, detail="Invalid file type")
+    importer = AssetImporter(db, user.id)
+    try:
+        importer.run(file.file)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    except (InvalidFileException, BadZipFile):
         raise HTTPException(status_code=400, detail="Invalid file type")
-    content = file.file.read()
-    df = pd.read_excel(BytesIO(content))
-    df_norm = normalize_columns(df)
-
-    required = ["sn", "name", "category", "purchase_at"]
-    missing = [col for col in required if col not in df_norm.columns]
-    if missing:
-        raise HTTPException(status_code=400, detail=f"Missing columns: {', '.join(missing)}")
-
-    categories = {
-        item.name: item.id
-        for item in db.query(Category).filter(Category.is_deleted == False).all()
-    }
-    enforce_category = len(categories) > 0
-    existing_sn = {row[0] for row in db.query(Asset.sn).filter(Asset.is_deleted == False).all()}
-    dup_in_file = df_norm["sn"].astype(str).duplicated(keep=False)
-
-    errors = {}
-    created = 0
-    for idx, row in df_norm.iterrows():
-        row_errors = []
-        sn = str(row.get("sn", "")).strip()
-        name = str(row.get("name", "")).strip()
-        category = str(row.get("category", "")).strip()
-        purchase_at = row.get("purchase_at")
-
-        if not sn:
-            row_errors.append("SN required")
-        if not name:
-            row_errors.append("Name required")
-        if not category:
-            row_errors.append("Category required")
-        if pd.isna(purchase_at):
-            row_errors.append("Purchase date required")
-        else:
-            try:
-                purchase_at = pd.to_datetime(purchase_at).date()
-            except Exception:
-                row_errors.append("Invalid purchase date")
-
-        if sn in existing_sn:
-            row_errors.append("SN already exists")
-        if bool(dup_in_file.loc[idx]):
-            row_errors.append("Duplicate SN in file")
-
-        category_id = None
-        if enforce_category:
-            category_id = categories.get(category)
-            if not category_id:
-                row_errors.append("Category not found")
-
-        price = row.get("price")
-        if price is not None and not pd.isna(price):
-            try:
-                price_val = float(price)
-            except Exception:
-                row_errors.append("Invalid price")
-                price_val = None
-        else:
-            price_val = None
-
-        attachment = row.get("attachment")
-        if price_val is not None and price_val > 5000:
-            if attachment is None or (isinstance(attachment, float) and pd.isna(attachment)) or str(attachment).strip() == "":
-                row_errors.append("Attachment required for price > 5000")
-
-        if row_errors:
-            errors[idx] = "; ".join(row_errors)
-            continue
-
-        prefix = resolve_category_prefix(db, category_id, category)
-        asset_no = generate_asset_no(db, prefix)
-
-        asset = Asset(
-            sn=sn,
-            asset_no=asset_no,
-            name=name,
-            category=category,
-            category_id=category_id,
-            status=0,
-            location=str(row.get("location", "")).strip() or None,
-            price=price_val,
-            purchase_at=purchase_at,
-            warranty_at=pd.to_datetime(row.get("warranty_at")).date() if not pd.isna(row.get("warranty_at")) else None,
-        )
-        db.add(asset)
-        db.flush()
-        log_change(db, asset.id, user.id, "IN", {"field": "create", "old": None, "new": {"sn": sn}})
-        created += 1
-        existing_sn.add(sn)
-
-    db.commit()
 
-    if errors:
-        df_out = df.copy()
-        df_out["error"] = ""
-        for idx, msg in errors.items():
-            df_out.loc[idx, "error"] = msg
-        output = BytesIO()
-        df_out.to_excel(output, index=False)
-        output.seek(0)
+    if importer.errors:
         headers = {"Content-Disposition": "attachment; filename=import_errors.xlsx"}
         return StreamingResponse(
-            output,
+            importer.error_workbook(),
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
             headers=headers,
         )
 
-    return Message(message=f"Imported {created} assets")
+    return Message(message=f"Imported {importer.created} assets")
+
+
+def get_own_import_job(db: Session, job_id: str, perms: EffectivePermissions) -> ImportJob:
+    job = db.query(ImportJob).filter(ImportJob.id == job_id, ImportJob.kind == "assets").first()
+    if not job:
+        raise HTTPException(status_code=404, detail="Import job not found")
+    if job.operator_id != perms.user_id and not perms.is_super_admin:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    return job
+
+
+@router.post("/import-jobs", response_model=ImportJobOut)
+def create_asset_import_job(
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db),
+    user=Depends(
+        require_any_permission(
+            [
+                ("office_hardware_assets", "create"),
+                ("datacenter_hardware_assets", "create"),
+            ]
+        )
+    ),
+):
+    if not file.filename.lower().endswith(".xlsx"):
+        raise HTTPException(status_code=400, detail="Invalid file type")
+    job = create_import_job(db, "assets", file.filename, file.file, user.id)
+    return to_job_out(job)
+
+
+@router.get("/import-jobs/{job_id}", response_model=ImportJobOut)
+def get_asset_import_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    user=Depends(
+        require_any_permission(
+            [
+                ("office_hardware_assets", "create"),
+                ("datacenter_hardware_assets", "create"),
+            ]
+        )
+    ),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
+):
+    return to_job_out(get_own_import_job(db, job_id, perms))
+
+
+@router.post("/import-jobs/{job_id}/cancel", response_model=ImportJobOut)
+def cancel_asset_import_job(
+    job_id: str,
+    db: Session = Depends(get_db),
+    user=Depends(
+        require_any_permission(
+            [
+                ("office_hardware_assets", "create"),
+                ("datacenter_hardware_assets", "create"),
+            ]
+        )
+    ),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
+):
+    job = get_own_import_job(db, job_id, perms)
+    if job.status in ("pending", "running"):
+        job.cancel_requested = True
+        db.commit()
+        db.refresh(job)
+    return to_job_out(job)
+
+
+@router.get("/import-jobs/{job_id}/errors")
+def download_asset_import_errors(
+    job_id: str,
+    db: Session = Depends(get_db),
+    user=Depends(
+        require_any_permission(
+            [
+                ("office_hardware_assets", "create"),
+                ("datacenter_hardware_assets", "create"),
+            ]
+        )
+    ),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
+):
+    job = get_own_import_job(db, job_id, perms)
+    if not job.error_path or not os.path.exists(job.error_path):
+        raise HTTPException(status_code=404, detail="No error report")
+    return FileResponse(
+        job.error_path,
+        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        filename="import_errors.xlsx",
+    )
 
 @router.get("", response_model=Page[AssetOut])
 def list_assets(
+    request: Request,
     page: int = 1,
     size: int = 20,
     q: str | None = None,
     status: int | None = None,
     scope: str | None = None,
+    category_id: int | None = None,
+    dept: str | None = None,
+    user_id: int | None = None,
+    location: str | None = None,
+    purchase_from: date | None = None,
+    purchase_to: date | None = None,
+    warranty_from: date | None = None,
+    warranty_to: date | None = None,
+    price_min: Decimal | None = None,
+    price_max: Decimal | None = None,
+    sort: str | None = None,
+    cursor: str | None = None,
+    with_total: bool | None = None,
     db: Session = Depends(get_db),
     user=Depends(
         require_any_permission(
@@ -250,19 +245,49 @@ def list_assets(
             ]
         )
     ),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
     query = db.query(Asset).filter(Asset.is_deleted == False)
+    column_filters = [
+        (Asset.category_id == category_id) if category_id is not None else None,
+        (Asset.dept == dept) if dept else None,
+        (Asset.user_id == user_id) if user_id is not None else None,
+        (Asset.location == location) if location else None,
+        (Asset.purchase_at >= purchase_from) if purchase_from else None,
+        (Asset.purchase_at <= purchase_to) if purchase_to else None,
+        (Asset.warranty_at >= warranty_from) if warranty_from else None,
+        (Asset.warranty_at <= warranty_to) if warranty_to else None,
+        (Asset.price >= price_min) if price_min is not None else None,
+        (Asset.price <= price_max) if price_max is not None else None,
+    ]
+    column_filters = [item for item in column_filters if item is not None]
+    if column_filters:
+        query = query.filter(*column_filters)
     joined_category = False
-    role_codes = get_user_role_codes(user)
-    scopes = get_asset_scopes(user)
+    role_codes = perms.role_codes
+    scopes = perms.asset_scopes
     if scope in ("office", "datacenter"):
         query = query.join(Category, Asset.category_id == Category.id).filter(Category.usage_scope == scope)
         joined_category = True
+    sort_keys = [Asset.id]
     if q:
-        like = f"%{q}%"
-        query = query.filter(or_(Asset.sn.like(like), Asset.name.like(like), Asset.asset_no.like(like)))
+        query, sort_keys = apply_asset_search(db, query, q)
+        if sort:
+            sort_keys = parse_asset_sort(sort)
+    else:
+        ranged = [
+            name
+            for name, bounds in (
+                ("purchase_at", (purchase_from, purchase_to)),
+                ("warranty_at", (warranty_from, warranty_to)),
+                ("price", (price_min, price_max)),
+            )
+            if any(bound is not None for bound in bounds)
+        ]
+        sort_keys = resolve_asset_sort(sort, ranged)
     if status is not None:
         query = query.filter(Asset.status == status)
+    query = apply_field_filters(db, query, request.query_params, category_id=category_id)
     if scopes:
         if scope and scope not in scopes:
             raise HTTPException(status_code=403, detail="Forbidden")
@@ -278,8 +303,152 @@ def list_assets(
             query = query.join(Category, Asset.category_id == Category.id)
             joined_category = True
         query = query.filter(Category.usage_scope == scope)
-    total, items = paginate(query.order_by(Asset.id.desc()), page, size)
-    return Page(total=total, items=items)
+    unfiltered = not (
+        q
+        or status is not None
+        or scope
+        or scopes
+        or column_filters
+        or "employee" in role_codes
+        or parse_field_filters(request.query_params)
+    )
+    return paginate_keyset(
+        query, sort_keys, size, page=page, cursor=cursor, with_total=with_total, estimate=unfiltered
+    )
+
+
+def parse_asset_sort(sort: str) -> list:
+    """Parse ``sort=-purchase_at,name`` into keyset sort keys ending with id.
+
+    Unless id is listed, it is appended as the tiebreak in the direction of
+    the leading field, so a single-field sort is served by that field's index.
+    """
+    keys = []
+    seen = set()
+    leading_desc = True
+    for part in sort.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        name = part.lstrip("-+")
+        column = ASSET_SORT_COLUMNS.get(name)
+        if column is None:
+            raise HTTPException(status_code=400, detail=f"Unsupported sort field: {name}")
+        if name in seen:
+            continue
+        if not keys:
+            leading_desc = part.startswith("-")
+        seen.add(name)
+        keys.append(column.desc() if part.startswith("-") else column.asc())
+    if "id" not in seen:
+        keys.append(Asset.id.desc() if leading_desc else Asset.id.asc())
+    return keys
+
+
+def resolve_asset_sort(sort: str | None, ranged: list[str]) -> list:
+    """Sort keys for a list query.
+
+    Without an explicit sort, a single range filter sorts by its column so the
+    ``(is_deleted, column)`` index serves both; other shapes (several ranges,
+    multi-field sorts, a filter with an unrelated sort) are still accepted and
+    run with a sort step.
+    """
+    if sort:
+        return parse_asset_sort(sort)
+    if len(ranged) == 1:
+        return parse_asset_sort(f"-{ranged[0]}")
+    return [Asset.id]
+
+
+def lookup_asset_by_code(db: Session, code: str) -> tuple[AssetOut, str | None] | None:
+    """Resolve an exact sn/asset_no through the unique indexes, via the hot cache.
+
+    Entries (including misses) are tagged with the shared assets/categories
+    write versions, so a change committed by any worker is seen on the next
+    lookup. Without Redis those versions only cover this process, so the
+    cache is bypassed.
+    """
+    versions = get_shared_table_versions(["assets", "categories"])
+    if versions is not None:
+        cached = _lookup_cache.get(code)
+        if cached is not None and cached[0] == versions:
+            return cached[1]
+    row = (
+        db.query(Asset, Category.usage_scope)
+        .outerjoin(Category, Asset.category_id == Category.id)
+        .filter(Asset.is_deleted == False, or_(Asset.sn == code, Asset.asset_no == code))
+        .first()
+    )
+    entry = (AssetOut.model_validate(row[0]), row[1]) if row else None
+    if versions is not None:
+        _lookup_cache.set(code, (versions, entry))
+    return entry
+
+
+@router.get("/lookup", response_model=list[AssetOut])
+def lookup_assets(
+    code: str = Query(..., min_length=1),
+    mode: str = Query("exact", pattern="^(exact|prefix)$"),
+    limit: int = Query(10, ge=1, le=50),
+    db: Session = Depends(get_db),
+    user=Depends(
+        require_any_permission(
+            [
+                ("office_hardware_assets", "view"),
+                ("datacenter_hardware_assets", "view"),
+            ]
+        )
+    ),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
+):
+    code = code.strip()
+    role_codes = perms.role_codes
+    scopes = perms.asset_scopes
+    if mode == "exact":
+        entry = lookup_asset_by_code(db, code)
+        if entry is None:
+            raise HTTPException(status_code=404, detail="Asset not found")
+        asset, usage_scope = entry
+        if scopes and usage_scope not in scopes:
+            raise HTTPException(status_code=403, detail="Forbidden")
+        if not scopes and "employee" in role_codes and asset.user_id != user.id:
+            raise HTTPException(status_code=403, detail="Forbidden")
+        return [asset]
+    query = db.query(Asset).filter(
+        Asset.is_deleted == False,
+        or_(Asset.sn.startswith(code, autoescape=True), Asset.asset_no.startswith(code, autoescape=True)),
+    )
+    if scopes:
+        query = query.join(Category, Asset.category_id == Category.id).filter(Category.usage_scope.in_(scopes))
+    elif "employee" in role_codes:
+        query = query.filter(Asset.user_id == user.id)
+    return query.order_by(Asset.sn.asc()).limit(limit).all()
+
+
+@router.post("/bulk/{action}", response_model=AssetBulkResult)
+def bulk_asset_action(
+    action: str,
+    payload: AssetBulkAction,
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
+):
+    transition = TRANSITIONS.get(action) if action in BULK_ACTIONS else None
+    if transition is None:
+        raise HTTPException(status_code=404, detail="Unknown action")
+    if not perms.has_any(transition.permissions):
+        raise HTTPException(status_code=403, detail="Forbidden")
+    results = bulk_transition(
+        db,
+        transition,
+        payload.asset_ids,
+        user.id,
+        payload.model_dump(exclude={"asset_ids"}),
+        allowed_scopes=perms.asset_scopes,
+    )
+    db.commit()
+    succeeded = sum(1 for item in results if item["success"])
+    return AssetBulkResult(action=action, succeeded=succeeded, failed=len(results) - succeeded, results=results)
 
 
 @router.get("/{asset_id}", response_model=AssetOut)
@@ -294,12 +463,13 @@ def get_asset(
             ]
         )
     ),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
     asset = db.query(Asset).filter(Asset.id == asset_id, Asset.is_deleted == False).first()
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
-    role_codes = get_user_role_codes(user)
-    scopes = get_asset_scopes(user)
+    role_codes = perms.role_codes
+    scopes = perms.asset_scopes
     if scopes:
         category = db.query(Category).filter(Category.id == asset.category_id).first()
         if not category or category.usage_scope not in scopes:
@@ -321,12 +491,13 @@ def create_asset(
             ]
         )
     ),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
     exists = db.query(Asset).filter(Asset.sn == payload.sn, Asset.is_deleted == False).first()
     if exists:
         raise HTTPException(status_code=400, detail="SN already exists")
     prefix = resolve_category_prefix(db, payload.category_id, payload.category)
-    scopes = get_asset_scopes(user)
+    scopes = perms.asset_scopes
     if scopes:
         category = db.query(Category).filter(Category.id == payload.category_id, Category.is_deleted == False).first()
         if not category or category.usage_scope not in scopes:
@@ -335,9 +506,8 @@ def create_asset(
     payload_data["asset_no"] = generate_asset_no(db, prefix)
     asset = Asset(**payload_data)
     db.add(asset)
-    db.commit()
-    db.refresh(asset)
-    log_change(db, asset.id, user.id, "IN", {"field": "create", "old": None, "new": payload.model_dump()})
+    db.flush()
+    log_change(db, asset.id, user.id, "IN", {"field": "create", "old": None, "new": payload.model_dump(mode="json")})
     db.commit()
     return asset
 
@@ -355,11 +525,12 @@ def update_asset(
             ]
         )
     ),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
     asset = db.query(Asset).filter(Asset.id == asset_id, Asset.is_deleted == False).first()
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
-    scopes = get_asset_scopes(user)
+    scopes = perms.asset_scopes
     if scopes:
         category = db.query(Category).filter(Category.id == asset.category_id).first()
         if not category or category.usage_scope not in scopes:
@@ -374,10 +545,9 @@ def update_asset(
     data.pop("asset_no", None)
     for key, value in data.items():
         setattr(asset, key, value)
+    changes = payload.model_dump(mode="json", exclude_unset=True)
+    log_change(db, asset.id, user.id, "UPDATE", {"field": "bulk", "old": None, "new": changes})
     db.commit()
-    log_change(db, asset.id, user.id, "UPDATE", {"field": "bulk", "old": None, "new": data})
-    db.commit()
-    db.refresh(asset)
     return asset
 
 
@@ -394,23 +564,14 @@ def checkout_asset(
             ]
         )
     ),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
-    asset = db.query(Asset).filter(Asset.id == asset_id, Asset.is_deleted == False).with_for_update().first()
-    if not asset:
-        raise HTTPException(status_code=404, detail="Asset not found")
-    if asset.status != 0:
-        raise HTTPException(status_code=400, detail="Asset not idle")
-    ensure_asset_scope(db, asset, user)
-    category = db.query(Category).filter(Category.id == asset.category_id).first()
-    if category and category.usage_scope == "office" and not user_id:
-        raise HTTPException(status_code=400, detail="User required for office assets")
-    asset.status = 1
-    asset.user_id = user_id if category and category.usage_scope == "office" else None
-    db.commit()
-    log_change(db, asset.id, user.id, "OUT", {"field": "status", "old": 0, "new": 1})
+    asset = apply_transition(
+        db, TRANSITIONS["checkout"], asset_id, user.id, {"user_id": user_id}, allowed_scopes=perms.asset_scopes
+    )
+    result = AssetOut.model_validate(asset)
     db.commit()
-    db.refresh(asset)
-    return asset
+    return result
 
 
 @router.post("/{asset_id}/checkin", response_model=AssetOut)
@@ -426,20 +587,14 @@ def checkin_asset(
             ]
         )
     ),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
-    asset = db.query(Asset).filter(Asset.id == asset_id, Asset.is_deleted == False).with_for_update().first()
-    if not asset:
-        raise HTTPException(status_code=404, detail="Asset not found")
-    if asset.status != 1:
-        raise HTTPException(status_code=400, detail="Asset not in use")
-    ensure_asset_scope(db, asset, user)
-    asset.status = 2 if damaged else 0
-    asset.user_id = None
-    db.commit()
-    log_change(db, asset.id, user.id, "IN", {"field": "status", "old": 1, "new": asset.status})
+    asset = apply_transition(
+        db, TRANSITIONS["checkin"], asset_id, user.id, {"damaged": damaged}, allowed_scopes=perms.asset_scopes
+    )
+    result = AssetOut.model_validate(asset)
     db.commit()
-    db.refresh(asset)
-    return asset
+    return result
 
 
 @router.post("/{asset_id}/transfer", response_model=AssetOut)
@@ -454,16 +609,16 @@ def transfer_asset(
             ]
         )
     ),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
     asset = db.query(Asset).filter(Asset.id == asset_id, Asset.is_deleted == False).with_for_update().first()
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
-    ensure_asset_scope(db, asset, user)
-    db.commit()
+    ensure_asset_scope(db, asset, perms)
     log_change(db, asset.id, user.id, "TRANSFER", {"field": "transfer", "old": None, "new": None})
+    result = AssetOut.model_validate(asset)
     db.commit()
-    db.refresh(asset)
-    return asset
+    return result
 
 
 @router.post("/{asset_id}/discard", response_model=AssetOut)
@@ -471,21 +626,12 @@ def discard_asset(
     asset_id: int,
     db: Session = Depends(get_db),
     user=Depends(require_permission("scrap", "update")),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
-    asset = db.query(Asset).filter(Asset.id == asset_id, Asset.is_deleted == False).with_for_update().first()
-    if not asset:
-        raise HTTPException(status_code=404, detail="Asset not found")
-    ensure_asset_scope(db, asset, user)
-    if asset.status == 1:
-        raise HTTPException(status_code=400, detail="Cannot discard in-use asset")
-    if asset.status not in (0, 2, 3):
-        raise HTTPException(status_code=400, detail="Invalid state")
-    asset.status = 3
-    db.commit()
-    log_change(db, asset.id, user.id, "DISCARD", {"field": "status", "old": None, "new": 3})
+    asset = apply_transition(db, TRANSITIONS["discard"], asset_id, user.id, allowed_scopes=perms.asset_scopes)
+    result = AssetOut.model_validate(asset)
     db.commit()
-    db.refresh(asset)
-    return asset
+    return result
 
 
 @router.post("/{asset_id}/scrap", response_model=AssetOut)
@@ -493,19 +639,12 @@ def scrap_asset(
     asset_id: int,
     db: Session = Depends(get_db),
     user=Depends(require_permission("scrap", "update")),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
-    asset = db.query(Asset).filter(Asset.id == asset_id, Asset.is_deleted == False).with_for_update().first()
-    if not asset:
-        raise HTTPException(status_code=404, detail="Asset not found")
-    ensure_asset_scope(db, asset, user)
-    if asset.status != 3:
-        raise HTTPException(status_code=400, detail="Asset not pending scrap")
-    asset.status = 4
+    asset = apply_transition(db, TRANSITIONS["scrap"], asset_id, user.id, allowed_scopes=perms.asset_scopes)
+    result = AssetOut.model_validate(asset)
     db.commit()
-    log_change(db, asset.id, user.id, "SCRAP", {"field": "status", "old": 3, "new": 4})
-    db.commit()
-    db.refresh(asset)
-    return asset
+    return result
 
 
 @router.post("/{asset_id}/unscrap", response_model=AssetOut)
@@ -514,28 +653,14 @@ def unscrap_asset(
     reason: str | None = Query(None),
     db: Session = Depends(get_db),
     user=Depends(require_permission("scrap", "update")),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
-    asset = db.query(Asset).filter(Asset.id == asset_id, Asset.is_deleted == False).with_for_update().first()
-    if not asset:
-        raise HTTPException(status_code=404, detail="Asset not found")
-    ensure_asset_scope(db, asset, user)
-    if asset.status not in (3, 4):
-        raise HTTPException(status_code=400, detail="Asset not in scrap state")
-    if asset.status == 4 and (not reason or not reason.strip()):
-        raise HTTPException(status_code=400, detail="Reason required for recovered scrap asset")
-    old_status = asset.status
-    asset.status = 0
-    db.commit()
-    log_change(
-        db,
-        asset.id,
-        user.id,
-        "UNSCRAP",
-        {"field": "status", "old": old_status, "new": 0, "reason": reason},
+    asset = apply_transition(
+        db, TRANSITIONS["unscrap"], asset_id, user.id, {"reason": reason}, allowed_scopes=perms.asset_scopes
     )
+    result = AssetOut.model_validate(asset)
     db.commit()
-    db.refresh(asset)
-    return asset
+    return result
 
 
 @router.delete("/{asset_id}", response_model=Message)
@@ -555,7 +680,6 @@ def delete_asset(
     if not asset:
         raise HTTPException(status_code=404, detail="Asset not found")
     asset.is_deleted = True
-    db.commit()
     log_change(db, asset.id, user.id, "DELETE", {"field": "is_deleted", "old": False, "new": True})
     db.commit()
     return Message(message="Deleted")
@@ -1,16 +1,29 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from app.core.database import get_db
-from app.core.deps import get_current_user
-from app.core.security import verify_password, create_access_token, hash_password
+from app.core.deps import collect_active_roles, get_current_user
+from app.core.permission_cache import bump_permission_version
+from app.core.principal_cache import invalidate_principal
+from app.core.rate_limit import begin_login_attempt, client_ip, release_login_attempt, reset_login_failures
+from app.core.security import (
+    UNUSABLE_PASSWORD_HASH,
+    create_access_token,
+    hash_password,
+    hash_password_async,
+    password_needs_update,
+    verify_password,
+    verify_password_async,
+)
 from app.models.user import User
 from app.models.ldap_config import LdapConfig
 from app.models.role import Role
 from app.models.role_permission import RolePermission
 from app.schemas.common import Token, Message
+from app.schemas.principal import Principal
 from app.utils.ldap_client import authenticate_user, extract_attr
 
 router = APIRouter(prefix="/api/v1/auth", tags=["auth"])
@@ -21,51 +34,61 @@ class ChangePasswordRequest(BaseModel):
     new_password: str
 
 
-@router.post("/login", response_model=Token)
-def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == form_data.username, User.is_deleted == False).first()
-    if not user or not verify_password(form_data.password, user.password_hash):
-        ldap_config = db.query(LdapConfig).first()
-        if not ldap_config or not ldap_config.is_active or not ldap_config.allow_login:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-        entry = authenticate_user(ldap_config, form_data.username, form_data.password)
-        if not entry:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
-        user = db.query(User).filter(User.username == form_data.username).first()
-        if not user:
-            if not ldap_config.auto_create:
-                raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
-            role = db.query(Role).filter(Role.code == ldap_config.default_role_code).first()
-            if not role:
-                role = db.query(Role).filter(Role.is_deleted == False).order_by(Role.id.asc()).first()
-            full_name = extract_attr(entry, ldap_config.display_name_attr) or form_data.username
-            dept = extract_attr(entry, ldap_config.dept_attr)
-            phone = extract_attr(entry, ldap_config.phone_attr)
-            user = User(
-                username=form_data.username,
-                full_name=full_name,
-                password_hash=hash_password(form_data.password),
-                role_id=role.id if role else 1,
-                dept=dept,
-                phone=phone,
-                is_active=True,
-                is_deleted=False,
-            )
-            db.add(user)
-            db.commit()
-            if role:
-                user.roles = [role]
-                db.commit()
-        else:
-            user.is_active = True
-            user.is_deleted = False
+def _find_login_user(db: Session, username: str) -> User | None:
+    return db.query(User).filter(User.username == username, User.is_deleted == False).first()
+
+
+def _save_password_hash(db: Session, user: User, password_hash: str):
+    user.password_hash = password_hash
+    db.commit()
+
+
+def _ldap_login(db: Session, username: str, password: str) -> User:
+    ldap_config = db.query(LdapConfig).first()
+    if not ldap_config or not ldap_config.is_active or not ldap_config.allow_login:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    entry = authenticate_user(ldap_config, username, password)
+    if not entry:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    user = db.query(User).filter(User.username == username).first()
+    if user and not user.is_active and user.auth_source != "ldap":
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid credentials")
+    if not user:
+        if not ldap_config.auto_create:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+        role = db.query(Role).filter(Role.code == ldap_config.default_role_code).first()
+        if not role:
+            role = db.query(Role).filter(Role.is_deleted == False).order_by(Role.id.asc()).first()
+        full_name = extract_attr(entry, ldap_config.display_name_attr) or username
+        dept = extract_attr(entry, ldap_config.dept_attr)
+        phone = extract_attr(entry, ldap_config.phone_attr)
+        user = User(
+            username=username,
+            full_name=full_name,
+            password_hash=UNUSABLE_PASSWORD_HASH,
+            role_id=role.id if role else 1,
+            dept=dept,
+            phone=phone,
+            is_active=True,
+            is_deleted=False,
+            auth_source="ldap",
+        )
+        db.add(user)
+        db.commit()
+        if role:
+            user.roles = [role]
             db.commit()
-    role_codes = []
-    if user.role and user.role.is_active:
-        role_codes.append(user.role.code)
-    if user.roles:
-        role_codes.extend([role.code for role in user.roles if role.is_active])
-    role_codes = list({code for code in role_codes if code})
+    else:
+        user.is_active = True
+        user.is_deleted = False
+        user.auth_source = "ldap"
+        db.commit()
+        invalidate_principal(user.id)
+    return user
+
+
+def _issue_token(user: User) -> Token:
+    _, role_codes = collect_active_roles(user)
     role_code = "super_admin" if "super_admin" in role_codes else (role_codes[0] if role_codes else "")
     token = create_access_token(
         {
@@ -79,6 +102,40 @@ def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depend
     return Token(access_token=token, username=user.username, full_name=user.full_name)
 
 
+@router.post("/login", response_model=Token)
+async def login(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db),
+):
+    """Async so that bcrypt runs are awaited instead of holding a worker
+    thread; database and LDAP calls still go through the threadpool. The
+    attempt is counted against the throttle before any credential check.
+
+    Directory accounts (``auth_source == "ldap"``) only authenticate by LDAP
+    bind; their local hash is never checked. Inactive local accounts are
+    refused; inactive directory accounts are re-enabled by a successful bind.
+    """
+    username, password = form_data.username, form_data.password
+    ip = client_ip(request)
+    attempt = await run_in_threadpool(begin_login_attempt, username, ip)
+    try:
+        user = await run_in_threadpool(_find_login_user, db, username)
+        local = user is not None and user.is_active and user.auth_source != "ldap"
+        if local and await verify_password_async(password, user.password_hash):
+            if password_needs_update(user.password_hash):
+                await run_in_threadpool(_save_password_hash, db, user, await hash_password_async(password))
+        else:
+            user = await run_in_threadpool(_ldap_login, db, username, password)
+    except HTTPException as exc:
+        # Every 401 counts as a failure; a busy password pool does not.
+        if exc.status_code != status.HTTP_401_UNAUTHORIZED:
+            await run_in_threadpool(release_login_attempt, username, ip, attempt)
+        raise
+    await run_in_threadpool(reset_login_failures, username, ip, attempt)
+    return await run_in_threadpool(_issue_token, user)
+
+
 @router.post("/init", response_model=Message)
 def init_system(db: Session = Depends(get_db)):
     roles = [
@@ -247,14 +304,18 @@ def seed_role_permissions(db: Session):
                 continue
             db.add(RolePermission(role_id=role_id, resource=resource, action=action, scope=scope))
     db.commit()
+    bump_permission_version()
 
 
 @router.post("/change-password", response_model=Message)
 def change_password(
     payload: ChangePasswordRequest,
     db: Session = Depends(get_db),
-    user: User = Depends(get_current_user),
+    principal: Principal = Depends(get_current_user),
 ):
+    user = db.query(User).filter(User.id == principal.id, User.is_deleted == False).first()
+    if not user:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
     if not verify_password(payload.old_password, user.password_hash):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid password")
     user.password_hash = hash_password(payload.new_password)
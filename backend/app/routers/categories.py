@@ -4,13 +4,15 @@ from sqlalchemy import or_, func
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.core.deps import require_permission
+from app.core.deps import EffectivePermissions, get_effective_permissions, require_permission
 from app.models.category import Category
 from app.models.category_field import CategoryField
 from app.models.asset_field_value import AssetFieldValue
+from app.models.asset_field_index import AssetFieldIndex
 from app.schemas.category import CategoryCreate, CategoryOut, CategoryUpdate
 from app.schemas.category_field import CategoryFieldCreate, CategoryFieldOut, CategoryFieldUpdate, FIELD_TYPES
 from app.schemas.common import Message
+from app.utils.field_index import reindex_field
 
 router = APIRouter(prefix="/api/v1/categories", tags=["categories"])
 
@@ -25,24 +27,6 @@ def normalize_select_config(data: dict):
         data["searchable"] = False
 
 
-def get_user_role_codes(user) -> set[str]:
-    codes = set()
-    if user.role:
-        codes.add(user.role.code)
-    if user.roles:
-        codes.update([role.code for role in user.roles])
-    return codes
-
-
-def get_asset_scopes(user) -> set[str]:
-    codes = get_user_role_codes(user)
-    scopes = set()
-    if "office_asset_admin" in codes:
-        scopes.add("office")
-    if "datacenter_asset_admin" in codes:
-        scopes.add("datacenter")
-    return scopes
-
 OFFICE_BASE_FIELDS = [
     ("品牌型号", "brand_model", "text", 1, False, None),
     ("使用人", "user_name", "text", 2, False, None),
@@ -147,9 +131,10 @@ def seed_datacenter_fields_for_category(db: Session, category_id: int):
 def list_categories(
     db: Session = Depends(get_db),
     user=Depends(require_permission("asset_types", "view")),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
     query = db.query(Category).filter(Category.is_deleted == False)
-    scopes = get_asset_scopes(user)
+    scopes = perms.asset_scopes
     if len(scopes) == 1:
         query = query.filter(Category.usage_scope.in_(scopes))
     return query.order_by(Category.id.desc()).all()
@@ -160,6 +145,7 @@ def list_categories_by_scope(
     dept: str | None = None,
     db: Session = Depends(get_db),
     user=Depends(require_permission("asset_types", "view")),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
     query = db.query(Category).filter(Category.is_deleted == False)
     scope = None
@@ -167,7 +153,7 @@ def list_categories_by_scope(
         scope = "office"
     elif dept == "数据中心":
         scope = "datacenter"
-    scopes = get_asset_scopes(user)
+    scopes = perms.asset_scopes
     if len(scopes) == 1:
         scope = list(scopes)[0]
     elif scopes and scope and scope not in scopes:
@@ -182,8 +168,9 @@ def create_category(
     payload: CategoryCreate,
     db: Session = Depends(get_db),
     user=Depends(require_permission("asset_types", "create")),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
-    scopes = get_asset_scopes(user)
+    scopes = perms.asset_scopes
     if scopes and payload.usage_scope not in scopes:
         raise HTTPException(status_code=403, detail="Forbidden")
     exists = db.query(Category).filter(Category.name == payload.name).first()
@@ -212,11 +199,12 @@ def update_category(
     payload: CategoryUpdate,
     db: Session = Depends(get_db),
     user=Depends(require_permission("asset_types", "update")),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
     item = db.query(Category).filter(Category.id == category_id, Category.is_deleted == False).first()
     if not item:
         raise HTTPException(status_code=404, detail="Category not found")
-    scopes = get_asset_scopes(user)
+    scopes = perms.asset_scopes
     if scopes and item.usage_scope not in scopes:
         raise HTTPException(status_code=403, detail="Forbidden")
     data = payload.model_dump(exclude_unset=True)
@@ -249,6 +237,7 @@ def delete_category(
         for row in db.query(CategoryField.id).filter(CategoryField.category_id == category_id).all()
     ]
     if field_ids:
+        db.query(AssetFieldIndex).filter(AssetFieldIndex.field_id.in_(field_ids)).delete(synchronize_session=False)
         db.query(AssetFieldValue).filter(AssetFieldValue.field_id.in_(field_ids)).delete(synchronize_session=False)
     db.query(CategoryField).filter(CategoryField.category_id == category_id).delete(synchronize_session=False)
     db.delete(item)
@@ -262,6 +251,7 @@ def list_fields(
     dept: str | None = None,
     db: Session = Depends(get_db),
     user=Depends(require_permission("asset_types", "view")),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
     query = db.query(CategoryField).filter(
         CategoryField.category_id == category_id,
@@ -272,7 +262,7 @@ def list_fields(
         scope = "office"
     elif dept == "数据中心":
         scope = "datacenter"
-    scopes = get_asset_scopes(user)
+    scopes = perms.asset_scopes
     if len(scopes) == 1:
         scope = list(scopes)[0]
     elif scopes and scope and scope not in scopes:
@@ -338,13 +328,14 @@ def create_field(
     payload: CategoryFieldCreate,
     db: Session = Depends(get_db),
     user=Depends(require_permission("asset_types", "create")),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
     if payload.field_type not in FIELD_TYPES and payload.field_type != "combo_select":
         raise HTTPException(status_code=400, detail="Invalid field type")
     category = db.query(Category).filter(Category.id == category_id, Category.is_deleted == False).first()
     if not category:
         raise HTTPException(status_code=404, detail="Category not found")
-    scopes = get_asset_scopes(user)
+    scopes = perms.asset_scopes
     if scopes and category.usage_scope not in scopes:
         raise HTTPException(status_code=403, detail="Forbidden")
     data = payload.model_dump()
@@ -364,19 +355,23 @@ def update_field(
     payload: CategoryFieldUpdate,
     db: Session = Depends(get_db),
     user=Depends(require_permission("asset_types", "update")),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
     item = db.query(CategoryField).filter(CategoryField.id == field_id, CategoryField.is_deleted == False).first()
     if not item:
         raise HTTPException(status_code=404, detail="Field not found")
-    scopes = get_asset_scopes(user)
+    scopes = perms.asset_scopes
     if scopes and item.usage_scope not in scopes:
         raise HTTPException(status_code=403, detail="Forbidden")
     data = payload.model_dump(exclude_unset=True)
     if "field_type" in data and data["field_type"] not in FIELD_TYPES and data["field_type"] != "combo_select":
         raise HTTPException(status_code=400, detail="Invalid field type")
     normalize_select_config(data)
+    type_changed = "field_type" in data and data["field_type"] != item.field_type
     for key, value in data.items():
         setattr(item, key, value)
+    if type_changed:
+        reindex_field(db, item)
     db.commit()
     db.refresh(item)
     return item
@@ -387,6 +382,7 @@ def delete_field(
     field_id: int,
     db: Session = Depends(get_db),
     user=Depends(require_permission("asset_types", "delete")),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
     item = db.query(CategoryField).filter(CategoryField.id == field_id, CategoryField.is_deleted == False).first()
     if not item:
@@ -398,7 +394,7 @@ def delete_field(
     )
     if in_use:
         raise HTTPException(status_code=400, detail="Field is in use")
-    scopes = get_asset_scopes(user)
+    scopes = perms.asset_scopes
     if scopes and item.usage_scope not in scopes:
         raise HTTPException(status_code=403, detail="Forbidden")
     db.delete(item)
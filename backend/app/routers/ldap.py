@@ -1,17 +1,35 @@
-from fastapi import APIRouter, Depends, HTTPException
+import time
+from datetime import datetime, timedelta
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from ldap3.core.exceptions import LDAPException
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
+from app.core.config import settings
 from app.core.database import get_db
 from app.core.deps import require_permission
-from app.core.security import hash_password
+from app.core.principal_cache import invalidate_all_principals, invalidate_principal
+from app.core.security import UNUSABLE_PASSWORD_HASH
 from app.models.ldap_config import LdapConfig
 from app.models.role import Role
 from app.models.user import User
+from app.models.user_role import user_roles
 from app.schemas.ldap import LdapConfigUpdate, LdapConfigOut, LdapTestResult, LdapSyncResult
-from app.utils.ldap_client import authenticate_user, search_users, extract_attr
+from app.utils.ldap_client import (
+    build_delta_filter,
+    entry_watermark,
+    extract_attr,
+    iter_user_pages,
+    newer_watermark,
+    reset_pools,
+    search_users,
+)
 
 router = APIRouter(prefix="/api/v1/ldap", tags=["ldap"])
 
+WATERMARK_SCOPE_FIELDS = ("provider", "host", "port", "base_dn", "user_filter", "username_attr")
+
 
 def get_or_create_config(db: Session) -> LdapConfig:
     config = db.query(LdapConfig).first()
@@ -45,6 +63,9 @@ def to_out(config: LdapConfig) -> LdapConfigOut:
         allow_login=config.allow_login,
         auto_create=config.auto_create,
         has_password=bool(config.bind_password),
+        sync_watermark=config.sync_watermark,
+        last_sync_at=config.last_sync_at,
+        last_full_sync_at=config.last_full_sync_at,
     )
 
 
@@ -63,11 +84,15 @@ def update_config(
     config = get_or_create_config(db)
     data = payload.model_dump()
     bind_password = data.pop("bind_password", None)
+    if any(getattr(config, key) != data.get(key) for key in WATERMARK_SCOPE_FIELDS):
+        config.sync_watermark = None
+        config.last_full_sync_at = None
     for key, value in data.items():
         setattr(config, key, value)
     if bind_password:
         config.bind_password = bind_password
     db.commit()
+    reset_pools()
     db.refresh(config)
     return to_out(config)
 
@@ -84,8 +109,96 @@ def test_config(db: Session = Depends(get_db), _: object = Depends(require_permi
         return LdapTestResult(ok=False, message=str(exc))
 
 
+def sync_page(db: Session, config: LdapConfig, role: Role, entries) -> dict:
+    result = {"created": [], "updated": 0, "unchanged": 0, "skipped": 0}
+    rows = {}
+    for entry in entries:
+        username = extract_attr(entry, config.username_attr)
+        if not username:
+            result["skipped"] += 1
+            continue
+        rows[username] = {
+            "full_name": extract_attr(entry, config.display_name_attr) or username,
+            "dept": extract_attr(entry, config.dept_attr),
+            "phone": extract_attr(entry, config.phone_attr),
+        }
+    if not rows:
+        return result
+    existing = {user.username: user for user in db.query(User).filter(User.username.in_(list(rows))).all()}
+    for username, data in rows.items():
+        user = existing.get(username)
+        if not user:
+            continue
+        data = {**data, "is_active": True, "auth_source": "ldap"}
+        if all(getattr(user, key) == value for key, value in data.items()):
+            result["unchanged"] += 1
+            continue
+        for key, value in data.items():
+            setattr(user, key, value)
+        result["updated"] += 1
+    new_rows = [
+        {
+            "username": username,
+            "password_hash": UNUSABLE_PASSWORD_HASH,
+            "role_id": role.id,
+            "is_active": True,
+            "is_deleted": False,
+            "auth_source": "ldap",
+            **data,
+        }
+        for username, data in rows.items()
+        if username not in existing
+    ]
+    if new_rows:
+        db.execute(insert(User), new_rows)
+        created_ids = [
+            row[0]
+            for row in db.query(User.id).filter(User.username.in_([row["username"] for row in new_rows])).all()
+        ]
+        db.execute(insert(user_roles), [{"user_id": user_id, "role_id": role.id} for user_id in created_ids])
+        result["created"] = created_ids
+    db.commit()
+    return result
+
+
+def deactivate_missing_users(db: Session, seen: set[str]) -> int:
+    candidates = (
+        db.query(User.id, User.username)
+        .filter(User.auth_source == "ldap", User.is_active == True, User.is_deleted == False)
+        .all()
+    )
+    missing = [row.id for row in candidates if row.username not in seen]
+    if missing and (not seen or len(missing) > len(candidates) * settings.ldap_max_deactivate_fraction):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Refusing to deactivate {len(missing)} of {len(candidates)} LDAP users; check base_dn and user_filter",
+        )
+    for start in range(0, len(missing), settings.ldap_page_size):
+        batch = missing[start:start + settings.ldap_page_size]
+        db.query(User).filter(User.id.in_(batch)).update({User.is_active: False}, synchronize_session=False)
+        db.commit()
+        for user_id in batch:
+            invalidate_principal(user_id)
+    return len(missing)
+
+
+def resolve_sync_mode(config: LdapConfig, mode: str) -> str:
+    if mode == "full" or not config.sync_watermark:
+        return "full"
+    if mode == "delta":
+        return "delta"
+    interval = timedelta(hours=settings.ldap_full_sync_interval_hours)
+    if not config.last_full_sync_at or datetime.utcnow() - config.last_full_sync_at >= interval:
+        return "full"
+    return "delta"
+
+
 @router.post("/sync", response_model=LdapSyncResult)
-def sync_users(db: Session = Depends(get_db), _: object = Depends(require_permission("users", "update"))):
+def sync_users(
+    mode: str = Query("auto", pattern="^(auto|full|delta)$"),
+    db: Session = Depends(get_db),
+    _: object = Depends(require_permission("users", "update")),
+):
     config = get_or_create_config(db)
     if not config.is_active:
         raise HTTPException(status_code=400, detail="LDAP not enabled")
@@ -96,45 +209,59 @@ def sync_users(db: Session = Depends(get_db), _: object = Depends(require_permis
         role = db.query(Role).filter(Role.is_deleted == False).order_by(Role.id.asc()).first()
     if not role:
         raise HTTPException(status_code=400, detail="No default role available")
-    try:
-        entries = search_users(config)
-    except Exception as exc:
-        raise HTTPException(status_code=400, detail=str(exc))
 
-    created = 0
+    mode = resolve_sync_mode(config, mode)
+    search_filter = build_delta_filter(config, config.sync_watermark) if mode == "delta" else None
+    started_at = time.monotonic()
+    sync_started_at = datetime.utcnow()
+    entries = 0
+    created_ids: list[int] = []
     updated = 0
+    unchanged = 0
     skipped = 0
-    for entry in entries:
-        username = extract_attr(entry, config.username_attr)
-        if not username:
-            skipped += 1
-            continue
-        full_name = extract_attr(entry, config.display_name_attr) or username
-        dept = extract_attr(entry, config.dept_attr)
-        phone = extract_attr(entry, config.phone_attr)
-        user = db.query(User).filter(User.username == username).first()
-        if not user:
-            user = User(
-                username=username,
-                full_name=full_name,
-                password_hash=hash_password(username),
-                role_id=role.id,
-                dept=dept,
-                phone=phone,
-                is_active=True,
-                is_deleted=False,
-            )
-            db.add(user)
-            db.commit()
-            user.roles = [role]
-            db.commit()
-            created += 1
-            continue
-        user.full_name = full_name
-        user.dept = dept
-        user.phone = phone
-        user.is_active = True
-        db.commit()
-        updated += 1
+    deactivated = 0
+    watermark = config.sync_watermark if mode == "delta" else None
+    seen: set[str] = set()
+    try:
+        for page in iter_user_pages(config, settings.ldap_page_size, search_filter=search_filter):
+            entries += len(page)
+            for entry in page:
+                watermark = newer_watermark(config, watermark, entry_watermark(config, entry))
+                if mode == "full":
+                    username = extract_attr(entry, config.username_attr)
+                    if username:
+                        seen.add(username)
+            result = sync_page(db, config, role, page)
+            created_ids.extend(result["created"])
+            updated += result["updated"]
+            unchanged += result["unchanged"]
+            skipped += result["skipped"]
+        if mode == "full":
+            deactivated = deactivate_missing_users(db, seen)
+    except LDAPException as exc:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(exc))
+    finally:
+        if updated:
+            invalidate_all_principals()
+
+    config.sync_watermark = watermark or config.sync_watermark
+    config.last_sync_at = sync_started_at
+    if mode == "full":
+        config.last_full_sync_at = sync_started_at
+    db.commit()
 
-    return LdapSyncResult(ok=True, created=created, updated=updated, skipped=skipped)
+    elapsed = time.monotonic() - started_at
+    return LdapSyncResult(
+        ok=True,
+        mode=mode,
+        created=len(created_ids),
+        updated=updated,
+        unchanged=unchanged,
+        skipped=skipped,
+        deactivated=deactivated,
+        entries=entries,
+        watermark=config.sync_watermark,
+        elapsed_seconds=round(elapsed, 3),
+        entries_per_second=round(entries / elapsed, 1) if elapsed > 0 else float(entries),
+    )
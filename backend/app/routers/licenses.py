@@ -7,7 +7,7 @@ from app.core.deps import require_permission
 from app.models.license import License
 from app.schemas.license import LicenseCreate, LicenseOut
 from app.schemas.common import Page
-from app.utils.pagination import paginate
+from app.utils.pagination import paginate_keyset
 
 router = APIRouter(prefix="/api/v1/licenses", tags=["licenses"])
 
@@ -17,6 +17,8 @@ def list_licenses(
     page: int = 1,
     size: int = 20,
     q: str | None = None,
+    cursor: str | None = None,
+    with_total: bool | None = None,
     db: Session = Depends(get_db),
     _: object = Depends(require_permission("software_assets", "view")),
 ):
@@ -24,8 +26,9 @@ def list_licenses(
     if q:
         like = f"%{q}%"
         query = query.filter(or_(License.software_name.like(like), License.vendor.like(like)))
-    total, items = paginate(query.order_by(License.id.desc()), page, size)
-    return Page(total=total, items=items)
+    return paginate_keyset(
+        query, [License.id], size, page=page, cursor=cursor, with_total=with_total, estimate=not q
+    )
 
 
 @router.get("/{license_id}", response_model=LicenseOut)
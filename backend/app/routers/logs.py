@@ -0,0 +1,168 @@
+import heapq
+from datetime import datetime
+from itertools import islice
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.deps import require_permission
+from app.core.log_archive import archive_old_logs, read_archived_logs
+from app.models.asset import Asset
+from app.models.asset_log import AssetLog
+from app.models.asset_log_archive import AssetLogArchive
+from app.models.user import User
+from app.schemas.asset_log import AssetLogArchiveOut, AssetLogArchiveRun, AssetLogOut
+from app.schemas.common import Page
+from app.utils.pagination import cursor_for, cursor_values, paginate_keyset, seek_keyset
+
+router = APIRouter(prefix="/api/v1/logs", tags=["logs"])
+
+
+def to_log_out(items: list[AssetLog], db: Session) -> list[AssetLogOut]:
+    asset_ids = {item.asset_id for item in items}
+    operator_ids = {item.operator_id for item in items}
+    assets = (
+        {row.id: row for row in db.query(Asset.id, Asset.sn, Asset.name).filter(Asset.id.in_(asset_ids)).all()}
+        if asset_ids
+        else {}
+    )
+    operators = (
+        {row.id: row for row in db.query(User.id, User.username, User.full_name).filter(User.id.in_(operator_ids)).all()}
+        if operator_ids
+        else {}
+    )
+    result = []
+    for item in items:
+        asset = assets.get(item.asset_id)
+        operator = operators.get(item.operator_id)
+        result.append(
+            AssetLogOut(
+                id=item.id,
+                asset_id=item.asset_id,
+                asset_sn=asset.sn if asset else None,
+                asset_name=asset.name if asset else None,
+                operator_id=item.operator_id,
+                operator_name=(operator.full_name or operator.username) if operator else None,
+                action_type=item.action_type,
+                change_data=item.change_data,
+                created_at=item.created_at,
+            )
+        )
+    return result
+
+
+@router.get("", response_model=Page[AssetLogOut])
+def list_logs(
+    page: int = 1,
+    size: int = Query(20, ge=1, le=200),
+    asset_id: int | None = None,
+    asset: str | None = None,
+    operator_id: int | None = None,
+    operator: str | None = None,
+    action_type: str | None = None,
+    start: datetime | None = None,
+    end: datetime | None = None,
+    cursor: str | None = None,
+    with_total: bool | None = None,
+    include_archived: bool = False,
+    db: Session = Depends(get_db),
+    _: object = Depends(require_permission("logs", "view")),
+):
+    """Newest first. ``asset`` matches an SN or asset number and ``operator``
+    a username; both are resolved to ids first so the composite indexes apply.
+    ``action_type`` takes a comma-separated list. With ``include_archived``
+    hot and archived rows are merged by ``(created_at, id)``; those pages are
+    cursor-only and have no total."""
+    query = db.query(AssetLog)
+    filtered = False
+    asset_ids = operator_ids = actions = None
+    if asset_id is not None:
+        asset_ids = {asset_id}
+    if asset:
+        ids = {row.id for row in db.query(Asset.id).filter(or_(Asset.sn == asset, Asset.asset_no == asset)).all()}
+        asset_ids = ids if asset_ids is None else asset_ids & ids
+    if asset_ids is not None:
+        query = query.filter(AssetLog.asset_id.in_(asset_ids))
+        filtered = True
+    if operator_id is not None:
+        operator_ids = {operator_id}
+    if operator:
+        ids = {row.id for row in db.query(User.id).filter(User.username == operator).all()}
+        operator_ids = ids if operator_ids is None else operator_ids & ids
+    if operator_ids is not None:
+        query = query.filter(AssetLog.operator_id.in_(operator_ids))
+        filtered = True
+    if action_type:
+        actions = [item.strip().upper() for item in action_type.split(",") if item.strip()]
+        query = query.filter(AssetLog.action_type.in_(actions))
+        filtered = True
+    if start:
+        query = query.filter(AssetLog.created_at >= start)
+        filtered = True
+    if end:
+        query = query.filter(AssetLog.created_at < end)
+        filtered = True
+    keys = [AssetLog.created_at, AssetLog.id]
+    if include_archived:
+        filters = {
+            "asset_ids": asset_ids,
+            "operator_ids": operator_ids,
+            "actions": actions,
+            "start": start,
+            "end": end,
+        }
+        return list_with_archive(db, query, keys, filters, size, cursor)
+    result = paginate_keyset(
+        query,
+        keys,
+        size,
+        page=page,
+        cursor=cursor,
+        with_total=with_total,
+        estimate=not filtered,
+    )
+    result.items = to_log_out(result.items, db)
+    return result
+
+
+def _log_key(item: AssetLog) -> tuple:
+    return item.created_at, item.id
+
+
+def list_with_archive(db: Session, query, keys, filters: dict, size: int, cursor: str | None) -> Page[AssetLogOut]:
+    # Hot and archived rows can interleave (late rows for an archived month
+    # stay hot until the next run), so both sides are read past the cursor
+    # and merged. A row that is archived but not yet deleted is kept once.
+    rows = seek_keyset(query, keys, cursor).limit(size + 1).all()
+    newest_archived = db.query(func.max(AssetLogArchive.end_at)).scalar()
+    if newest_archived is not None and (len(rows) <= size or rows[-1].created_at < newest_archived):
+        before = tuple(cursor_values(keys, cursor)) if cursor else None
+        hot_ids = {row.id for row in rows}
+        archived = [row for row in read_archived_logs(db, filters, before, size + 1) if row.id not in hot_ids]
+        rows = list(islice(heapq.merge(rows, archived, key=_log_key, reverse=True), size + 1))
+    items = rows[:size]
+    next_cursor = cursor_for(keys, items[-1]) if len(rows) > size and items else None
+    return Page(total=None, items=to_log_out(items, db), next_cursor=next_cursor)
+
+
+@router.get("/archives", response_model=list[AssetLogArchiveOut])
+def list_archives(
+    db: Session = Depends(get_db),
+    _: object = Depends(require_permission("logs", "view")),
+):
+    return db.query(AssetLogArchive).order_by(AssetLogArchive.start_at.desc(), AssetLogArchive.id.desc()).all()
+
+
+@router.post("/archive", response_model=AssetLogArchiveRun)
+def run_archive(
+    before: datetime | None = None,
+    _: object = Depends(require_permission("settings", "update")),
+):
+    """Roll months older than ``before`` (default: the configured hot window)
+    out of asset_logs into archive files."""
+    try:
+        return AssetLogArchiveRun(archived=archive_old_logs(before))
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
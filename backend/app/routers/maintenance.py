@@ -1,11 +1,9 @@
-from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
 from app.core.deps import require_permission
 from app.models.asset import Asset
-from app.models.asset_log import AssetLog
 from app.models.maintenance import MaintenanceInfo, RepairRecord
 from app.schemas.maintenance import (
     MaintenanceInfoCreate,
@@ -16,22 +14,11 @@ from app.schemas.maintenance import (
     RepairRecordUpdate,
 )
 from app.schemas.common import Message
+from app.utils.asset_lifecycle import TRANSITIONS, apply_transition
 
 router = APIRouter(prefix="/api/v1/maintenance", tags=["maintenance"])
 
 
-def log_change(db: Session, asset_id: int, operator_id: int, action_type: str, change_data: dict):
-    db.add(
-        AssetLog(
-            asset_id=asset_id,
-            operator_id=operator_id,
-            action_type=action_type,
-            change_data=change_data,
-            created_at=datetime.utcnow(),
-        )
-    )
-
-
 @router.get("/repairs", response_model=list[RepairRecordOut])
 def list_repairs(
     status: str | None = None,
@@ -62,14 +49,9 @@ def create_repair(
     db: Session = Depends(get_db),
     user=Depends(require_permission("maintenance", "create")),
 ):
-    asset = db.query(Asset).filter(Asset.id == payload.asset_id, Asset.is_deleted == False).first()
-    if not asset:
-        raise HTTPException(status_code=404, detail="Asset not found")
+    apply_transition(db, TRANSITIONS["repair"], payload.asset_id, user.id)
     record = RepairRecord(**payload.model_dump())
     db.add(record)
-    asset.status = 2
-    db.commit()
-    log_change(db, asset.id, user.id, "REPAIR", {"field": "status", "old": None, "new": 2})
     db.commit()
     db.refresh(record)
     return record
@@ -89,10 +71,8 @@ def update_repair(
     for key, value in data.items():
         setattr(record, key, value)
     if "status" in data and data["status"] == "closed":
-        asset = db.query(Asset).filter(Asset.id == record.asset_id, Asset.is_deleted == False).first()
-        if asset:
-            asset.status = 0
-            log_change(db, asset.id, user.id, "REPAIR", {"field": "status", "old": 2, "new": 0})
+        # Only an asset still under repair goes back to idle.
+        apply_transition(db, TRANSITIONS["repair_close"], record.asset_id, user.id, missing_ok=True)
     db.commit()
     db.refresh(record)
     return record
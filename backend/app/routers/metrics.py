@@ -0,0 +1,17 @@
+from fastapi import APIRouter, Depends
+
+from app.core.audit_log import get_log_outbox_stats
+from app.core.deps import require_permission
+from app.core.hashing import get_hash_pool_stats
+from app.core.rate_limit import get_login_throttle_stats
+
+router = APIRouter(prefix="/api/v1/metrics", tags=["metrics"])
+
+
+@router.get("")
+def get_metrics(_: object = Depends(require_permission("settings", "view"))):
+    return {
+        "password_hashing": get_hash_pool_stats(),
+        "login_throttle": get_login_throttle_stats(),
+        "audit_log_outbox": get_log_outbox_stats(),
+    }
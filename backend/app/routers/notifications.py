@@ -4,13 +4,12 @@ from fastapi import APIRouter, Depends
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.core.deps import require_permission, get_permission_scope
+from app.core.deps import EffectivePermissions, get_effective_permissions, require_permission
 from app.models.asset import Asset
 from app.models.asset_field_value import AssetFieldValue
 from app.models.category import Category
 from app.models.category_field import CategoryField
 from app.models.license import License
-from app.models.role_permission import RolePermission
 from app.models.software_field import SoftwareField
 from app.models.software_field_value import SoftwareFieldValue
 from app.models.system_app import SystemApp
@@ -34,52 +33,6 @@ def parse_date(value):
     return None
 
 
-def get_user_role_codes(user) -> set[str]:
-    codes = set()
-    if user.role and user.role.is_active:
-        codes.add(user.role.code)
-    if user.roles:
-        codes.update([role.code for role in user.roles if role.is_active])
-    return codes
-
-
-def get_asset_scopes(user) -> set[str]:
-    codes = get_user_role_codes(user)
-    scopes = set()
-    if "office_asset_admin" in codes:
-        scopes.add("office")
-    if "datacenter_asset_admin" in codes:
-        scopes.add("datacenter")
-    return scopes
-
-
-def has_permission(db: Session, user, resource: str, action: str) -> bool:
-    role_ids = []
-    role_codes = []
-    if user.role_id and user.role and user.role.is_active:
-        role_ids.append(user.role_id)
-        role_codes.append(user.role.code)
-    if getattr(user, "roles", None):
-        role_ids.extend([role.id for role in user.roles if role.is_active])
-        role_codes.extend([role.code for role in user.roles if role.is_active])
-    role_ids = list({rid for rid in role_ids if rid})
-    role_codes = list({code for code in role_codes if code})
-    if "super_admin" in role_codes:
-        return True
-    if not role_ids:
-        return False
-    return (
-        db.query(RolePermission)
-        .filter(
-            RolePermission.role_id.in_(role_ids),
-            RolePermission.resource == resource,
-            RolePermission.action == action,
-        )
-        .first()
-        is not None
-    )
-
-
 def split_owners(value: str | None) -> list[str]:
     if not value:
         return []
@@ -110,16 +63,17 @@ def user_is_ops_owner(user, system: SystemApp) -> bool:
 def list_notifications(
     db: Session = Depends(get_db),
     user: object = Depends(require_permission("notifications", "view")),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
     today = date.today()
     results: list[NotificationOut] = []
-    role_codes = get_user_role_codes(user)
-    scopes = get_asset_scopes(user)
+    role_codes = perms.role_codes
+    scopes = perms.asset_scopes
     category_cache: dict[int, Category | None] = {}
-    can_view_system = has_permission(db, user, "system_assets", "view")
-    can_view_software = has_permission(db, user, "software_assets", "view")
-    can_view_office_assets = has_permission(db, user, "office_hardware_assets", "view")
-    can_view_datacenter_assets = has_permission(db, user, "datacenter_hardware_assets", "view")
+    can_view_system = perms.has("system_assets", "view")
+    can_view_software = perms.has("software_assets", "view")
+    can_view_office_assets = perms.has("office_hardware_assets", "view")
+    can_view_datacenter_assets = perms.has("datacenter_hardware_assets", "view")
     can_view_assets = can_view_office_assets or can_view_datacenter_assets
 
     asset_fields = (
@@ -186,7 +140,7 @@ def list_notifications(
         .all()
     )
     if can_view_system:
-        system_scope = get_permission_scope(db, user, "system_assets", "view")
+        system_scope = perms.scope("system_assets", "view")
         for field in system_fields:
             days_before = field.reminder_days or 0
             values = (
@@ -7,7 +7,7 @@ from app.core.deps import require_permission
 from app.models.person import Person
 from app.schemas.common import Message, Page
 from app.schemas.person import PersonCreate, PersonOut, PersonUpdate
-from app.utils.pagination import paginate
+from app.utils.pagination import paginate_keyset
 
 router = APIRouter(prefix="/api/v1/people", tags=["people"])
 
@@ -18,6 +18,8 @@ def list_people(
     size: int = 50,
     q: str | None = None,
     dept_id: int | None = None,
+    cursor: str | None = None,
+    with_total: bool | None = None,
     db: Session = Depends(get_db),
     _: object = Depends(require_permission("people", "view")),
 ):
@@ -27,8 +29,9 @@ def list_people(
         query = query.filter(or_(Person.name.like(like), Person.emp_code.like(like)))
     if dept_id:
         query = query.filter(Person.dept_id == dept_id)
-    total, items = paginate(query.order_by(Person.id.desc()), page, size)
-    return Page(total=total, items=items)
+    return paginate_keyset(
+        query, [Person.id], size, page=page, cursor=cursor, with_total=with_total, estimate=not (q or dept_id)
+    )
 
 
 @router.get("/options")
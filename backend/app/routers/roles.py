@@ -2,7 +2,9 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 
 from app.core.database import get_db
-from app.core.deps import get_current_user, require_permission
+from app.core.deps import EffectivePermissions, get_effective_permissions, require_permission
+from app.core.permission_cache import bump_permission_version
+from app.core.principal_cache import invalidate_all_principals
 from app.models.role import Role
 from app.models.user import User
 from app.models.role_permission import RolePermission
@@ -23,31 +25,12 @@ def list_roles(db: Session = Depends(get_db), _: object = Depends(require_permis
 
 
 @router.get("/me/permissions", response_model=list[RolePermissionOut])
-def list_my_permissions(db: Session = Depends(get_db), user=Depends(get_current_user)):
-    role_ids = []
-    role_codes = []
-    if user.role_id and user.role and user.role.is_active:
-        role_ids.append(user.role_id)
-        role_codes.append(user.role.code)
-    if user.roles:
-        role_ids.extend([role.id for role in user.roles if role.is_active])
-        role_codes.extend([role.code for role in user.roles if role.is_active])
-    role_ids = list({rid for rid in role_ids if rid})
-    role_codes = list({code for code in role_codes if code})
-    if "super_admin" in role_codes:
+def list_my_permissions(perms: EffectivePermissions = Depends(get_effective_permissions)):
+    if perms.is_super_admin:
         return []
-    if not role_ids:
-        return []
-    items = db.query(RolePermission).filter(RolePermission.role_id.in_(role_ids)).all()
-    merged = {}
-    for item in items:
-        key = f"{item.resource}:{item.action}"
-        scope = item.scope or "all"
-        if key not in merged or merged[key] == "own" and scope == "all":
-            merged[key] = scope
     return [
-        {"resource": k.split(":")[0], "action": k.split(":")[1], "scope": v}
-        for k, v in merged.items()
+        {"resource": resource, "action": action, "scope": scope}
+        for (resource, action), scope in perms.grants.items()
     ]
 
 
@@ -72,6 +55,7 @@ def update_role_permissions(
     for item in payload.permissions:
         db.add(RolePermission(role_id=role_id, resource=item.resource, action=item.action, scope=item.scope))
     db.commit()
+    bump_permission_version()
     return db.query(RolePermission).filter(RolePermission.role_id == role_id).all()
 
 
@@ -90,6 +74,7 @@ def create_role(
     item = Role(name=payload.name, code=payload.code, is_active=True)
     db.add(item)
     db.commit()
+    bump_permission_version()
     db.refresh(item)
     return item
 
@@ -108,6 +93,8 @@ def update_role(
         raise HTTPException(status_code=400, detail="Role is protected")
     role.is_active = payload.is_active
     db.commit()
+    bump_permission_version()
+    invalidate_all_principals()
     db.refresh(role)
     return role
 
@@ -135,4 +122,6 @@ def delete_role(
     db.execute(user_roles.delete().where(user_roles.c.role_id == role_id))
     role.is_deleted = True
     db.commit()
+    bump_permission_version()
+    invalidate_all_principals()
     return {"message": "Deleted"}
@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session
+
+from app.core.database import get_db
+from app.core.deps import EffectivePermissions, get_current_user, get_effective_permissions
+from app.models.search_document import SearchDocument
+from app.schemas.search import SearchHit
+from app.utils.search import fulltext_enabled, match_against, prefix_filter, searchable_terms
+
+router = APIRouter(prefix="/api/v1/search", tags=["search"])
+
+SEARCH_TYPES = ("asset", "license", "system", "person")
+
+
+def visible_documents(user, perms: EffectivePermissions, types: set[str]):
+    """Build the per-type visibility predicate mirroring each entity router."""
+    clauses = []
+    if "asset" in types and perms.has_any(
+        [("office_hardware_assets", "view"), ("datacenter_hardware_assets", "view")]
+    ):
+        clause = SearchDocument.entity_type == "asset"
+        scopes = perms.asset_scopes
+        if scopes:
+            clause = and_(clause, SearchDocument.scope.in_(scopes))
+        elif "employee" in perms.role_codes:
+            clause = and_(clause, SearchDocument.owner_id == user.id)
+        clauses.append(clause)
+    if "license" in types and perms.has("software_assets", "view"):
+        clauses.append(SearchDocument.entity_type == "license")
+    if "system" in types and perms.has("system_assets", "view"):
+        clause = SearchDocument.entity_type == "system"
+        if perms.scope("system_assets", "view") == "own":
+            clause = and_(clause, or_(SearchDocument.owner_id == user.id, SearchDocument.owner_id_b == user.id))
+        clauses.append(clause)
+    if "person" in types and perms.has("people", "view"):
+        clauses.append(SearchDocument.entity_type == "person")
+    return or_(*clauses) if clauses else None
+
+
+@router.get("", response_model=list[SearchHit])
+def search(
+    q: str = Query(..., min_length=1),
+    types: str | None = None,
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_db),
+    user=Depends(get_current_user),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
+):
+    wanted = {item.strip() for item in types.split(",")} & set(SEARCH_TYPES) if types else set(SEARCH_TYPES)
+    visible = visible_documents(user, perms, wanted)
+    if visible is None:
+        return []
+    query = db.query(
+        SearchDocument.entity_type,
+        SearchDocument.entity_id,
+        SearchDocument.title,
+        SearchDocument.subtitle,
+    ).filter(visible)
+    if fulltext_enabled(db) and searchable_terms(q):
+        score = match_against([SearchDocument.title, SearchDocument.body], q)
+        query = query.add_columns(score.label("score")).filter(score > 0).order_by(score.desc(), SearchDocument.id.desc())
+    elif fulltext_enabled(db):
+        query = query.filter(prefix_filter([SearchDocument.title], q)).order_by(SearchDocument.id.desc())
+    else:
+        like = f"%{q}%"
+        query = query.filter(or_(SearchDocument.title.like(like), SearchDocument.body.like(like))).order_by(
+            SearchDocument.id.desc()
+        )
+    return [
+        SearchHit(
+            type=row.entity_type,
+            id=row.entity_id,
+            title=row.title,
+            subtitle=row.subtitle,
+            score=getattr(row, "score", None),
+        )
+        for row in query.limit(limit).all()
+    ]
@@ -3,7 +3,8 @@ from sqlalchemy.orm import Session
 from sqlalchemy import or_
 
 from app.core.database import get_db
-from app.core.deps import require_permission, get_permission_scope
+from app.core.sequences import reserve
+from app.core.deps import EffectivePermissions, get_effective_permissions, require_permission
 from app.models.system_app import SystemApp
 from app.models.system_field import SystemField
 from app.models.user import User
@@ -11,7 +12,7 @@ from app.models.system_field_value import SystemFieldValue
 from app.schemas.common import Page, Message
 from app.schemas.system_app import SystemAppCreate, SystemAppOut, SystemAppUpdate
 from app.schemas.system_field_value import SystemFieldValueIn, SystemFieldValueOut
-from app.utils.pagination import paginate
+from app.utils.pagination import paginate_keyset
 
 
 def resolve_system_prefix(app_category: str | None) -> str:
@@ -31,15 +32,8 @@ def resolve_system_prefix(app_category: str | None) -> str:
 
 def generate_system_code(db: Session, prefix: str) -> str:
     base = f"{prefix}-"
-    candidates = db.query(SystemApp.app_code).filter(SystemApp.app_code.like(f"{base}%")).all()
-    max_seq = 0
-    for (code,) in candidates:
-        if not code or not code.startswith(base):
-            continue
-        tail = code.replace(base, "", 1)
-        if tail.isdigit():
-            max_seq = max(max_seq, int(tail))
-    return f"{base}{max_seq + 1:06d}"
+    value = reserve(db, f"app_code:{prefix}", seed_column=SystemApp.app_code, seed_base=base)
+    return f"{base}{value:06d}"
 
 router = APIRouter(prefix="/api/v1/systems", tags=["systems"])
 
@@ -145,24 +139,8 @@ def user_is_ops_owner(user, system: SystemApp) -> bool:
     return any(token in candidates for token in tokens)
 
 
-def get_role_codes(user) -> set[str]:
-    codes: set[str] = set()
-    if getattr(user, "role", None) and getattr(user.role, "is_active", False):
-        code = getattr(user.role, "code", None)
-        if code:
-            codes.add(code)
-    if getattr(user, "roles", None):
-        for role in user.roles:
-            if getattr(role, "is_active", False):
-                code = getattr(role, "code", None)
-                if code:
-                    codes.add(code)
-    return codes
-
-
-def can_manage_ops_owners(user) -> bool:
-    role_codes = get_role_codes(user)
-    return "super_admin" in role_codes or "system_admin" in role_codes
+def can_manage_ops_owners(perms: EffectivePermissions) -> bool:
+    return "super_admin" in perms.role_codes or "system_admin" in perms.role_codes
 
 
 @router.get("/options")
@@ -189,11 +167,14 @@ def list_systems(
     size: int = 20,
     q: str | None = None,
     app_status: str | None = None,
+    cursor: str | None = None,
+    with_total: bool | None = None,
     db: Session = Depends(get_db),
     user: object = Depends(require_permission("system_assets", "view")),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
     query = db.query(SystemApp).filter(SystemApp.is_deleted == False)
-    scope = get_permission_scope(db, user, "system_assets", "view")
+    scope = perms.scope("system_assets", "view")
     if scope == "own":
         uid = str(user.id)
         query = query.filter(or_(SystemApp.ops_owner == uid, SystemApp.ops_owner_b == uid))
@@ -202,9 +183,18 @@ def list_systems(
         query = query.filter(or_(SystemApp.app_name.like(like), SystemApp.app_code.like(like)))
     if app_status:
         query = query.filter(SystemApp.app_status == app_status)
-    total, items = paginate(query.order_by(SystemApp.id.desc()), page, size)
-    owner_map = build_owner_name_map(db, items)
-    return Page(total=total, items=[to_system_out(item, owner_map) for item in items])
+    result = paginate_keyset(
+        query,
+        [SystemApp.id],
+        size,
+        page=page,
+        cursor=cursor,
+        with_total=with_total,
+        estimate=not (q or app_status or scope == "own"),
+    )
+    owner_map = build_owner_name_map(db, result.items)
+    result.items = [to_system_out(item, owner_map) for item in result.items]
+    return result
 
 
 @router.get("/{system_id}", response_model=SystemAppOut)
@@ -212,11 +202,12 @@ def get_system(
     system_id: int,
     db: Session = Depends(get_db),
     user: object = Depends(require_permission("system_assets", "view")),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
     system = db.query(SystemApp).filter(SystemApp.id == system_id, SystemApp.is_deleted == False).first()
     if not system:
         raise HTTPException(status_code=404, detail="System not found")
-    scope = get_permission_scope(db, user, "system_assets", "view")
+    scope = perms.scope("system_assets", "view")
     if scope == "own" and not user_is_ops_owner(user, system):
         raise HTTPException(status_code=403, detail="Forbidden")
     owner_map = build_owner_name_map(db, [system])
@@ -228,12 +219,13 @@ def create_system(
     payload: SystemAppCreate,
     db: Session = Depends(get_db),
     user: object = Depends(require_permission("system_assets", "create")),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
     prefix = resolve_system_prefix(payload.app_category)
     payload_data = payload.model_dump()
     payload_data["ops_owner"] = normalize_owner_value(payload_data.get("ops_owner"))
     payload_data["ops_owner_b"] = normalize_owner_value(payload_data.get("ops_owner_b"))
-    if not can_manage_ops_owners(user) and (payload_data.get("ops_owner") or payload_data.get("ops_owner_b")):
+    if not can_manage_ops_owners(perms) and (payload_data.get("ops_owner") or payload_data.get("ops_owner_b")):
         raise HTTPException(status_code=403, detail="Only system admins can modify ops owners")
     payload_data["app_code"] = generate_system_code(db, prefix)
     item = SystemApp(**payload_data)
@@ -250,11 +242,12 @@ def update_system(
     payload: SystemAppUpdate,
     db: Session = Depends(get_db),
     user: object = Depends(require_permission("system_assets", "update")),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
     item = db.query(SystemApp).filter(SystemApp.id == system_id, SystemApp.is_deleted == False).first()
     if not item:
         raise HTTPException(status_code=404, detail="System not found")
-    scope = get_permission_scope(db, user, "system_assets", "update")
+    scope = perms.scope("system_assets", "update")
     if scope == "own" and not user_is_ops_owner(user, item):
         raise HTTPException(status_code=403, detail="Forbidden")
     data = payload.model_dump(exclude_unset=True)
@@ -263,7 +256,7 @@ def update_system(
         data["ops_owner"] = normalize_owner_value(data.get("ops_owner"))
     if "ops_owner_b" in data:
         data["ops_owner_b"] = normalize_owner_value(data.get("ops_owner_b"))
-    if not can_manage_ops_owners(user):
+    if not can_manage_ops_owners(perms):
         if "ops_owner" in data and data["ops_owner"] != item.ops_owner:
             raise HTTPException(status_code=403, detail="Only system admins can modify ops owners")
         if "ops_owner_b" in data and data["ops_owner_b"] != item.ops_owner_b:
@@ -284,11 +277,12 @@ def delete_system(
     system_id: int,
     db: Session = Depends(get_db),
     user: object = Depends(require_permission("system_assets", "delete")),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
     item = db.query(SystemApp).filter(SystemApp.id == system_id, SystemApp.is_deleted == False).first()
     if not item:
         raise HTTPException(status_code=404, detail="System not found")
-    scope = get_permission_scope(db, user, "system_assets", "delete")
+    scope = perms.scope("system_assets", "delete")
     if scope == "own" and not user_is_ops_owner(user, item):
         raise HTTPException(status_code=403, detail="Forbidden")
     # Hard delete: remove related custom field values first to satisfy FK constraints.
@@ -303,11 +297,12 @@ def list_system_fields(
     system_id: int,
     db: Session = Depends(get_db),
     user: object = Depends(require_permission("system_assets", "view")),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
     system = db.query(SystemApp).filter(SystemApp.id == system_id, SystemApp.is_deleted == False).first()
     if not system:
         raise HTTPException(status_code=404, detail="System not found")
-    scope = get_permission_scope(db, user, "system_assets", "view")
+    scope = perms.scope("system_assets", "view")
     if scope == "own" and not user_is_ops_owner(user, system):
         raise HTTPException(status_code=403, detail="Forbidden")
     return db.query(SystemFieldValue).filter(SystemFieldValue.system_id == system_id).all()
@@ -319,11 +314,12 @@ def upsert_system_fields(
     payload: list[SystemFieldValueIn],
     db: Session = Depends(get_db),
     user: object = Depends(require_permission("system_assets", "update")),
+    perms: EffectivePermissions = Depends(get_effective_permissions),
 ):
     system = db.query(SystemApp).filter(SystemApp.id == system_id, SystemApp.is_deleted == False).first()
     if not system:
         raise HTTPException(status_code=404, detail="System not found")
-    scope = get_permission_scope(db, user, "system_assets", "update")
+    scope = perms.scope("system_assets", "update")
     if scope == "own" and not user_is_ops_owner(user, system):
         raise HTTPException(status_code=403, detail="Forbidden")
 
@@ -3,24 +3,35 @@ from sqlalchemy.orm import Session, joinedload
 
 from app.core.database import get_db
 from app.core.deps import require_permission
+from app.core.principal_cache import invalidate_principal
 from app.core.security import hash_password
 from app.models.asset import Asset
 from app.models.asset_log import AssetLog
+from app.models.asset_log_outbox import AssetLogOutbox
+from app.models.asset_log_archive import AssetLogArchiveOperator
 from app.models.user import User
 from app.models.role import Role
 from app.models.stocktake import Stocktake
 from app.schemas.user import UserCreate, UserOut, UserUpdate
 from app.schemas.common import Page, Message
-from app.utils.pagination import paginate
+from app.utils.pagination import paginate_keyset
 
 router = APIRouter(prefix="/api/v1/users", tags=["users"])
 
 
 @router.get("", response_model=Page[UserOut])
-def list_users(page: int = 1, size: int = 20, db: Session = Depends(get_db), _: object = Depends(require_permission("users", "view"))):
+def list_users(
+    page: int = 1,
+    size: int = 20,
+    cursor: str | None = None,
+    with_total: bool | None = None,
+    db: Session = Depends(get_db),
+    _: object = Depends(require_permission("users", "view")),
+):
     query = db.query(User).options(joinedload(User.roles)).filter(User.is_deleted == False)
-    total, items = paginate(query.order_by(User.id.desc()), page, size)
-    return Page(total=total, items=items)
+    return paginate_keyset(
+        query, [User.id], size, page=page, cursor=cursor, with_total=with_total, estimate=True
+    )
 
 
 @router.get("/options")
@@ -109,6 +120,7 @@ def update_user(
         user.roles = roles
         user.role_id = roles[0].id
     db.commit()
+    invalidate_principal(user.id)
     db.refresh(user)
     return user
 
@@ -122,7 +134,11 @@ def delete_user(
     user = db.query(User).filter(User.id == user_id, User.is_deleted == False).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
-    has_logs = db.query(AssetLog.id).filter(AssetLog.operator_id == user_id).first()
+    has_logs = (
+        db.query(AssetLog.id).filter(AssetLog.operator_id == user_id).first()
+        or db.query(AssetLogOutbox.id).filter(AssetLogOutbox.operator_id == user_id).first()
+        or db.query(AssetLogArchiveOperator.archive_id).filter(AssetLogArchiveOperator.operator_id == user_id).first()
+    )
     if has_logs:
         raise HTTPException(status_code=400, detail="User has asset logs, cannot delete")
     has_stocktakes = db.query(Stocktake.id).filter(Stocktake.created_by == user_id).first()
@@ -132,4 +148,5 @@ def delete_user(
     user.roles = []
     db.delete(user)
     db.commit()
+    invalidate_principal(user_id)
     return Message(message="Deleted")
@@ -1,6 +1,6 @@
 from datetime import date
 from decimal import Decimal
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class AssetBase(BaseModel):
@@ -35,6 +35,28 @@ class AssetUpdate(BaseModel):
 
 class AssetOut(AssetBase):
     id: int
+    search_score: float | None = None
 
     class Config:
         from_attributes = True
+
+
+class AssetBulkAction(BaseModel):
+    asset_ids: list[int] = Field(..., min_length=1, max_length=1000)
+    user_id: int | None = None
+    damaged: bool = False
+    reason: str | None = None
+
+
+class AssetBulkOutcome(BaseModel):
+    asset_id: int
+    success: bool
+    status: int | None = None
+    error: str | None = None
+
+
+class AssetBulkResult(BaseModel):
+    action: str
+    succeeded: int
+    failed: int
+    results: list[AssetBulkOutcome]
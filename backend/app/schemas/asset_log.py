@@ -0,0 +1,40 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class AssetLogOut(BaseModel):
+    id: int
+    asset_id: int
+    asset_sn: str | None = None
+    asset_name: str | None = None
+    operator_id: int
+    operator_name: str | None = None
+    action_type: str
+    change_data: dict | list | None = None
+    created_at: datetime
+
+
+class AssetLogArchiveOut(BaseModel):
+    id: int
+    period: str
+    start_at: datetime
+    end_at: datetime
+    row_count: int
+    min_id: int | None = None
+    max_id: int | None = None
+    size_bytes: int | None = None
+    created_at: datetime | None = None
+
+    class Config:
+        from_attributes = True
+
+
+class AssetLogArchivePeriod(BaseModel):
+    period: str
+    rows: int
+    path: str
+
+
+class AssetLogArchiveRun(BaseModel):
+    archived: list[AssetLogArchivePeriod]
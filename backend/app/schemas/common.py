@@ -5,8 +5,10 @@ T = TypeVar("T")
 
 
 class Page(BaseModel, Generic[T]):
-    total: int
+    total: Optional[int] = None
     items: List[T]
+    next_cursor: Optional[str] = None
+    total_estimated: bool = False
 
 
 class Message(BaseModel):
@@ -0,0 +1,21 @@
+from datetime import datetime
+
+from pydantic import BaseModel
+
+
+class ImportJobOut(BaseModel):
+    id: str
+    kind: str
+    status: str
+    filename: str | None = None
+    total_rows: int | None = None
+    processed_rows: int = 0
+    created_rows: int = 0
+    error_rows: int = 0
+    rows_per_second: float | None = None
+    has_errors: bool = False
+    message: str | None = None
+    cancel_requested: bool = False
+    created_at: datetime | None = None
+    started_at: datetime | None = None
+    finished_at: datetime | None = None
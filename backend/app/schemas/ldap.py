@@ -1,3 +1,5 @@
+from datetime import datetime
+
 from pydantic import BaseModel
 
 
@@ -29,6 +31,9 @@ class LdapConfigUpdate(LdapConfigBase):
 class LdapConfigOut(LdapConfigBase):
     id: int
     has_password: bool = False
+    sync_watermark: str | None = None
+    last_sync_at: datetime | None = None
+    last_full_sync_at: datetime | None = None
 
     class Config:
         from_attributes = True
@@ -45,3 +50,10 @@ class LdapSyncResult(BaseModel):
     created: int
     updated: int
     skipped: int
+    unchanged: int = 0
+    deactivated: int = 0
+    mode: str = "full"
+    watermark: str | None = None
+    entries: int = 0
+    elapsed_seconds: float = 0
+    entries_per_second: float = 0
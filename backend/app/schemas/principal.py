@@ -0,0 +1,25 @@
+from pydantic import BaseModel
+
+
+class PrincipalRole(BaseModel):
+    id: int
+    code: str
+    is_active: bool = True
+
+
+class Principal(BaseModel):
+    id: int
+    username: str
+    full_name: str
+    role_id: int | None = None
+    dept: str | None = None
+    asset_scope: str | None = None
+    is_active: bool = True
+    role: PrincipalRole | None = None
+    roles: list[PrincipalRole] = []
+
+    @property
+    def role_ids(self) -> list[int]:
+        if self.roles:
+            return [role.id for role in self.roles]
+        return [self.role_id] if self.role_id else []
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+
+class SearchHit(BaseModel):
+    type: str
+    id: int
+    title: str | None = None
+    subtitle: str | None = None
+    score: float | None = None
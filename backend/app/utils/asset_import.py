@@ -0,0 +1,355 @@
+import re
+from collections import namedtuple
+from datetime import date, datetime
+from functools import partial
+from io import BytesIO
+
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.audit_log import write_logs
+from app.core.config import settings
+from app.core.search_index import write_documents
+from app.core.sequences import SequenceBlocks
+from app.models.asset import Asset
+from app.models.asset_field_index import AssetFieldIndex
+from app.models.asset_field_value import AssetFieldValue
+from app.models.category import Category
+from app.models.category_field import CategoryField
+from app.utils.asset_numbering import category_prefix, generate_asset_no
+from app.utils.field_index import index_rows
+from app.utils.import_rules import (
+    Check,
+    DateValue,
+    NoneOf,
+    NumberValue,
+    OneOf,
+    Required,
+    RuleSet,
+    Unique,
+    build_frame,
+)
+
+HEADER_ALIASES = {
+    "sn": ["sn", "SN", "序列号"],
+    "asset_no": ["asset_no", "编号", "资产编号"],
+    "name": ["name", "资产名称"],
+    "category": ["category", "分类"],
+    "purchase_at": ["purchase_at", "采购日期"],
+    "price": ["price", "采购原值", "价格"],
+    "warranty_at": ["warranty_at", "维保截止日期", "维保期"],
+    "location": ["location", "位置"],
+    "attachment": ["attachment", "附件", "发票", "合同"],
+}
+REQUIRED_COLUMNS = ["sn", "name", "category", "purchase_at"]
+ATTACHMENT_PRICE_THRESHOLD = 5000
+# Custom field types that have a single-cell spreadsheet representation.
+IMPORTABLE_FIELD_TYPES = {"text", "textarea", "markdown", "number", "date", "boolean", "single_select", "multi_select"}
+BOOLEAN_TEXT = {"1": True, "true": True, "yes": True, "是": True, "0": False, "false": False, "no": False, "否": False}
+MULTI_VALUE_SEPARATOR = r"\s*[,，;；、]\s*"
+
+ImportField = namedtuple("ImportField", "id field_key name field_type is_required options")
+
+
+class ImportCancelled(Exception):
+    pass
+
+
+def iter_sheet_chunks(fileobj, chunk_size: int):
+    """Stream the first worksheet as ``(header, [(row_number, values), ...])`` chunks."""
+    workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    try:
+        rows = workbook.worksheets[0].iter_rows(values_only=True)
+        header = [str(value).strip() if value is not None else "" for value in next(rows, ())]
+        chunk = []
+        for row_number, values in enumerate(rows, start=2):
+            if not any(value not in (None, "") for value in values):
+                continue
+            chunk.append((row_number, values))
+            if len(chunk) >= chunk_size:
+                yield header, chunk
+                chunk = []
+        if chunk:
+            yield header, chunk
+    finally:
+        workbook.close()
+
+
+def map_headers(header: list[str]) -> dict[str, int]:
+    positions = {name: index for index, name in enumerate(header) if name}
+    mapping = {}
+    for key, names in HEADER_ALIASES.items():
+        for name in names:
+            if name in positions:
+                mapping[key] = positions[name]
+                break
+    return mapping
+
+
+def price_needs_attachment(frame, context):
+    price = pd.to_numeric(frame["price"], errors="coerce")
+    return (price > ATTACHMENT_PRICE_THRESHOLD) & (frame["attachment"] == "")
+
+
+ASSET_RULES = RuleSet(
+    [
+        Required("sn", "SN required"),
+        Required("name", "Name required"),
+        Required("category", "Category required"),
+        Required("purchase_at", "Purchase date required"),
+        DateValue("purchase_at", "Invalid purchase date"),
+        DateValue("warranty_at", "Invalid warranty date"),
+        NoneOf("sn", "SN already exists", lambda context: context["existing_sn"]),
+        Unique("sn", "Duplicate SN in file"),
+        OneOf("category", "Category not found", lambda context: context["categories"] or None),
+        NumberValue("price", "Invalid price"),
+        Check("attachment", f"Attachment required for price > {ATTACHMENT_PRICE_THRESHOLD}", price_needs_attachment),
+    ]
+)
+
+
+def field_column(field: ImportField) -> str:
+    return f"field:{field.id}"
+
+
+def _select_options(field: ImportField) -> list[str] | None:
+    if not isinstance(field.options, list):
+        return None
+    return [str(option) for option in field.options if option not in (None, "")] or None
+
+
+def _invalid_boolean(frame, context, column: str):
+    text = frame[column].astype(str).str.lower()
+    return (text != "") & ~text.isin(list(BOOLEAN_TEXT))
+
+
+def _unknown_options(frame, context, column: str, options: list[str]):
+    items = frame[column].astype(str).str.split(MULTI_VALUE_SEPARATOR, regex=True).explode()
+    unknown = (items != "") & ~items.isin(options)
+    return unknown.groupby(level=0).any().reindex(frame.index, fill_value=False)
+
+
+def field_rules(fields: list[ImportField]) -> RuleSet:
+    """Build the rules for one category's mapped custom field columns."""
+    rules = []
+    for field in fields:
+        column = field_column(field)
+        invalid = f"Invalid {field.name}"
+        if field.is_required and field.field_type != "boolean":
+            rules.append(Required(column, f"{field.name} required"))
+        options = _select_options(field)
+        if field.field_type == "number":
+            rules.append(NumberValue(column, invalid))
+        elif field.field_type == "date":
+            rules.append(DateValue(column, invalid))
+        elif field.field_type == "boolean":
+            rules.append(Check(column, invalid, partial(_invalid_boolean, column=column)))
+        elif field.field_type == "single_select" and options:
+            rules.append(OneOf(column, invalid, options))
+        elif field.field_type == "multi_select" and options:
+            rules.append(Check(column, invalid, partial(_unknown_options, column=column, options=options)))
+    return RuleSet(rules)
+
+
+def field_value(field: ImportField, value):
+    """Convert a validated cell to the JSON shape the asset forms store."""
+    if value is None or value == "":
+        return None
+    if field.field_type == "number":
+        return int(value) if float(value).is_integer() else float(value)
+    if field.field_type == "date":
+        return value.isoformat() if isinstance(value, date) else value
+    if field.field_type == "boolean":
+        return BOOLEAN_TEXT[str(value).lower()]
+    if field.field_type == "multi_select":
+        return [item for item in re.split(MULTI_VALUE_SEPARATOR, value) if item] or None
+    return value
+
+
+class AssetImporter:
+    """Validate and bulk-insert spreadsheet rows one chunk at a time.
+
+    Categories are loaded once per import and existing SNs once per chunk
+    (earlier chunks are already committed, so this also catches SNs repeated
+    across chunks). Rows are checked column-wise by ``ASSET_RULES``; assets
+    and their IN logs go in as multi-row INSERTs, committed per chunk.
+
+    Extra headers matching a ``CategoryField.field_key`` or ``name`` of the
+    row's category are validated against the field type and options and
+    stored as ``AssetFieldValue`` rows (plus field index rows) in the same
+    transaction.
+    """
+
+    def __init__(self, db: Session, operator_id: int, chunk_size: int | None = None):
+        self.db = db
+        self.operator_id = operator_id
+        self.chunk_size = chunk_size or settings.import_chunk_size
+        self.categories = {
+            item.name: (item.id, category_prefix(item))
+            for item in db.query(Category).filter(Category.is_deleted == False).all()
+        }
+        self.fields: dict[int, list[ImportField]] = {}
+        for field in (
+            db.query(CategoryField)
+            .filter(CategoryField.is_deleted == False, CategoryField.field_type.in_(IMPORTABLE_FIELD_TYPES))
+            .order_by(CategoryField.sort_order.asc(), CategoryField.id.asc())
+            .all()
+        ):
+            self.fields.setdefault(field.category_id, []).append(
+                ImportField(field.id, field.field_key, field.name, field.field_type, bool(field.is_required), field.options)
+            )
+        self.field_columns: dict[str, int] = {}
+        self.field_rules: dict[int, tuple[list[ImportField], RuleSet]] = {}
+        self.blocks = SequenceBlocks(db, self.chunk_size)
+        self.header: list[str] = []
+        self.processed = 0
+        self.created = 0
+        self.errors: list[tuple[int, tuple, str]] = []
+
+    def check_header(self, header: list[str]) -> list[str]:
+        self.header = header
+        self.columns = map_headers(header)
+        used = set(self.columns.values())
+        extra = {name: index for index, name in enumerate(header) if name and index not in used}
+        for category_id, fields in self.fields.items():
+            mapped = []
+            for field in fields:
+                index = extra.get(field.field_key, extra.get(field.name))
+                if index is not None:
+                    mapped.append(field)
+                    self.field_columns[field_column(field)] = index
+            if mapped:
+                self.field_rules[category_id] = (mapped, field_rules(mapped))
+        return [name for name in REQUIRED_COLUMNS if name not in self.columns]
+
+    def validate_chunk(self, chunk: list[tuple[int, tuple]]):
+        """Return ``(frame, invalid mask, {position: message}, {position: {field_id: value}})``."""
+        frame = build_frame(
+            [values for _, values in chunk],
+            {**{key: self.columns.get(key) for key in HEADER_ALIASES}, **self.field_columns},
+        )
+        sns = set(frame["sn"]) - {""}
+        existing_sn = {row[0] for row in self.db.query(Asset.sn).filter(Asset.sn.in_(sns)).all()} if sns else set()
+        result = ASSET_RULES.validate(
+            frame,
+            {"existing_sn": existing_sn, "categories": self.categories.keys()},
+        )
+        invalid = result.invalid
+        messages = result.messages().to_dict()
+        values: dict[int, dict[int, object]] = {}
+        if not self.field_rules:
+            return result.frame, invalid, messages, values
+        category_ids = frame["category"].map(lambda name: self.categories.get(name, (None,))[0])
+        for category_id, (fields, rules) in self.field_rules.items():
+            rows = category_ids == category_id
+            if not rows.any():
+                continue
+            checked = rules.validate(frame.loc[rows, [field_column(field) for field in fields]])
+            for position, message in checked.messages().items():
+                messages[position] = f"{messages[position]}; {message}" if position in messages else message
+            invalid = invalid | checked.invalid.reindex(frame.index, fill_value=False)
+            parsed = checked.valid
+            for field in fields:
+                for position, cell in parsed[field_column(field)].items():
+                    value = field_value(field, cell)
+                    if value is not None:
+                        values.setdefault(position, {})[field.id] = value
+        return result.frame, invalid, messages, values
+
+    def import_chunk(self, chunk: list[tuple[int, tuple]]):
+        frame, invalid, messages, field_values = self.validate_chunk(chunk)
+        self.processed += len(chunk)
+        for position in sorted(messages):
+            row_number, values = chunk[position]
+            self.errors.append((row_number, values, messages[position]))
+        records = []
+        pending_fields = {}
+        valid = frame[~invalid]
+        for position, row in zip(valid.index, valid.itertuples(index=False)):
+            category = self.categories.get(row.category)
+            if position in field_values:
+                pending_fields[row.sn] = field_values[position]
+            records.append(
+                {
+                    "sn": row.sn,
+                    "name": row.name,
+                    "category": row.category,
+                    "category_id": category[0] if category else None,
+                    "status": 0,
+                    "location": row.location or None,
+                    "price": row.price,
+                    "purchase_at": row.purchase_at,
+                    "warranty_at": row.warranty_at,
+                    "is_deleted": False,
+                    "asset_no": generate_asset_no(
+                        self.db, category[1] if category else category_prefix(None), blocks=self.blocks
+                    ),
+                }
+            )
+        if not records:
+            return
+        self.db.execute(insert(Asset), records)
+        assets = self.db.query(Asset).filter(Asset.sn.in_([record["sn"] for record in records])).all()
+        now = datetime.utcnow()
+        write_logs(
+            self.db,
+            [
+                {
+                    "asset_id": asset.id,
+                    "operator_id": self.operator_id,
+                    "action_type": "IN",
+                    "change_data": {"field": "create", "old": None, "new": {"sn": asset.sn}},
+                    "created_at": now,
+                }
+                for asset in assets
+            ],
+        )
+        self._insert_field_values(assets, pending_fields)
+        write_documents(self.db.connection(), assets)
+        self.db.commit()
+        self.db.expunge_all()
+        self.created += len(records)
+
+    def _insert_field_values(self, assets: list[Asset], pending_fields: dict[str, dict[int, object]]):
+        if not pending_fields:
+            return
+        fields = {field.id: field for items in self.fields.values() for field in items}
+        value_rows = []
+        index_entries = []
+        for asset in assets:
+            for field_id, value in pending_fields.get(asset.sn, {}).items():
+                value_rows.append({"asset_id": asset.id, "field_id": field_id, "value": value})
+                index_entries.extend(index_rows(asset.id, fields[field_id], value))
+        if value_rows:
+            self.db.execute(insert(AssetFieldValue), value_rows)
+        if index_entries:
+            self.db.execute(insert(AssetFieldIndex), index_entries)
+
+    def run(self, fileobj, progress=None):
+        """Import every chunk; ``progress(importer)`` runs after each commit
+        and may raise ImportCancelled to stop before the next chunk."""
+        for header, chunk in iter_sheet_chunks(fileobj, self.chunk_size):
+            if not self.header:
+                missing = self.check_header(header)
+                if missing:
+                    raise ValueError(f"Missing columns: {', '.join(missing)}")
+            self.import_chunk(chunk)
+            if progress is not None:
+                progress(self)
+        if not self.header:
+            raise ValueError(f"Missing columns: {', '.join(REQUIRED_COLUMNS)}")
+
+    def error_workbook(self, target=None):
+        """Write failed rows to ``target`` (a path or file), or to a new BytesIO."""
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet()
+        sheet.append(["row", *self.header, "error"])
+        for row_number, values, message in self.errors:
+            sheet.append([row_number, *values, message])
+        output = BytesIO() if target is None else target
+        workbook.save(output)
+        if target is None:
+            output.seek(0)
+        return output
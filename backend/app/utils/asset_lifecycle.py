@@ -0,0 +1,260 @@
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core.audit_log import write_logs
+from app.core.search_index import load_category_scopes, write_documents
+from app.models.asset import Asset
+from app.models.category import Category
+
+HARDWARE_UPDATE = [("office_hardware_assets", "update"), ("datacenter_hardware_assets", "update")]
+SCRAP_UPDATE = [("scrap", "update")]
+MAINTENANCE_CREATE = [("maintenance", "create")]
+MAINTENANCE_UPDATE = [("maintenance", "update")]
+
+# Asset.status values
+IDLE, IN_USE, DAMAGED, PENDING_SCRAP, SCRAPPED = 0, 1, 2, 3, 4
+ALL_STATUSES = (IDLE, IN_USE, DAMAGED, PENDING_SCRAP, SCRAPPED)
+
+
+class Transition:
+    """One lifecycle action: allowed source statuses, target status and log action.
+
+    ``guard(status, scope, params)`` returns an error message to reject a
+    single asset; ``values(status, scope, params)`` returns the columns to set
+    (``status`` included). ``status_errors`` overrides ``error`` for specific
+    disallowed source statuses.
+    """
+
+    def __init__(
+        self,
+        action: str,
+        from_statuses: tuple[int, ...],
+        log_action: str,
+        error: str,
+        permissions,
+        values,
+        guard=None,
+        status_errors: dict[int, str] | None = None,
+    ):
+        self.action = action
+        self.from_statuses = from_statuses
+        self.log_action = log_action
+        self.error = error
+        self.permissions = permissions
+        self.values = values
+        self.guard = guard
+        self.status_errors = status_errors or {}
+
+    def check(self, status: int, scope: str | None, params: dict) -> str | None:
+        if status not in self.from_statuses:
+            return self.status_errors.get(status, self.error)
+        if self.guard is not None:
+            return self.guard(status, scope, params)
+        return None
+
+
+def _checkout_guard(status, scope, params):
+    if scope == "office" and not params.get("user_id"):
+        return "User required for office assets"
+    return None
+
+
+def _unscrap_guard(status, scope, params):
+    if status == SCRAPPED and not (params.get("reason") or "").strip():
+        return "Reason required for recovered scrap asset"
+    return None
+
+
+TRANSITIONS = {
+    "checkout": Transition(
+        "checkout",
+        (IDLE,),
+        "OUT",
+        "Asset not idle",
+        HARDWARE_UPDATE,
+        lambda status, scope, params: {
+            "status": IN_USE,
+            "user_id": params.get("user_id") if scope == "office" else None,
+        },
+        _checkout_guard,
+    ),
+    "checkin": Transition(
+        "checkin",
+        (IN_USE,),
+        "IN",
+        "Asset not in use",
+        HARDWARE_UPDATE,
+        lambda status, scope, params: {"status": DAMAGED if params.get("damaged") else IDLE, "user_id": None},
+    ),
+    "discard": Transition(
+        "discard",
+        (IDLE, DAMAGED, PENDING_SCRAP),
+        "DISCARD",
+        "Invalid state",
+        SCRAP_UPDATE,
+        lambda status, scope, params: {"status": PENDING_SCRAP},
+        status_errors={IN_USE: "Cannot discard in-use asset"},
+    ),
+    "scrap": Transition(
+        "scrap",
+        (PENDING_SCRAP,),
+        "SCRAP",
+        "Asset not pending scrap",
+        SCRAP_UPDATE,
+        lambda status, scope, params: {"status": SCRAPPED},
+    ),
+    "unscrap": Transition(
+        "unscrap",
+        (PENDING_SCRAP, SCRAPPED),
+        "UNSCRAP",
+        "Asset not in scrap state",
+        SCRAP_UPDATE,
+        lambda status, scope, params: {"status": IDLE},
+        _unscrap_guard,
+    ),
+    # Opening a repair record has always been allowed from any status.
+    "repair": Transition(
+        "repair",
+        ALL_STATUSES,
+        "REPAIR",
+        "Invalid state",
+        MAINTENANCE_CREATE,
+        lambda status, scope, params: {"status": DAMAGED},
+    ),
+    "repair_close": Transition(
+        "repair_close",
+        (DAMAGED,),
+        "REPAIR",
+        "Asset not under repair",
+        MAINTENANCE_UPDATE,
+        lambda status, scope, params: {"status": IDLE},
+    ),
+}
+BULK_ACTIONS = ("checkout", "checkin", "discard", "scrap", "unscrap")
+
+
+def log_row(transition: Transition, asset_id: int, operator_id: int, old_status: int, values: dict, params: dict, now: datetime) -> dict:
+    change = {"field": "status", "old": old_status, "new": values["status"]}
+    if params.get("reason"):
+        change["reason"] = params["reason"]
+    return {
+        "asset_id": asset_id,
+        "operator_id": operator_id,
+        "action_type": transition.log_action,
+        "change_data": change,
+        "created_at": now,
+    }
+
+
+def apply_transition(
+    db: Session,
+    transition: Transition,
+    asset_id: int,
+    operator_id: int,
+    params: dict | None = None,
+    allowed_scopes: set[str] | None = None,
+    missing_ok: bool = False,
+) -> Asset | None:
+    """Move one asset with ``UPDATE ... WHERE id = :id AND status IN (:from)``.
+
+    The row is read without a lock. The UPDATE only matches source statuses
+    that lead to the same decision (guard result and target values), so a
+    concurrent change turns into a 409 instead of a lost update. The log row
+    is written in the same transaction; the caller commits once. With
+    ``missing_ok`` a missing asset or disallowed status returns None instead
+    of raising.
+    """
+    params = params or {}
+    row = (
+        db.query(Asset, Category.usage_scope)
+        .outerjoin(Category, Category.id == Asset.category_id)
+        .filter(Asset.id == asset_id, Asset.is_deleted == False)
+        .first()
+    )
+    if row is None:
+        if missing_ok:
+            return None
+        raise HTTPException(status_code=404, detail="Asset not found")
+    asset, scope = row
+    if allowed_scopes and scope not in allowed_scopes:
+        raise HTTPException(status_code=403, detail="Forbidden")
+    old_status = asset.status
+    error = transition.check(old_status, scope, params)
+    if error:
+        if missing_ok:
+            return None
+        raise HTTPException(status_code=400, detail=error)
+    values = transition.values(old_status, scope, params)
+    matching = [
+        status
+        for status in transition.from_statuses
+        if transition.check(status, scope, params) is None and transition.values(status, scope, params) == values
+    ]
+    updated = (
+        db.query(Asset)
+        .filter(Asset.id == asset_id, Asset.is_deleted == False, Asset.status.in_(matching))
+        .update(values, synchronize_session="evaluate")
+    )
+    if not updated:
+        raise HTTPException(status_code=409, detail="Asset status changed, please retry")
+    write_logs(db, [log_row(transition, asset_id, operator_id, old_status, values, params, datetime.utcnow())])
+    if "user_id" in values:
+        # user_id is the search document owner; bulk UPDATEs bypass the flush hook.
+        write_documents(db.connection(), [asset])
+    return asset
+
+
+def bulk_transition(
+    db: Session,
+    transition: Transition,
+    asset_ids: list[int],
+    operator_id: int,
+    params: dict,
+    allowed_scopes: set[str] | None = None,
+) -> list[dict]:
+    """Apply ``transition`` to many assets in one transaction.
+
+    The target rows are locked with a single ``IN`` query and checked in
+    memory; accepted assets are moved with one ``UPDATE`` per distinct set of
+    values and logged with one multi-row INSERT. Returns one outcome per id,
+    in request order. The caller commits.
+    """
+    asset_ids = list(dict.fromkeys(asset_ids))
+    rows = (
+        db.query(Asset.id, Asset.status, Asset.category_id)
+        .filter(Asset.id.in_(asset_ids), Asset.is_deleted == False)
+        .with_for_update()
+        .all()
+    )
+    found = {row.id: row for row in rows}
+    scopes = load_category_scopes(db.connection(), [row.category_id for row in rows])
+    outcomes = {}
+    groups: dict[tuple, list[int]] = {}
+    logs = []
+    now = datetime.utcnow()
+    for asset_id in asset_ids:
+        row = found.get(asset_id)
+        if row is None:
+            outcomes[asset_id] = {"asset_id": asset_id, "success": False, "error": "Asset not found"}
+            continue
+        scope = scopes.get(row.category_id)
+        if allowed_scopes and scope not in allowed_scopes:
+            outcomes[asset_id] = {"asset_id": asset_id, "success": False, "error": "Forbidden"}
+            continue
+        error = transition.check(row.status, scope, params)
+        if error:
+            outcomes[asset_id] = {"asset_id": asset_id, "success": False, "status": row.status, "error": error}
+            continue
+        values = transition.values(row.status, scope, params)
+        groups.setdefault(tuple(sorted(values.items())), []).append(asset_id)
+        logs.append(log_row(transition, asset_id, operator_id, row.status, values, params, now))
+        outcomes[asset_id] = {"asset_id": asset_id, "success": True, "status": values["status"]}
+    for values, ids in groups.items():
+        db.query(Asset).filter(Asset.id.in_(ids)).update(dict(values), synchronize_session=False)
+    write_logs(db, logs)
+    owner_changed = [asset_id for values, ids in groups.items() if "user_id" in dict(values) for asset_id in ids]
+    if owner_changed:
+        write_documents(db.connection(), db.query(Asset).filter(Asset.id.in_(owner_changed)).all())
+    return [outcomes[asset_id] for asset_id in asset_ids]
@@ -0,0 +1,22 @@
+from sqlalchemy.orm import Session
+
+from app.core.sequences import SequenceBlocks, reserve
+from app.models.asset import Asset
+
+
+def category_prefix(category) -> str:
+    if category is None:
+        return "ASSET"
+    if category.code:
+        return category.code.strip().replace(" ", "").upper()
+    return f"C{category.id}"
+
+
+def generate_asset_no(db: Session, prefix: str, blocks: SequenceBlocks | None = None) -> str:
+    base = f"{prefix}-"
+    name = f"asset_no:{prefix}"
+    if blocks is not None:
+        value = blocks.next(name, seed_column=Asset.asset_no, seed_base=base)
+    else:
+        value = reserve(db, name, seed_column=Asset.asset_no, seed_base=base)
+    return f"{base}{value:010d}"
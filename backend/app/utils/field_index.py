@@ -0,0 +1,184 @@
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from fastapi import HTTPException
+from sqlalchemy import and_, insert, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.asset import Asset
+from app.models.asset_field_index import AssetFieldIndex
+from app.models.asset_field_value import AssetFieldValue
+from app.models.category_field import CategoryField
+
+INDEXED_TYPES = {"text", "number", "date", "single_select", "multi_select", "boolean"}
+FILTER_PREFIX = "field."
+FILTER_OPERATORS = {"eq", "gt", "gte", "lt", "lte"}
+
+
+def index_column(field_type: str):
+    if field_type == "number":
+        return AssetFieldIndex.value_num
+    if field_type == "date":
+        return AssetFieldIndex.value_date
+    return AssetFieldIndex.value_text
+
+
+def coerce_value(field_type: str, value):
+    """Convert a stored or requested value to the typed index column, or None."""
+    if value is None or value == "":
+        return None
+    if field_type == "number":
+        try:
+            return Decimal(str(value).strip())
+        except (InvalidOperation, ValueError):
+            return None
+    if field_type == "date":
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+        try:
+            return date.fromisoformat(str(value).strip()[:10])
+        except ValueError:
+            return None
+    if field_type == "boolean":
+        if isinstance(value, bool):
+            return "1" if value else "0"
+        text = str(value).strip().lower()
+        if text in ("1", "true", "yes", "是"):
+            return "1"
+        if text in ("0", "false", "no", "否"):
+            return "0"
+        return None
+    if isinstance(value, (dict, list)):
+        return None
+    return str(value).strip()[:255] or None
+
+
+def index_rows(asset_id: int, field: CategoryField, value) -> list[dict]:
+    if field.field_type not in INDEXED_TYPES:
+        return []
+    column = index_column(field.field_type)
+    values = value if isinstance(value, list) else [value]
+    rows = []
+    seen = set()
+    for item in values:
+        typed = coerce_value(field.field_type, item)
+        if typed is None or typed in seen:
+            continue
+        seen.add(typed)
+        rows.append({"asset_id": asset_id, "field_id": field.id, column.key: typed})
+    return rows
+
+
+def reindex_asset_fields(db: Session, asset_id: int, values: dict[int, object]):
+    """Replace the index rows of ``asset_id`` for the given ``{field_id: value}``."""
+    if not values:
+        return
+    field_ids = list(values)
+    fields = db.query(CategoryField).filter(CategoryField.id.in_(field_ids)).all()
+    db.query(AssetFieldIndex).filter(
+        AssetFieldIndex.asset_id == asset_id,
+        AssetFieldIndex.field_id.in_(field_ids),
+    ).delete(synchronize_session=False)
+    rows = []
+    for field in fields:
+        rows.extend(index_rows(asset_id, field, values.get(field.id)))
+    if rows:
+        db.execute(insert(AssetFieldIndex), rows)
+
+
+def reindex_field(db: Session, field: CategoryField, batch_size: int = 1000):
+    """Rebuild the index rows of one field, e.g. after its type changed."""
+    db.query(AssetFieldIndex).filter(AssetFieldIndex.field_id == field.id).delete(synchronize_session=False)
+    last_id = 0
+    while True:
+        batch = (
+            db.query(AssetFieldValue.id, AssetFieldValue.asset_id, AssetFieldValue.value)
+            .filter(AssetFieldValue.field_id == field.id, AssetFieldValue.id > last_id)
+            .order_by(AssetFieldValue.id.asc())
+            .limit(batch_size)
+            .all()
+        )
+        if not batch:
+            break
+        rows = []
+        for row in batch:
+            rows.extend(index_rows(row.asset_id, field, row.value))
+        if rows:
+            db.execute(insert(AssetFieldIndex), rows)
+        last_id = batch[-1].id
+
+
+def rebuild_field_index(db: Session):
+    for field in db.query(CategoryField).filter(CategoryField.field_type.in_(INDEXED_TYPES)).all():
+        reindex_field(db, field)
+        db.commit()
+
+
+def parse_field_filters(params) -> list[tuple[str, str, list[str]]]:
+    """Collect ``field.<key>[.<op>]=value`` query parameters.
+
+    Repeated equality parameters are OR-ed; ranges use ``gt/gte/lt/lte``.
+    """
+    filters: dict[tuple[str, str], list[str]] = {}
+    for name, value in params.multi_items():
+        if not name.startswith(FILTER_PREFIX):
+            continue
+        key = name[len(FILTER_PREFIX):]
+        op = "eq"
+        head, _, tail = key.rpartition(".")
+        if head and tail in FILTER_OPERATORS:
+            key, op = head, tail
+        if not key:
+            continue
+        filters.setdefault((key, op), []).append(value)
+    return [(key, op, values) for (key, op), values in filters.items()]
+
+
+def _condition(column, field_type: str, op: str, values: list[str]):
+    typed = []
+    for value in values:
+        coerced = coerce_value(field_type, value)
+        if coerced is None:
+            raise HTTPException(status_code=400, detail=f"Invalid value for {field_type} field: {value}")
+        typed.append(coerced)
+    if op == "eq":
+        return column.in_(typed)
+    bound = typed[-1]
+    return {"gt": column > bound, "gte": column >= bound, "lt": column < bound, "lte": column <= bound}[op]
+
+
+def apply_field_filters(db: Session, query, params, category_id: int | None = None):
+    """Restrict an asset query by custom field values via the typed index."""
+    filters = parse_field_filters(params)
+    if not filters:
+        return query
+    keys = {key for key, _, _ in filters}
+    field_query = db.query(CategoryField).filter(
+        CategoryField.field_key.in_(keys),
+        CategoryField.is_deleted == False,
+        CategoryField.field_type.in_(INDEXED_TYPES),
+    )
+    if category_id:
+        field_query = field_query.filter(CategoryField.category_id == category_id)
+    fields_by_key: dict[str, list[CategoryField]] = {}
+    for field in field_query.all():
+        fields_by_key.setdefault(field.field_key, []).append(field)
+    for key, op, values in filters:
+        fields = fields_by_key.get(key)
+        if not fields:
+            raise HTTPException(status_code=400, detail=f"Unknown field: {key}")
+        by_type: dict[str, list[int]] = {}
+        for field in fields:
+            by_type.setdefault(field.field_type, []).append(field.id)
+        clauses = [
+            and_(
+                AssetFieldIndex.field_id.in_(field_ids),
+                _condition(index_column(field_type), field_type, op, values),
+            )
+            for field_type, field_ids in by_type.items()
+        ]
+        matched = select(AssetFieldIndex.asset_id).where(or_(*clauses))
+        query = query.filter(Asset.id.in_(matched))
+    return query
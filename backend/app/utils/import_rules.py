@@ -0,0 +1,214 @@
+"""Declarative, column-wise validation for spreadsheet imports.
+
+A ``RuleSet`` runs each rule over a whole chunk as pandas column operations.
+Every rule yields a boolean Series marking the rows it rejects; parsing rules
+also replace their column with the parsed values so later rules (and the
+importer) can use them. Rules that need per-chunk data, such as the SNs
+already in the database, read it from a ``context`` dict at validation time.
+"""
+from collections.abc import Callable, Iterable
+
+import numpy as np
+import pandas as pd
+
+DATE_FORMATS = ("%Y-%m-%d", "%Y/%m/%d", "%Y.%m.%d", "%Y%m%d")
+
+
+def _scalar_text(value) -> str:
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def cell_text(value) -> str:
+    if value is None or (not isinstance(value, str) and pd.isna(value)):
+        return ""
+    return _scalar_text(value)
+
+
+def text_column(series: pd.Series) -> pd.Series:
+    """Normalize raw cell values to stripped strings ("" for blanks)."""
+    present = series.notna()
+    try:
+        # Non-string cells come back as NaN from the .str accessor.
+        result = series.str.strip()
+    except AttributeError:
+        # Raised when the column holds no strings at all (numbers, dates).
+        result = pd.Series(np.nan, index=series.index, dtype=object)
+    others = present & result.isna()
+    result = result.where(present, "").astype(object)
+    if others.any():
+        result[others] = series[others].map(_scalar_text)
+    return result
+
+
+def build_frame(rows: list[tuple], columns: dict[str, int | None]) -> pd.DataFrame:
+    """Build a text frame from raw row tuples using ``{key: column index}``.
+
+    Keys whose index is None (column absent from the sheet) become blank.
+    """
+    raw = pd.DataFrame(rows, dtype=object) if rows else pd.DataFrame()
+    frame = pd.DataFrame(index=raw.index)
+    for key, index in columns.items():
+        if index is not None and index in raw.columns:
+            frame[key] = text_column(raw[index])
+        else:
+            frame[key] = ""
+    return frame
+
+
+def _resolve(values, context: dict):
+    return values(context) if callable(values) else values
+
+
+class Rule:
+    """Base rule: ``check`` returns a boolean Series, True for rejected rows."""
+
+    def __init__(self, column: str, message: str):
+        self.column = column
+        self.message = message
+
+    def check(self, frame: pd.DataFrame, context: dict) -> pd.Series:
+        raise NotImplementedError
+
+    def _blank(self, frame: pd.DataFrame) -> pd.Series:
+        if self.column not in frame:
+            return pd.Series(True, index=frame.index)
+        return frame[self.column].isna() | (frame[self.column] == "")
+
+
+class Required(Rule):
+    def check(self, frame, context):
+        return self._blank(frame)
+
+
+class DateValue(Rule):
+    """Parse the column into ``date`` objects (None for blanks)."""
+
+    def __init__(self, column: str, message: str, formats: Iterable[str] = DATE_FORMATS):
+        super().__init__(column, message)
+        self.formats = tuple(formats)
+
+    def check(self, frame, context):
+        blank = self._blank(frame)
+        if self.column not in frame:
+            frame[self.column] = None
+            return ~blank
+        text = frame[self.column].where(~blank, "").astype(str).str.slice(0, 10)
+        parsed = pd.Series(pd.NaT, index=frame.index, dtype="datetime64[ns]")
+        for fmt in self.formats:
+            pending = parsed.isna() & ~blank
+            if not pending.any():
+                break
+            parsed[pending] = pd.to_datetime(text[pending], format=fmt, errors="coerce")
+        invalid = parsed.isna() & ~blank
+        frame[self.column] = pd.Series(parsed.dt.date, index=frame.index, dtype=object).where(parsed.notna(), None)
+        return invalid
+
+
+class NumberValue(Rule):
+    """Parse the column into floats (None for blanks)."""
+
+    def check(self, frame, context):
+        blank = self._blank(frame)
+        if self.column not in frame:
+            frame[self.column] = None
+            return ~blank
+        parsed = pd.to_numeric(frame[self.column].where(~blank, None), errors="coerce")
+        invalid = parsed.isna() & ~blank
+        frame[self.column] = parsed.astype(object).where(parsed.notna(), None)
+        return invalid
+
+
+class OneOf(Rule):
+    """Non-blank values must be in ``values`` (a collection or ``f(context)``)."""
+
+    def __init__(self, column: str, message: str, values: Iterable | Callable[[dict], Iterable]):
+        super().__init__(column, message)
+        self.values = values
+
+    def check(self, frame, context):
+        allowed = _resolve(self.values, context)
+        if allowed is None:
+            return pd.Series(False, index=frame.index)
+        return ~self._blank(frame) & ~frame[self.column].isin(list(allowed))
+
+
+class NoneOf(OneOf):
+    """Non-blank values must not be in ``values``, e.g. keys already stored."""
+
+    def check(self, frame, context):
+        taken = _resolve(self.values, context) or ()
+        return ~self._blank(frame) & frame[self.column].isin(list(taken))
+
+
+class Unique(Rule):
+    """Reject repeats within the chunk and values in ``seen`` (earlier chunks)."""
+
+    def __init__(self, column: str, message: str, seen: Callable[[dict], Iterable] | None = None):
+        super().__init__(column, message)
+        self.seen = seen
+
+    def check(self, frame, context):
+        blank = self._blank(frame)
+        repeated = frame[self.column].where(~blank).duplicated(keep="first") & ~blank
+        seen = _resolve(self.seen, context) if self.seen else None
+        if seen:
+            repeated |= ~blank & frame[self.column].isin(list(seen))
+        return repeated
+
+
+class Check(Rule):
+    """Arbitrary vectorized predicate ``f(frame, context) -> Series`` of rejected rows."""
+
+    def __init__(self, column: str, message: str, predicate: Callable[[pd.DataFrame, dict], pd.Series]):
+        super().__init__(column, message)
+        self.predicate = predicate
+
+    def check(self, frame, context):
+        return self.predicate(frame, context).fillna(False).astype(bool)
+
+
+class ValidationResult:
+    def __init__(self, frame: pd.DataFrame, errors: pd.DataFrame, messages: list[str]):
+        self.frame = frame
+        self.errors = errors
+        self._messages = messages
+
+    @property
+    def invalid(self) -> pd.Series:
+        """Per-row error mask."""
+        return self.errors.any(axis=1)
+
+    @property
+    def valid(self) -> pd.DataFrame:
+        return self.frame[~self.invalid]
+
+    def messages(self) -> pd.Series:
+        """``"; "``-joined messages for the rejected rows, indexed like the frame."""
+        invalid = self.invalid
+        if not invalid.any():
+            return pd.Series(dtype=object)
+        failed = self.errors[invalid].to_numpy()
+        labels = np.array(self._messages, dtype=object)
+        return pd.Series(
+            ["; ".join(labels[row]) for row in failed],
+            index=self.errors.index[invalid],
+            dtype=object,
+        )
+
+
+class RuleSet:
+    """An ordered list of rules; messages are reported in rule order."""
+
+    def __init__(self, rules: list[Rule]):
+        self.rules = rules
+
+    def validate(self, frame: pd.DataFrame, context: dict | None = None) -> ValidationResult:
+        context = context or {}
+        frame = frame.copy()
+        masks = {}
+        for position, rule in enumerate(self.rules):
+            masks[position] = rule.check(frame, context).reindex(frame.index, fill_value=False)
+        errors = pd.DataFrame(masks, index=frame.index, dtype=bool)
+        return ValidationResult(frame, errors, [rule.message for rule in self.rules])
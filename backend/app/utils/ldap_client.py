@@ -1,26 +1,158 @@
-import ssl
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
 from typing import Any
 
-from ldap3 import Server, Connection, ALL, SUBTREE
+from ldap3 import Server, Connection, NONE, SUBTREE, SYNC, RESTARTABLE, MOCK_SYNC
 from ldap3.core.exceptions import LDAPException
 from ldap3.utils.conv import escape_filter_chars
 
+from app.core.config import settings
+
+PAGED_RESULTS_OID = "1.2.840.113556.1.4.319"
+
+CLIENT_STRATEGIES = {
+    "SYNC": SYNC,
+    "RESTARTABLE": RESTARTABLE,
+    "MOCK_SYNC": MOCK_SYNC,
+}
+
 
 def build_server(config):
-    return Server(config.host, port=config.port, use_ssl=config.use_ssl, get_info=ALL)
+    return Server(
+        config.host,
+        port=config.port,
+        use_ssl=config.use_ssl,
+        get_info=NONE,
+        connect_timeout=settings.ldap_connect_timeout_seconds,
+    )
+
+
+def config_signature(config) -> tuple:
+    return (
+        config.host,
+        config.port,
+        bool(config.use_ssl),
+        bool(config.use_starttls),
+        config.bind_dn or None,
+        config.bind_password or None,
+    )
+
+
+class LdapConnectionPool:
+    def __init__(self, config, server: Server, size: int, service: bool = True):
+        self.server = server
+        self.use_starttls = bool(config.use_starttls and not config.use_ssl)
+        self.bind_dn = config.bind_dn or None
+        self.bind_password = config.bind_password or None
+        self.service = service
+        self.client_strategy = CLIENT_STRATEGIES.get(settings.ldap_client_strategy.upper(), SYNC)
+        self._slots = threading.BoundedSemaphore(max(size, 1))
+        self._idle: list[tuple[Connection, float]] = []
+        self._lock = threading.Lock()
+
+    def _open(self) -> Connection:
+        conn = Connection(
+            self.server,
+            user=self.bind_dn if self.service else None,
+            password=self.bind_password if self.service else None,
+            auto_bind=False,
+            client_strategy=self.client_strategy,
+            receive_timeout=settings.ldap_receive_timeout_seconds,
+        )
+        conn.open()
+        if self.use_starttls:
+            conn.start_tls()
+        if self.service and not conn.bind():
+            result = conn.result or {}
+            message = result.get("message") or result.get("description") or "LDAP bind failed"
+            conn.unbind()
+            raise LDAPException(message)
+        return conn
+
+    def _is_healthy(self, conn: Connection, idle_since: float) -> bool:
+        if conn.closed:
+            return False
+        if self.service and not conn.bound:
+            return False
+        return time.monotonic() - idle_since < settings.ldap_pool_max_idle_seconds
+
+    def _take(self) -> Connection:
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn, idle_since = self._idle.pop()
+            if self._is_healthy(conn, idle_since):
+                return conn
+            self._discard(conn)
+        return self._open()
+
+    def _discard(self, conn: Connection):
+        try:
+            conn.unbind()
+        except LDAPException:
+            pass
+
+    @contextmanager
+    def connection(self):
+        if not self._slots.acquire(timeout=settings.ldap_receive_timeout_seconds):
+            raise LDAPException("LDAP connection pool exhausted")
+        conn = None
+        try:
+            conn = self._take()
+            yield conn
+        except LDAPException:
+            if conn is not None:
+                self._discard(conn)
+                conn = None
+            raise
+        finally:
+            if conn is not None:
+                with self._lock:
+                    self._idle.append((conn, time.monotonic()))
+            self._slots.release()
+
+    def close(self):
+        with self._lock:
+            idle = self._idle
+            self._idle = []
+        for conn, _ in idle:
+            self._discard(conn)
+
+
+_servers: dict[tuple, Server] = {}
+_pools: dict[tuple, LdapConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(config, service: bool = True) -> LdapConnectionPool:
+    signature = config_signature(config)
+    key = (signature, service)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            server = _servers.get(signature)
+            if server is None:
+                server = build_server(config)
+                _servers[signature] = server
+            pool = LdapConnectionPool(config, server, settings.ldap_pool_size, service=service)
+            _pools[key] = pool
+        return pool
+
+
+def reset_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+        _servers.clear()
+    for pool in pools:
+        pool.close()
 
 
 def bind_service(config):
-    server = build_server(config)
-    conn = Connection(server, user=config.bind_dn or None, password=config.bind_password or None, auto_bind=False)
-    conn.open()
-    if config.use_starttls and not config.use_ssl:
-        conn.start_tls()
-    if not conn.bind():
-        result = conn.result or {}
-        message = result.get("message") or result.get("description") or "LDAP bind failed"
-        raise LDAPException(message)
-    return conn
+    return get_pool(config).connection()
 
 
 def build_user_filter(config, username: str | None = None) -> str:
@@ -33,51 +165,110 @@ def build_user_filter(config, username: str | None = None) -> str:
     return f"(&{base}({config.username_attr}={safe_username}))"
 
 
-def search_users(config) -> list[Any]:
-    conn = bind_service(config)
-    attrs = list({
+def user_attributes(config) -> list[str]:
+    return list({
         config.username_attr,
         config.display_name_attr,
         config.email_attr,
         config.phone_attr,
         config.dept_attr,
     })
-    user_filter = build_user_filter(config)
-    conn.search(search_base=config.base_dn, search_filter=user_filter, search_scope=SUBTREE, attributes=attrs)
-    entries = conn.entries
-    conn.unbind()
-    return entries
+
+
+def watermark_attr(config) -> str:
+    return "uSNChanged" if (config.provider or "ad") == "ad" else "modifyTimestamp"
+
+
+def entry_watermark(config, entry) -> str | None:
+    value = extract_attr(entry, watermark_attr(config))
+    if value is None:
+        return None
+    if watermark_attr(config) == "uSNChanged":
+        text = str(value).strip()
+        return text if text.isdigit() else None
+    if isinstance(value, datetime):
+        return value.astimezone(timezone.utc).strftime("%Y%m%d%H%M%SZ")
+    digits = "".join(ch for ch in str(value) if ch.isdigit())
+    return f"{digits[:14]}Z" if len(digits) >= 14 else None
+
+
+def newer_watermark(config, current: str | None, candidate: str | None) -> str | None:
+    if candidate is None:
+        return current
+    if current is None:
+        return candidate
+    if watermark_attr(config) == "uSNChanged":
+        return candidate if int(candidate) > int(current) else current
+    return max(current, candidate)
+
+
+def build_delta_filter(config, watermark: str) -> str:
+    attr = watermark_attr(config)
+    if attr == "uSNChanged":
+        return f"(&{build_user_filter(config)}({attr}>={int(watermark) + 1}))"
+    return f"(&{build_user_filter(config)}({attr}>={escape_filter_chars(watermark)}))"
+
+
+def search_users(config) -> list[Any]:
+    with bind_service(config) as conn:
+        user_filter = build_user_filter(config)
+        conn.search(
+            search_base=config.base_dn,
+            search_filter=user_filter,
+            search_scope=SUBTREE,
+            attributes=user_attributes(config),
+        )
+        return list(conn.entries)
+
+
+def iter_user_pages(config, page_size: int, search_filter: str | None = None):
+    attributes = user_attributes(config) + [watermark_attr(config)]
+    with bind_service(config) as conn:
+        cookie = None
+        while True:
+            conn.search(
+                search_base=config.base_dn,
+                search_filter=search_filter or build_user_filter(config),
+                search_scope=SUBTREE,
+                attributes=attributes,
+                paged_size=page_size,
+                paged_cookie=cookie,
+            )
+            result = conn.result or {}
+            if result.get("result") != 0:
+                raise LDAPException(
+                    f"LDAP search failed: {result.get('description') or 'no result'} {result.get('message') or ''}".strip()
+                )
+            entries = list(conn.entries)
+            if entries:
+                yield entries
+            controls = result.get("controls") or {}
+            cookie = controls.get(PAGED_RESULTS_OID, {}).get("value", {}).get("cookie")
+            if not cookie:
+                break
 
 
 def search_user(config, username: str):
-    conn = bind_service(config)
-    attrs = list({
-        config.username_attr,
-        config.display_name_attr,
-        config.email_attr,
-        config.phone_attr,
-        config.dept_attr,
-    })
-    user_filter = build_user_filter(config, username=username)
-    conn.search(search_base=config.base_dn, search_filter=user_filter, search_scope=SUBTREE, attributes=attrs)
-    entry = conn.entries[0] if conn.entries else None
-    conn.unbind()
-    return entry
+    with bind_service(config) as conn:
+        user_filter = build_user_filter(config, username=username)
+        conn.search(
+            search_base=config.base_dn,
+            search_filter=user_filter,
+            search_scope=SUBTREE,
+            attributes=user_attributes(config),
+        )
+        return conn.entries[0] if conn.entries else None
 
 
 def authenticate_user(config, username: str, password: str):
+    if not password:
+        return None
     entry = search_user(config, username)
     if not entry:
         return None
-    server = build_server(config)
-    user_dn = entry.entry_dn
-    user_conn = Connection(server, user=user_dn, password=password, auto_bind=False)
-    user_conn.open()
-    if config.use_starttls and not config.use_ssl:
-        user_conn.start_tls()
-    if not user_conn.bind():
-        return None
-    user_conn.unbind()
+    with get_pool(config, service=False).connection() as conn:
+        if not conn.rebind(user=entry.entry_dn, password=password):
+            return None
     return entry
 
 
@@ -1,7 +1,144 @@
+import base64
+import json
+from datetime import date, datetime
+
+from fastapi import HTTPException
+from sqlalchemy import Date, DateTime, and_, false, or_
 from sqlalchemy.orm import Query
+from sqlalchemy.sql import operators
+from sqlalchemy.sql.elements import Label, UnaryExpression
+
+from app.core.count_cache import cached_count, count_total
+from app.schemas.common import Page
 
 
 def paginate(query: Query, page: int, size: int):
-    total = query.count()
+    total = cached_count(query)
     items = query.offset((page - 1) * size).limit(size).all()
     return total, items
+
+
+def _sort_keys(keys) -> list[tuple]:
+    """Normalize keys to ``(expression, descending, attribute name)``.
+
+    Keys are columns, optionally wrapped in ``.asc()``/``.desc()`` (default is
+    descending). Computed keys are passed as labels whose name is the
+    attribute the value is loaded into, e.g. via ``with_expression``.
+    """
+    result = []
+    for key in keys:
+        descending = True
+        if isinstance(key, UnaryExpression) and key.modifier in (operators.asc_op, operators.desc_op):
+            descending = key.modifier is operators.desc_op
+            key = key.element
+        if isinstance(key, Label):
+            result.append((key.element, descending, key.name))
+        else:
+            result.append((key, descending, key.key))
+    return result
+
+
+def _key_names(sort_keys: list[tuple]) -> list[str]:
+    return [f"{name}:{'d' if descending else 'a'}" for _, descending, name in sort_keys]
+
+
+def encode_cursor(sort_keys: list[tuple], item) -> str:
+    values = [getattr(item, name) for _, _, name in sort_keys]
+    payload = json.dumps({"k": _key_names(sort_keys), "v": values}, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(sort_keys: list[tuple], cursor: str) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        values = payload["v"]
+        names = payload["k"]
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if names != _key_names(sort_keys) or len(values) != len(sort_keys):
+        raise HTTPException(status_code=400, detail="Cursor does not match sort order")
+    try:
+        return [_cursor_value(column, value) for (column, _, _), value in zip(sort_keys, values)]
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def _cursor_value(column, value):
+    # Dates travel as strings in the cursor; bind them back with their type.
+    if value is None:
+        return None
+    column_type = getattr(column, "type", None)
+    if isinstance(column_type, DateTime):
+        return datetime.fromisoformat(value)
+    if isinstance(column_type, Date):
+        return date.fromisoformat(value)
+    return value
+
+
+def _equal(column, value):
+    return column.is_(None) if value is None else column == value
+
+
+def _step(column, descending: bool, value):
+    # NULLs sort first ascending and last descending (MySQL and SQLite).
+    if value is None:
+        return false() if descending else column.isnot(None)
+    if descending:
+        return or_(column < value, column.is_(None))
+    return column > value
+
+
+def _after(sort_keys: list[tuple], values: list):
+    clauses = []
+    for index, (column, descending, _) in enumerate(sort_keys):
+        equal = [_equal(sort_keys[i][0], values[i]) for i in range(index)]
+        step = _step(column, descending, values[index])
+        clauses.append(and_(*equal, step) if equal else step)
+    return or_(*clauses)
+
+
+def seek_keyset(query: Query, keys, cursor: str | None = None) -> Query:
+    """Order ``query`` by ``keys`` and, given a cursor, seek past it (no limit)."""
+    sort_keys = _sort_keys(keys)
+    ordered = query.order_by(*[column.desc() if descending else column.asc() for column, descending, _ in sort_keys])
+    if cursor:
+        ordered = ordered.filter(_after(sort_keys, decode_cursor(sort_keys, cursor)))
+    return ordered
+
+
+def cursor_for(keys, item) -> str:
+    return encode_cursor(_sort_keys(keys), item)
+
+
+def cursor_values(keys, cursor: str) -> list:
+    return decode_cursor(_sort_keys(keys), cursor)
+
+
+def paginate_keyset(
+    query: Query,
+    keys,
+    size: int,
+    page: int = 1,
+    cursor: str | None = None,
+    with_total: bool | None = None,
+    estimate: bool = False,
+) -> Page:
+    """Paginate by page number or by an opaque cursor on ``keys``.
+
+    ``keys`` must end with a unique column (normally the primary key) so the
+    order is total. With a cursor the query seeks past the last seen row
+    instead of using OFFSET, and the total is only counted when asked for.
+    Pass ``estimate`` for unfiltered listings to allow an approximate total.
+    """
+    sort_keys = _sort_keys(keys)
+    if with_total is None:
+        with_total = cursor is None
+    total, estimated = count_total(query, estimate=estimate) if with_total else (None, False)
+    ordered = seek_keyset(query, keys, cursor)
+    if not cursor:
+        ordered = ordered.offset((max(page, 1) - 1) * size)
+    rows = ordered.limit(size + 1).all()
+    items = rows[:size]
+    next_cursor = encode_cursor(sort_keys, items[-1]) if len(rows) > size and items else None
+    return Page(total=total, items=items, next_cursor=next_cursor, total_estimated=estimated)
@@ -0,0 +1,60 @@
+import re
+
+from sqlalchemy import or_, text
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+
+_BOOLEAN_OPERATORS = re.compile(r'[+\-><()~*"@]+')
+
+
+def fulltext_enabled(db: Session) -> bool:
+    return settings.search_fulltext_enabled and db.get_bind().dialect.name == "mysql"
+
+
+def normalize_query(q: str) -> str:
+    return " ".join(_BOOLEAN_OPERATORS.sub(" ", q or "").split())
+
+
+def boolean_query(q: str) -> str:
+    """Turn free text into a BOOLEAN MODE query requiring every term.
+
+    With the ngram parser a quoted term matches as a contiguous substring,
+    which mirrors the old ``LIKE '%q%'`` semantics for codes and names.
+    """
+    return " ".join(f'+"{term}"' for term in normalize_query(q).split())
+
+
+def match_against(columns: list, q: str):
+    """``MATCH(columns) AGAINST(:q IN BOOLEAN MODE)`` for a FULLTEXT index.
+
+    ``columns`` must list exactly the columns of one FULLTEXT index.
+    """
+    return match(*columns, against=boolean_query(q)).in_boolean_mode()
+
+
+def searchable_terms(q: str) -> bool:
+    terms = normalize_query(q).split()
+    return bool(terms) and all(len(term) >= settings.search_ngram_token_size for term in terms)
+
+
+def prefix_filter(columns: list, q: str):
+    like = f"{q.strip()}%"
+    return or_(*[column.like(like) for column in columns])
+
+
+def ensure_fulltext_index(connection, table: str, name: str, columns: list[str]):
+    exists = connection.execute(
+        text(
+            "SELECT COUNT(*) FROM INFORMATION_SCHEMA.STATISTICS "
+            "WHERE TABLE_SCHEMA = DATABASE() "
+            "AND TABLE_NAME = :table "
+            "AND INDEX_NAME = :name"
+        ),
+        {"table": table, "name": name},
+    ).scalar()
+    if not exists:
+        connection.execute(
+            text(f"ALTER TABLE {table} ADD FULLTEXT INDEX {name} ({', '.join(columns)}) WITH PARSER ngram")
+        )
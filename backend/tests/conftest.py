@@ -0,0 +1,35 @@
+import pytest
+
+from app.core.config import settings
+from app.utils import ldap_client
+from tests.ldap_mock import MockDirectory, ldap_config
+
+
+@pytest.fixture
+def mock_ldap(monkeypatch):
+    monkeypatch.setattr(settings, "ldap_client_strategy", "MOCK_SYNC")
+    ldap_client.reset_pools()
+    directory = MockDirectory(ldap_config())
+    yield directory
+    ldap_client.reset_pools()
+
+
+@pytest.fixture
+def db_session(monkeypatch):
+    """A fresh in-memory SQLite database with the app's tables."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+    from sqlalchemy.pool import StaticPool
+
+    import app.models  # noqa: F401  (registers every table)
+    from app.core.database import Base
+
+    monkeypatch.setattr(settings, "redis_url", "")
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    session = factory()
+    session.factory = factory
+    yield session
+    session.close()
+    engine.dispose()
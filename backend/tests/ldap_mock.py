@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+from ldap3 import MOCK_SYNC, Connection
+
+from app.utils import ldap_client
+
+SERVICE_DN = "cn=svc,dc=example,dc=com"
+SERVICE_PASSWORD = "svc-secret"
+PEOPLE_DN = "ou=people,dc=example,dc=com"
+
+
+def ldap_config(**overrides):
+    values = {
+        "provider": "openldap",
+        "is_active": True,
+        "host": "ldap.example.com",
+        "port": 389,
+        "use_ssl": False,
+        "use_starttls": False,
+        "base_dn": PEOPLE_DN,
+        "bind_dn": SERVICE_DN,
+        "bind_password": SERVICE_PASSWORD,
+        "user_filter": "(objectClass=inetOrgPerson)",
+        "username_attr": "uid",
+        "display_name_attr": "cn",
+        "email_attr": "mail",
+        "phone_attr": "mobile",
+        "dept_attr": "departmentNumber",
+        "default_role_code": "employee",
+        "allow_login": True,
+        "auto_create": True,
+        "sync_watermark": None,
+        "last_sync_at": None,
+        "last_full_sync_at": None,
+    }
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+class MockDirectory:
+    """Seeds the in-memory DIT that ldap3's MOCK_SYNC strategy serves from the
+    pooled ``Server``; every pooled connection sees the same entries."""
+
+    def __init__(self, config):
+        self.config = config
+        self.conn = Connection(ldap_client.get_pool(config).server, client_strategy=MOCK_SYNC)
+        self.conn.strategy.add_entry(SERVICE_DN, {"objectClass": "person", "cn": "svc", "userPassword": SERVICE_PASSWORD})
+
+    def add_user(self, uid: str, password: str = "secret", **attributes) -> str:
+        dn = f"uid={uid},{PEOPLE_DN}"
+        entry = {
+            "objectClass": "inetOrgPerson",
+            "uid": uid,
+            "cn": attributes.pop("cn", uid.title()),
+            "userPassword": password,
+            "modifyTimestamp": attributes.pop("modifyTimestamp", "20260101000000Z"),
+        }
+        entry.update(attributes)
+        self.conn.strategy.add_entry(dn, entry)
+        return dn
+
+    def remove_user(self, uid: str):
+        self.conn.strategy.remove_entry(f"uid={uid},{PEOPLE_DN}")
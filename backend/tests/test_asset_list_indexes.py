@@ -0,0 +1,200 @@
+"""EXPLAIN checks for the asset list: every shape listed in LIST_INDEXES must
+be served by its index without a sort step, and other shapes still work.
+
+Runs on SQLite by default; set TEST_MYSQL_URL (an empty scratch database)
+to check the MySQL plans as well.
+"""
+import os
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+import app.models  # noqa: F401
+from app.core.config import settings
+from app.core.database import Base, get_db
+from app.core.security import create_access_token
+from app.models.asset import LIST_INDEXES, Asset, list_index_name
+from app.models.category import Category
+from app.models.role import Role
+from app.models.user import User
+
+FILTER_VALUES = {
+    "category_id": 3,
+    "dept": "dept-2",
+    "user_id": 4,
+    "location": "room-5",
+    "status": 1,
+}
+RANGE_PARAMS = {
+    "purchase_at": {"purchase_from": "2021-01-01", "purchase_to": "2021-06-30"},
+    "warranty_at": {"warranty_from": "2024-01-01", "warranty_to": "2024-06-30"},
+    "price": {"price_min": "100", "price_max": "500"},
+}
+
+
+def _cases():
+    # The default newest-first listing walks the primary key.
+    cases = [({}, None)]
+    for (column,) in LIST_INDEXES:
+        index = list_index_name(column)
+        if column in FILTER_VALUES:
+            cases.append(({column: FILTER_VALUES[column]}, index))
+            continue
+        cases.append(({"sort": f"-{column}"}, index))
+        cases.append(({"sort": column}, index))
+        if column in RANGE_PARAMS:
+            cases.append((RANGE_PARAMS[column], index))
+    return cases
+
+
+def _case_id(case):
+    params, index = case
+    return ",".join(f"{key}={value}" for key, value in params.items()) or "default"
+
+
+def _seed(engine):
+    Base.metadata.create_all(engine)
+    factory = sessionmaker(bind=engine)
+    db = factory()
+    role = Role(name="Super admin", code="super_admin")
+    db.add(role)
+    db.flush()
+    users = [User(username=f"user{index}", full_name=f"User {index}", password_hash="!", role_id=role.id) for index in range(20)]
+    db.add_all(users)
+    categories = [Category(name=f"Category {index}") for index in range(10)]
+    db.add_all(categories)
+    db.flush()
+    users[0].roles = [role]
+    rows = []
+    for index in range(3000):
+        rows.append(
+            {
+                "sn": f"SN{index:06d}",
+                "asset_no": f"A{index:06d}",
+                "name": f"Asset {index % 997}",
+                "category": "c",
+                "category_id": categories[index % 10].id,
+                "status": index % 5,
+                "user_id": users[index % 20].id,
+                "dept": f"dept-{index % 15}",
+                "price": Decimal(index % 2000),
+                "purchase_at": date(2020, 1, 1) + timedelta(days=index % 1500),
+                "warranty_at": date(2023, 1, 1) + timedelta(days=index % 1500),
+                "location": f"room-{index % 25}",
+                "is_deleted": index % 50 == 0,
+            }
+        )
+    db.execute(insert(Asset), rows)
+    db.commit()
+    admin_id = users[0].id
+    db.close()
+    with engine.begin() as connection:
+        connection.execute(text("ANALYZE" if engine.dialect.name == "sqlite" else "ANALYZE TABLE assets"))
+    return factory, admin_id
+
+
+@pytest.fixture(scope="module", params=["sqlite", "mysql"])
+def list_client(request):
+    if request.param == "sqlite":
+        engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    else:
+        url = os.environ.get("TEST_MYSQL_URL")
+        if not url:
+            pytest.skip("TEST_MYSQL_URL not set")
+        engine = create_engine(url)
+    original_redis = settings.redis_url
+    settings.redis_url = ""
+    factory, admin_id = _seed(engine)
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if "FROM assets" in statement and "LIMIT" in statement and not statement.startswith("EXPLAIN"):
+            statements.append((statement, parameters))
+
+    from app.main import app
+
+    def override_db():
+        session = factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_db
+    client = TestClient(app)
+    client.headers["Authorization"] = f"Bearer {create_access_token({'user_id': admin_id})}"
+    yield client, engine, statements
+    app.dependency_overrides.pop(get_db, None)
+    settings.redis_url = original_redis
+    if engine.dialect.name != "sqlite":
+        Base.metadata.drop_all(engine)
+    engine.dispose()
+
+
+def _plan(engine, statement, parameters) -> tuple[set[str], bool]:
+    """Return (indexes used on assets, whether a sort step is needed)."""
+    with engine.connect() as connection:
+        if engine.dialect.name == "sqlite":
+            rows = connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).all()
+            details = [row[3] for row in rows]
+            indexes = {detail.split(" INDEX ")[1].split(" ")[0] for detail in details if " INDEX " in detail}
+            return indexes, any("TEMP B-TREE" in detail for detail in details)
+        rows = connection.exec_driver_sql(f"EXPLAIN {statement}", parameters).mappings().all()
+        assets = [row for row in rows if row["table"] == "assets"]
+        return {row["key"] for row in assets if row["key"] not in (None, "PRIMARY")}, any("filesort" in (row["Extra"] or "") for row in rows)
+
+
+@pytest.mark.parametrize("case", _cases(), ids=_case_id)
+def test_list_shape_uses_its_index(list_client, case):
+    client, engine, statements = list_client
+    params, index = case
+    statements.clear()
+    response = client.get("/api/v1/assets", params={**params, "size": 20, "with_total": "false"})
+    assert response.status_code == 200, response.text
+    assert response.json()["items"]
+    assert len(statements) == 1
+    indexes, sorts = _plan(engine, *statements[0])
+    assert indexes == ({index} if index else set())
+    assert not sorts
+
+
+def _in_order(left, right, order) -> bool:
+    for name, descending in order:
+        a, b = left[name], right[name]
+        if name == "price":
+            a, b = float(a), float(b)
+        if a != b:
+            return a > b if descending else a < b
+    return False
+
+
+@pytest.mark.parametrize(
+    "params,order",
+    [
+        ({"sort": "name,-price"}, [("name", False), ("price", True), ("id", False)]),
+        ({"sort": "-name", "price_min": "1"}, [("name", True), ("id", True)]),
+        ({"price_min": "1", "purchase_from": "2021-01-01"}, [("id", True)]),
+        ({"dept": "dept-1", "sort": "location"}, [("location", False), ("id", False)]),
+        ({"category_id": 3, "sort": "-asset_no"}, [("asset_no", True), ("id", True)]),
+        ({"status": 1, "sort": "-purchase_at"}, [("purchase_at", True), ("id", True)]),
+    ],
+)
+def test_other_shapes_fall_back_to_a_sorted_plan(list_client, params, order):
+    client, _, _ = list_client
+    items = []
+    cursor = None
+    for _ in range(3):
+        response = client.get("/api/v1/assets", params={**params, "size": 20, "cursor": cursor})
+        assert response.status_code == 200, response.text
+        page = response.json()
+        items.extend(page["items"])
+        cursor = page["next_cursor"]
+    assert len(items) == 60
+    assert len({item["id"] for item in items}) == 60
+    assert all(_in_order(left, right, order) for left, right in zip(items, items[1:]))
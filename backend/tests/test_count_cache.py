@@ -0,0 +1,43 @@
+from sqlalchemy import insert, text
+
+from app.core import count_cache
+from app.core.config import settings
+from app.models.role import Role
+
+
+def add_role(db, code: str, **values):
+    db.connection().execute(insert(Role), [{"name": code.title(), "code": code, "is_deleted": False, **values}])
+    db.commit()
+
+
+def test_core_writes_invalidate_cached_counts(db_session):
+    query = db_session.query(Role).filter(Role.is_deleted == False)
+    add_role(db_session, "admin")
+    assert count_cache.cached_count(query) == 1
+
+    add_role(db_session, "employee")
+    assert count_cache.cached_count(query) == 2
+
+    db_session.execute(text("UPDATE roles SET is_deleted = 1 WHERE code = 'employee'"))
+    db_session.commit()
+    assert count_cache.cached_count(query) == 1
+
+
+def test_rolled_back_writes_keep_the_table_version(db_session):
+    add_role(db_session, "admin")
+    versions = count_cache.get_table_versions(["roles"])
+
+    db_session.execute(text("DELETE FROM roles"))
+    db_session.rollback()
+    assert count_cache.get_table_versions(["roles"]) == versions
+
+
+def test_soft_delete_filter_is_never_estimated(db_session, monkeypatch):
+    monkeypatch.setattr(settings, "count_estimate_min_rows", 1)
+    monkeypatch.setattr(count_cache, "estimate_table_rows", lambda db, table: 1000)
+    add_role(db_session, "admin")
+    add_role(db_session, "employee", is_deleted=True)
+
+    assert count_cache.count_total(db_session.query(Role), estimate=True) == (1000, True)
+    live = db_session.query(Role).filter(Role.is_deleted == False)
+    assert count_cache.count_total(live, estimate=True) == (1, False)
@@ -0,0 +1,31 @@
+import asyncio
+import threading
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import hashing
+from app.core.config import settings
+
+
+@pytest.fixture(autouse=True)
+def single_slot(monkeypatch):
+    monkeypatch.setattr(settings, "password_hash_workers", 0)
+    monkeypatch.setattr(hashing, "_slots", threading.BoundedSemaphore(1))
+
+
+def test_async_task_waits_for_a_slot_held_by_the_sync_path():
+    hashing._slots.acquire()
+    threading.Timer(0.1, hashing._slots.release).start()
+    assert asyncio.run(hashing.run_hash_task_async(str.upper, "secret")) == "SECRET"
+
+
+def test_async_task_is_rejected_after_the_wait_timeout(monkeypatch):
+    monkeypatch.setattr(settings, "password_hash_wait_seconds", 0.05)
+    hashing._slots.acquire()
+    try:
+        with pytest.raises(HTTPException) as exc:
+            asyncio.run(hashing.run_hash_task_async(str.upper, "secret"))
+    finally:
+        hashing._slots.release()
+    assert exc.value.status_code == 503
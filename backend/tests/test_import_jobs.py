@@ -0,0 +1,95 @@
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core import import_jobs
+from app.core.config import settings
+from app.models.import_job import ImportJob
+from app.models.role import Role
+from app.models.user import User
+
+
+@pytest.fixture
+def jobs(db_session, tmp_path, monkeypatch):
+    monkeypatch.setattr(import_jobs, "SessionLocal", db_session.factory)
+    monkeypatch.setattr(settings, "import_dir", str(tmp_path))
+    role = Role(name="Admin", code="super_admin")
+    db_session.add(role)
+    db_session.flush()
+    user = User(username="admin", full_name="Admin", password_hash="!", role_id=role.id)
+    db_session.add(user)
+    db_session.commit()
+
+    def add(job_id: str, status: str, owner: str | None, age: timedelta, with_files: bool = False) -> ImportJob:
+        stamp = datetime.utcnow() - age
+        job = ImportJob(
+            id=job_id,
+            kind="assets",
+            status=status,
+            operator_id=user.id,
+            owner=owner,
+            heartbeat_at=stamp,
+            finished_at=None if status in import_jobs.ACTIVE_STATUSES else stamp,
+        )
+        if with_files:
+            job.file_path = str(tmp_path / f"{job_id}.xlsx")
+            job.error_path = str(tmp_path / f"{job_id}_errors.xlsx")
+            for path in (job.file_path, job.error_path):
+                open(path, "wb").close()
+        db_session.add(job)
+        db_session.commit()
+        return job
+
+    return add
+
+
+def status(db, job_id: str) -> str:
+    db.expire_all()
+    return db.get(ImportJob, job_id).status
+
+
+def test_only_orphaned_jobs_are_failed(jobs, db_session):
+    jobs("own", "running", import_jobs.INSTANCE_ID, timedelta(hours=1))
+    jobs("live", "running", "other-replica", timedelta(seconds=10))
+    jobs("queued", "pending", "other-replica", timedelta(seconds=10))
+    jobs("orphan", "running", "crashed", timedelta(hours=1), with_files=True)
+    jobs("legacy", "pending", None, timedelta(hours=1))
+
+    assert import_jobs.fail_stale_jobs() == 2
+    assert [status(db_session, job_id) for job_id in ("own", "live", "queued", "orphan", "legacy")] == [
+        "running",
+        "running",
+        "pending",
+        "failed",
+        "failed",
+    ]
+    assert not os.path.exists(db_session.get(ImportJob, "orphan").file_path)
+
+
+def test_heartbeat_keeps_own_jobs_fresh(jobs, db_session):
+    jobs("own", "running", import_jobs.INSTANCE_ID, timedelta(hours=1))
+    import_jobs.heartbeat_jobs()
+    db_session.expire_all()
+    assert datetime.utcnow() - db_session.get(ImportJob, "own").heartbeat_at < timedelta(seconds=5)
+
+
+def test_cleanup_removes_expired_files_only(jobs, db_session, tmp_path):
+    jobs("old", "completed", None, timedelta(hours=settings.import_retention_hours + 1), with_files=True)
+    recent = jobs("recent", "completed", None, timedelta(hours=1), with_files=True)
+    active = jobs("active", "running", import_jobs.INSTANCE_ID, timedelta(seconds=1), with_files=True)
+    stray = tmp_path / "stray.xlsx"
+    stray.write_bytes(b"")
+    expired = time.time() - (settings.import_retention_hours + 1) * 3600
+    os.utime(stray, (expired, expired))
+    os.utime(active.file_path, (expired, expired))
+
+    import_jobs.cleanup_job_files()
+
+    db_session.expire_all()
+    assert db_session.get(ImportJob, "old").error_path is None
+    assert sorted(os.listdir(tmp_path)) == sorted(
+        os.path.basename(path)
+        for path in (recent.file_path, recent.error_path, active.file_path, active.error_path)
+    )
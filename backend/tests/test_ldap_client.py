@@ -0,0 +1,80 @@
+import pytest
+from ldap3.core.exceptions import LDAPException
+
+from app.utils import ldap_client
+from tests.ldap_mock import ldap_config
+
+
+def test_service_pool_reuses_bound_connection(mock_ldap):
+    mock_ldap.add_user("alice")
+    mock_ldap.add_user("bob")
+    pool = ldap_client.get_pool(mock_ldap.config)
+
+    assert {entry.uid.value for entry in ldap_client.search_users(mock_ldap.config)} == {"alice", "bob"}
+    assert len(pool._idle) == 1
+    first = pool._idle[0][0]
+    assert first.bound
+
+    assert ldap_client.search_user(mock_ldap.config, "bob").entry_dn.startswith("uid=bob,")
+    assert len(pool._idle) == 1
+    assert pool._idle[0][0] is first
+
+
+def test_paged_search_yields_every_entry(mock_ldap):
+    for index in range(5):
+        mock_ldap.add_user(f"user{index}")
+    pages = list(ldap_client.iter_user_pages(mock_ldap.config, 2))
+    assert [len(page) for page in pages] == [2, 2, 1]
+
+
+def test_search_filter_escapes_username(mock_ldap):
+    mock_ldap.add_user("alice")
+    assert ldap_client.search_user(mock_ldap.config, "*") is None
+
+
+def test_closed_connection_is_replaced(mock_ldap):
+    mock_ldap.add_user("alice")
+    pool = ldap_client.get_pool(mock_ldap.config)
+    ldap_client.search_users(mock_ldap.config)
+    stale = pool._idle[0][0]
+    stale.unbind()
+
+    assert len(ldap_client.search_users(mock_ldap.config)) == 1
+    assert pool._idle[0][0] is not stale
+
+
+def test_failed_service_bind_raises_and_pools_nothing(mock_ldap):
+    config = ldap_config(bind_password="wrong")
+    pool = ldap_client.get_pool(config)
+    with pytest.raises(LDAPException):
+        ldap_client.search_users(config)
+    assert pool._idle == []
+    # The slot is returned, so later calls fail the same way instead of hanging.
+    with pytest.raises(LDAPException):
+        ldap_client.search_users(config)
+
+
+def test_authenticate_rebinds_pooled_user_connection(mock_ldap):
+    mock_ldap.add_user("alice", password="alice-pw")
+    mock_ldap.add_user("bob", password="bob-pw")
+    user_pool = ldap_client.get_pool(mock_ldap.config, service=False)
+
+    assert ldap_client.authenticate_user(mock_ldap.config, "alice", "alice-pw").uid.value == "alice"
+    assert len(user_pool._idle) == 1
+    conn = user_pool._idle[0][0]
+
+    assert ldap_client.authenticate_user(mock_ldap.config, "bob", "bob-pw").uid.value == "bob"
+    assert user_pool._idle[0][0] is conn
+    # The service pool stays bound as the service account.
+    service_conn = ldap_client.get_pool(mock_ldap.config)._idle[0][0]
+    assert service_conn.user == mock_ldap.config.bind_dn
+
+
+def test_authenticate_rejects_bad_credentials(mock_ldap):
+    mock_ldap.add_user("alice", password="alice-pw")
+    assert ldap_client.authenticate_user(mock_ldap.config, "alice", "wrong") is None
+    assert ldap_client.authenticate_user(mock_ldap.config, "alice", "") is None
+    assert ldap_client.authenticate_user(mock_ldap.config, "nobody", "alice-pw") is None
+    # A failed bind leaves the user pool usable for the next login.
+    assert ldap_client.authenticate_user(mock_ldap.config, "alice", "alice-pw") is not None
+    assert len(ldap_client.get_pool(mock_ldap.config, service=False)._idle) == 1
@@ -0,0 +1,139 @@
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.deps import get_current_user
+from app.core.principal_cache import get_principal
+from app.core.security import create_access_token, hash_password
+from app.models.ldap_config import LdapConfig
+from app.models.role import Role
+from app.models.user import User
+from app.routers.ldap import sync_users
+
+
+@pytest.fixture
+def directory(mock_ldap, db_session, monkeypatch):
+    monkeypatch.setattr(settings, "password_hash_workers", 0)
+    values = {key: value for key, value in vars(mock_ldap.config).items() if hasattr(LdapConfig, key)}
+    db_session.add(LdapConfig(**values))
+    db_session.add(Role(name="Employee", code="employee"))
+    db_session.commit()
+    return mock_ldap
+
+
+@pytest.fixture
+def client(db_session):
+    from app.main import app
+
+    def override_db():
+        session = db_session.factory()
+        try:
+            yield session
+        finally:
+            session.close()
+
+    app.dependency_overrides[get_db] = override_db
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_db, None)
+
+
+def login(client, username: str, password: str) -> int:
+    return client.post("/api/v1/auth/login", data={"username": username, "password": password}).status_code
+
+
+def full_sync(db):
+    return sync_users(mode="full", db=db, _=None)
+
+
+def user(db, username: str) -> User:
+    db.expire_all()
+    return db.query(User).filter(User.username == username).one()
+
+
+def test_full_sync_deactivates_users_removed_from_directory(directory, db_session):
+    for uid in ("alice", "bob", "carol"):
+        directory.add_user(uid, password=f"{uid}-pw")
+    result = full_sync(db_session)
+    assert (result.created, result.deactivated) == (3, 0)
+    carol = user(db_session, "carol")
+    assert carol.is_active and carol.auth_source == "ldap"
+    assert get_principal(db_session, carol.id) is not None
+
+    directory.remove_user("carol")
+    result = full_sync(db_session)
+    assert (result.created, result.unchanged, result.deactivated) == (0, 2, 1)
+    assert not user(db_session, "carol").is_active
+    assert user(db_session, "alice").is_active
+
+    # The principal cached above is dropped, so existing tokens stop working.
+    assert get_principal(db_session, carol.id) is None
+    token = create_access_token({"user_id": carol.id})
+    with pytest.raises(HTTPException) as exc:
+        get_current_user(db=db_session, token=token)
+    assert exc.value.status_code == 401
+
+
+def test_failed_search_does_not_deactivate_anyone(directory, db_session):
+    directory.add_user("alice", password="alice-pw")
+    full_sync(db_session)
+
+    config = db_session.query(LdapConfig).one()
+    config.base_dn = "ou=missing,dc=example,dc=com"
+    db_session.commit()
+    with pytest.raises(HTTPException) as exc:
+        full_sync(db_session)
+    assert exc.value.status_code == 400
+    assert user(db_session, "alice").is_active
+
+
+def test_full_sync_refuses_to_deactivate_most_users(directory, db_session):
+    for uid in ("alice", "bob", "carol"):
+        directory.add_user(uid, password=f"{uid}-pw")
+    full_sync(db_session)
+
+    directory.remove_user("bob")
+    directory.remove_user("carol")
+    with pytest.raises(HTTPException) as exc:
+        full_sync(db_session)
+    assert exc.value.status_code == 400
+    assert user(db_session, "bob").is_active and user(db_session, "carol").is_active
+
+
+def test_deactivated_user_cannot_log_in(directory, db_session, client):
+    directory.add_user("alice", password="alice-pw")
+    directory.add_user("carol", password="carol-pw")
+    full_sync(db_session)
+
+    assert login(client, "carol", "carol-pw") == 200
+    # Synced accounts have no usable local password.
+    assert login(client, "carol", "carol") == 401
+
+    directory.remove_user("carol")
+    full_sync(db_session)
+    assert login(client, "carol", "carol-pw") == 401
+    assert login(client, "alice", "alice-pw") == 200
+
+    role = db_session.query(Role).one()
+    db_session.add(User(username="dave", full_name="Dave", password_hash=hash_password("dave-pw"), role_id=role.id))
+    db_session.commit()
+    assert login(client, "dave", "dave-pw") == 200
+    user(db_session, "dave").is_active = False
+    db_session.commit()
+    assert login(client, "dave", "dave-pw") == 401
+
+
+def test_unknown_directory_user_is_throttled(directory, db_session, client, monkeypatch):
+    from app.core import rate_limit
+
+    monkeypatch.setattr(settings, "login_max_failures_per_user", 3)
+    rate_limit._local.clear()
+    config = db_session.query(LdapConfig).one()
+    config.auto_create = False
+    db_session.commit()
+    directory.add_user("erin", password="erin-pw")
+
+    statuses = [login(client, "erin", "erin-pw") for _ in range(4)]
+    rate_limit._local.clear()
+    assert statuses == [401, 401, 401, 429]
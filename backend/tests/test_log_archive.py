@@ -0,0 +1,130 @@
+import gzip
+import json
+import os
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import insert
+
+from app.core import log_archive
+from app.core.config import settings
+from app.models.asset import Asset
+from app.models.asset_log import AssetLog
+from app.models.asset_log_archive import AssetLogArchiveOperator
+from app.models.role import Role
+from app.models.user import User
+from app.routers.logs import list_logs
+from app.routers.users import delete_user
+
+START = datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def logs(db_session, tmp_path, monkeypatch):
+    monkeypatch.setattr(log_archive, "SessionLocal", db_session.factory)
+    monkeypatch.setattr(settings, "audit_log_archive_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "audit_log_archive_batch_size", 7)
+    role = Role(name="Admin", code="super_admin")
+    db_session.add(role)
+    db_session.flush()
+    users = [User(username=f"user{index}", full_name=f"User {index}", password_hash="!", role_id=role.id) for index in range(3)]
+    db_session.add_all(users)
+    db_session.add_all([Asset(sn=f"S{index}", asset_no=f"A{index}", name="x", category="c") for index in (1, 2)])
+    db_session.commit()
+    rows = [
+        {
+            "id": index + 1,
+            "asset_id": 1 + index % 2,
+            "operator_id": users[0].id if index < 90 else users[1].id,
+            "action_type": "OUT" if index % 3 == 0 else "IN",
+            "change_data": {"i": index},
+            "created_at": START + timedelta(days=index * 2, minutes=index % 2),
+        }
+        for index in range(100)
+    ]
+    db_session.execute(insert(AssetLog), rows)
+    db_session.commit()
+    return users
+
+
+def walk(db, **filters) -> list[tuple]:
+    params = dict(
+        page=1, asset_id=None, asset=None, operator_id=None, operator=None, action_type=None,
+        start=None, end=None, with_total=None, include_archived=False, db=db, _=None,
+    )
+    params.update(filters)
+    seen, cursor = [], None
+    while True:
+        page = list_logs(size=9, cursor=cursor, **params)
+        seen += [(item.created_at, item.id) for item in page.items]
+        cursor = page.next_cursor
+        if not cursor:
+            return seen
+
+
+def test_archived_months_leave_the_hot_table_and_stay_readable(logs, db_session, tmp_path):
+    before = walk(db_session)
+    filtered = walk(db_session, asset="S2", action_type="out", start=START + timedelta(days=20), end=START + timedelta(days=150))
+
+    archived = log_archive.archive_old_logs(datetime(2026, 5, 15))
+    assert [item["period"] for item in archived] == ["2026-01", "2026-02", "2026-03", "2026-04"]
+    assert db_session.query(AssetLog).count() == 40
+    with gzip.open(archived[0]["path"], "rt", encoding="utf-8") as source:
+        assert json.loads(source.readline())["id"] == 1
+
+    db_session.expire_all()
+    assert len(walk(db_session)) == 40
+    assert walk(db_session, include_archived=True) == before
+    assert walk(
+        db_session, include_archived=True, asset="S2", action_type="out",
+        start=START + timedelta(days=20), end=START + timedelta(days=150),
+    ) == filtered
+    assert log_archive.archive_old_logs(datetime(2026, 5, 15)) == []
+
+
+def test_late_rows_for_an_archived_month_go_to_a_part_file(logs, db_session):
+    log_archive.archive_old_logs(datetime(2026, 5, 15))
+    db_session.execute(
+        insert(AssetLog),
+        [{"id": 1000, "asset_id": 1, "operator_id": logs[0].id, "action_type": "IN", "change_data": {}, "created_at": datetime(2026, 1, 20)}],
+    )
+    db_session.commit()
+    # Still hot, but ordered among the archived January rows.
+    merged = walk(db_session, include_archived=True)
+    assert len(merged) == 101 and merged == sorted(merged, reverse=True)
+
+    archived = log_archive.archive_old_logs(datetime(2026, 5, 15))
+    assert [(item["period"], item["rows"]) for item in archived] == [("2026-01", 1)]
+    assert archived[0]["path"].endswith("asset_logs-2026-01.part2.jsonl.gz")
+    assert len(walk(db_session, include_archived=True)) == 101
+
+
+def test_archived_operators_cannot_be_deleted(logs, db_session):
+    log_archive.archive_old_logs(datetime(2026, 12, 1))
+    assert db_session.query(AssetLog).count() == 0
+    with pytest.raises(HTTPException) as exc:
+        delete_user(logs[1].id, db=db_session, _=None)
+    assert exc.value.status_code == 400
+
+    db_session.query(AssetLogArchiveOperator).delete()
+    db_session.commit()
+    log_archive.index_archive_operators()
+    operators = {row.operator_id for row in db_session.query(AssetLogArchiveOperator).all()}
+    assert operators == {logs[0].id, logs[1].id}
+    assert delete_user(logs[2].id, db=db_session, _=None).message == "Deleted"
+
+
+def test_archiving_needs_an_existing_directory(logs, db_session, tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "audit_log_archive_dir", str(tmp_path / "missing"))
+    with pytest.raises(ValueError):
+        log_archive.archive_old_logs(datetime(2026, 5, 15))
+    assert not os.path.exists(tmp_path / "missing")
+    assert db_session.query(AssetLog).count() == 100
+
+
+def test_a_running_archive_blocks_another(logs, db_session):
+    with log_archive._archive_lock(db_session) as acquired:
+        assert acquired
+        assert log_archive.archive_old_logs(datetime(2026, 5, 15)) == []
+    assert db_session.query(AssetLog).count() == 100
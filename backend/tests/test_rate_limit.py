@@ -0,0 +1,73 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+
+from app.core import rate_limit
+from app.core.config import settings
+
+
+@pytest.fixture(autouse=True)
+def local_store(monkeypatch):
+    monkeypatch.setattr(settings, "redis_url", "")
+    monkeypatch.setattr(settings, "login_max_failures_per_user", 5)
+    monkeypatch.setattr(settings, "login_max_failures_per_ip", 20)
+    rate_limit._local.clear()
+    yield
+    rate_limit._local.clear()
+
+
+def attempt(username: str, ip: str = "10.0.0.1") -> bool:
+    try:
+        rate_limit.begin_login_attempt(username, ip)
+        return True
+    except HTTPException as exc:
+        assert exc.status_code == 429
+        return False
+
+
+def test_parallel_burst_cannot_exceed_the_limit():
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        allowed = list(pool.map(lambda _: attempt("alice"), range(40)))
+    assert allowed.count(True) == 5
+
+
+def test_rejected_attempts_do_not_extend_the_lockout():
+    for _ in range(5):
+        assert attempt("alice")
+    assert not attempt("alice")
+    key = rate_limit._keys("alice", "10.0.0.1")[0][1]
+    assert len(rate_limit._local.get(key)) == 5
+
+
+def test_released_attempt_is_not_counted():
+    member = rate_limit.begin_login_attempt("alice", "10.0.0.1")
+    rate_limit.release_login_attempt("alice", "10.0.0.1", member)
+    for _ in range(5):
+        assert attempt("alice")
+    assert not attempt("alice")
+
+
+def test_ip_limit_applies_across_usernames():
+    assert all(attempt(f"user{index}") for index in range(20))
+    assert not attempt("someone-else")
+    assert attempt("someone-else", ip="10.0.0.2")
+
+
+def test_reset_clears_the_username_but_keeps_the_ip_window():
+    for _ in range(5):
+        attempt("alice")
+    member = rate_limit.begin_login_attempt("bob", "10.0.0.1")
+    rate_limit.reset_login_failures("bob", "10.0.0.1", member)
+    assert attempt("bob")
+    key = rate_limit._keys("alice", "10.0.0.1")[1][1]
+    assert len(rate_limit._local.get(key)) == 6
+
+
+def test_valid_logins_do_not_reset_the_ip_limit():
+    for index in range(20):
+        member = rate_limit.begin_login_attempt("owner", "10.0.0.1")
+        rate_limit.reset_login_failures("owner", "10.0.0.1", member)
+        assert attempt(f"user{index}")
+    assert not attempt("user20")
+    assert not attempt("owner")